@@ -1 +0,0 @@
-import util
@@ -1,10 +1,10 @@
-import build, gdb, project, settings
+import build, gdb, project, settings, trace, sampler
 import ui.styles as styles
 import ui.menu as menu
 #import ui.controls as controls
 #import ui.views as views
 
-import logging, os
+import logging, os, functools
 import wx
 
 IDLE = 0
@@ -26,6 +26,31 @@ EVT_APP_TARGET_CONNECTED = wx.PyEventBinder(wx.NewEventType())
 EVT_APP_TARGET_DISCONNECTED = wx.PyEventBinder(wx.NewEventType())
 EVT_APP_TARGET_RUNNING = wx.PyEventBinder(wx.NewEventType())
 EVT_APP_TARGET_HALTED = wx.PyEventBinder(wx.NewEventType())
+EVT_APP_SESSION_SELECTED = wx.PyEventBinder(wx.NewEventType())
+
+MAIN_SESSION = 'main'
+
+class DebugTarget(object):
+    '''
+    The controller's side of one GDB session: where it is in the attach/run cycle, and its settings.
+    The settings come from the project's debug and program categories, overridden by the session's entry in the
+    project's debug.sessions list (eg: {'name' : 'cm0', 'attach_cmd' : 'target remote localhost:3334', 'target' : 'build/cm0.elf'})
+    '''
+    def __init__(self, name, session, config=None):
+        self.name = name
+        self.session = session
+        self.config = config or {}
+        self.state = IDLE
+        self.halted_at = (None, None)
+        self.download_request = False
+
+    def setting(self, project, name):
+        if name in self.config:
+            return self.config[name]
+        for category in (project.debug, project.program):
+            if name in category:
+                return category[name]
+        raise KeyError(name)
 
 class Controller(wx.EvtHandler):
 
@@ -33,15 +58,21 @@ class Controller(wx.EvtHandler):
         super(Controller, self).__init__()
 
         self.style_manager = styles.StyleManager()
-        self.state = IDLE
-        self.gdb = gdb.session
         self.frame = frame
         self.project = None
-        self.download_request = False
+        self.gdb_ready = False
+        self.targets = {}
+        self.sessions = gdb.SessionManager()
+        self.sessions.bind(gdb.EVT_SESSION_SELECTED, self.on_session_selected)
+        self.add_session(MAIN_SESSION)
         try:
             self.settings = settings.Settings.load(".settings")
         except:
             self.settings = settings.Settings.create(".settings")
+        # GDB's MI traffic and streams are traced rather than logged (see trace.py), so they go to a file of their own
+        self.trace_sink = trace.FileSink("trace.txt")
+        # Watched values over time, for the plot view (see sampler.py)
+        self.sampler = sampler.Sampler()
         
         # Build events
         self.Bind(build.EVT_BUILD_FINISHED, self.on_build_finished)
@@ -51,13 +82,132 @@ class Controller(wx.EvtHandler):
  #       self.Bind(gdb.EVT_GDB_UPDATE, self.on_breakpoint_update)
               
 
+    # SESSIONS
+    # ==========================================================
+    @property
+    def gdb(self):
+        return self.sessions.active
+
+    @property
+    def target(self):
+        return self.targets.get(self.sessions.active_name)
+
+    def __get_state(self):
+        return self.target.state if self.target else IDLE
+    def __set_state(self, state):
+        self.target.state = state
+    state = property(__get_state, __set_state)
+
+    def __get_halted_at(self):
+        return self.target.halted_at if self.target else (None, None)
+    def __set_halted_at(self, location):
+        self.target.halted_at = location
+    halted_at = property(__get_halted_at, __set_halted_at)
+
+    def __get_download_request(self):
+        return self.target.download_request if self.target else False
+    def __set_download_request(self, download):
+        self.target.download_request = download
+    download_request = property(__get_download_request, __set_download_request)
+
+    def target_of(self, session):
+        return self.targets.get(self.sessions.name_of(session))
+
+    def is_active(self, target):
+        return target is self.target
+
+    def setting(self, name, target=None):
+        return (target or self.target).setting(self.project, name)
+
+    def add_session(self, name, config=None):
+        '''
+        Create a new GDB session (not yet started) and its debug target
+        '''
+        session = gdb.GDB()
+        self.targets[name] = DebugTarget(name, session, config)
+        self.sessions.add(name, session)
+        if self.gdb_ready:
+            self.setup_session(session)
+        return session
+
+    def remove_session(self, name):
+        target = self.targets[name]
+        self.detach(target)
+        self.sessions.remove(name)
+        del self.targets[name]
+
+    def update_sessions(self):
+        '''
+        Bring the sessions in line with the project: one for each entry in its debug.sessions list, plus the main one
+        '''
+        configs = {}
+        if self.project and 'sessions' in self.project.debug:
+            for config in self.project.debug.sessions:
+                configs[config['name']] = config
+        for name in self.sessions.names:
+            if name != MAIN_SESSION and name not in configs:
+                self.remove_session(name)
+        for name, config in configs.items():
+            if name in self.targets:
+                self.targets[name].config = config
+            else:
+                self.add_session(name, config)
+
+    def select_session(self, name):
+        self.sessions.select(name)
+
+    def on_session_selected(self, evt):
+        wx.CallAfter(self.show_session, self.targets[evt.data])
+
+    def show_session(self, target):
+        '''
+        Point the views, menus and status bar at the (newly) active session
+        '''
+        if not self.is_active(target) or not self.frame:
+            return
+        if target.state != IDLE:
+            self.frame.runtime_view.set_model(target.session)
+            self.frame.editor_view.set_model(target.session)
+            self.frame.disassembly_view.set_model(target.session)
+        if target.state == IDLE:
+            menu.manager.publish(menu.TARGET_DETACHED)
+            self.frame.statusbar.set_icon(self.frame.statusbar.DISCONNECTED)
+            self.frame.statusbar.set_state(self.status_text(""))
+        elif target.state == RUNNING:
+            menu.manager.publish(menu.TARGET_ATTACHED)
+            menu.manager.publish(menu.TARGET_RUNNING)
+            self.frame.statusbar.set_icon(self.frame.statusbar.RUNNING)
+            self.frame.statusbar.set_state(self.status_text("Running"), blink=True)
+        else:
+            menu.manager.publish(menu.TARGET_ATTACHED)
+            menu.manager.publish(menu.TARGET_HALTED)
+            self.frame.statusbar.set_icon(self.frame.statusbar.CONNECTED)
+            self.stopped_at(*target.halted_at, target=target)
+        wx.PostEvent(self, AppEvent(EVT_APP_SESSION_SELECTED, self, data=target.name))
+
+    def status_text(self, text, target=None):
+        # Say which session we're talking about, once there's more than one
+        if len(self.sessions) > 1:
+            return "[%s] %s" % ((target or self.target).name, text)
+        return text
+
     def setup_gdb(self):
-        g = gdb.session
-        g.mi_log = logging.getLogger('gdb.mi')
-        g.console_log = logging.getLogger('gdb.stream')
-        g.target_log = logging.getLogger('gdb.stream')
-        g.log_log = logging.getLogger('gdb.stream')
         self.error_logger = logging.getLogger('error')
+        self.gdb_ready = True
+        for session in self.sessions:
+            self.setup_session(session)
+
+    def setup_session(self, g):
+        name = self.sessions.name_of(g) or MAIN_SESSION
+        # MI traffic and GDB's streams go to the tracer, where the log view picks them up (the main session's unlabelled)
+        g.trace_source = 0 if name == MAIN_SESSION else trace.tracer.source(name)
+        g.parser = self.settings.debug.mi_parser
+        g.command_timeout = self.settings.debug.command_timeout
+        g.transport = self.settings.debug.transport
+        g.stack_page = max(int(self.settings.debug.stack_page), 1)
+        g.stack_max_depth = max(int(self.settings.debug.stack_max_depth), 1)
+        g.live.enabled = bool(self.settings.debug.live_watch)
+        g.live.interval = max(int(self.settings.debug.live_watch_interval), 10)/1000.0
         
         g.Bind(gdb.EVT_GDB_STARTED, self.on_gdb_started)
         g.Bind(gdb.EVT_GDB_FINISHED, self.on_gdb_finished)
@@ -65,9 +215,9 @@ class Controller(wx.EvtHandler):
         g.Bind(gdb.EVT_GDB_STOPPED, self.on_gdb_stopped)
         g.Bind(gdb.EVT_GDB_RUNNING, self.on_gdb_running)
         g.Bind(gdb.EVT_GDB_UPDATE_STACK, self.on_gdb_stack_update)
+        g.Bind(gdb.EVT_GDB_SNAPSHOT, self.on_gdb_snapshot)
         #g.Bind(gdb.EVT_GDB_UPDATE_BREAKPOINTS, self.on_update_breakpoints)
         #g.Bind(gdb.EVT_GDB_UPDATE_VARS, self.on_update_vars)
-        self.gdb = g
   
     def setup_logs(self):
         pass
@@ -132,8 +282,9 @@ class Controller(wx.EvtHandler):
         project_view.set_project(self.project)
         settings.session_set('project_filename', path)
         evt = AppEvent(EVT_APP_PROJECT_OPENED, self, data=self.project)
-        if self.gdb:
-            self.gdb.cd(self.project.directory)
+        self.update_sessions()
+        for session in self.sessions:
+            session.cd(self.project.directory)
         wx.PostEvent(self, evt)
 
     def unload_project(self):
@@ -142,7 +293,8 @@ class Controller(wx.EvtHandler):
             menu.manager.publish(menu.PROJECT_CLOSE)
             self.frame.project_view.set_project(None)
             settings.session_set('project_filename', '')
-            self.detach()
+            self.detach_all()
+            self.update_sessions()
             evt = AppEvent(EVT_APP_PROJECT_CLOSED, self)
             wx.PostEvent(self, evt)
             
@@ -162,6 +314,14 @@ class Controller(wx.EvtHandler):
 
     def update_settings(self):
         self.settings.save()
+        for session in self.sessions:
+            session.parser = self.settings.debug.mi_parser
+            session.command_timeout = self.settings.debug.command_timeout
+            session.transport = self.settings.debug.transport
+            session.stack_page = max(int(self.settings.debug.stack_page), 1)
+            session.stack_max_depth = max(int(self.settings.debug.stack_max_depth), 1)
+            session.live.enabled = bool(self.settings.debug.live_watch)
+            session.live.interval = max(int(self.settings.debug.live_watch_interval), 10)/1000.0
         self.frame.editor_view.update_settings()
 
     def update_styles(self):
@@ -169,97 +329,115 @@ class Controller(wx.EvtHandler):
         
     # STATE MANAGEMENT
     # ==========================================================
-    def enter_attached_state(self):
+    # Every session goes through these states on its own.  The target to act on defaults to the active one; the
+    # menus, status bar and views only follow the active target.
+    def enter_attached_state(self, target=None):
+        target = target or self.target
+        active = self.is_active(target)
         #project = self.project
-        menu.manager.publish(menu.TARGET_ATTACHED)
+        if active:
+            menu.manager.publish(menu.TARGET_ATTACHED)
         #print "Entering the ATTACHED state."
-        if self.state == IDLE:
-            self.gdb.cd(self.project.directory)
-            #self.frame.debug_view.set_model(self.gdb)
-            self.frame.runtime_view.set_model(self.gdb)
-            self.frame.editor_view.set_model(self.gdb)
-            self.project.load_target() # Do this to reload the SFRs for the runtime tree, in case we edited the target file
-            self.frame.disassembly_view.set_model(self.gdb)
-            self.exit_current_state()
-            self.frame.statusbar.set_icon(self.frame.statusbar.CONNECTED)
-            self.state = ATTACHED
-            self.halt(callback=self.do_post_attach_cmd, download=self.download_request)
+        if target.state == IDLE:
+            target.session.cd(self.project.directory)
+            if active:
+                #self.frame.debug_view.set_model(self.gdb)
+                self.frame.runtime_view.set_model(target.session)
+                self.frame.editor_view.set_model(target.session)
+                self.project.load_target() # Do this to reload the SFRs for the runtime tree, in case we edited the target file
+                self.frame.disassembly_view.set_model(target.session)
+            self.exit_current_state(target)
+            if active:
+                self.frame.statusbar.set_icon(self.frame.statusbar.CONNECTED)
+            target.state = ATTACHED
+            self.halt(callback=functools.partial(self.do_post_attach_cmd, target), download=target.download_request, target=target)
                         
-        elif self.state == RUNNING:
-            self.exit_current_state()
-            self.frame.statusbar.set_icon(self.frame.statusbar.CONNECTED)
-            self.state = ATTACHED
-            if self.download_request:
-                self.download()
-
-        elif self.state == ATTACHED:
-            if self.download_request:
-                self.download()
+        elif target.state == RUNNING:
+            self.exit_current_state(target)
+            if active:
+                self.frame.statusbar.set_icon(self.frame.statusbar.CONNECTED)
+            target.state = ATTACHED
+            if target.download_request:
+                self.download(target)
+
+        elif target.state == ATTACHED:
+            if target.download_request:
+                self.download(target)
             #self.frame.statusbar.set_state("Halted")
         else:
-            self.error_logger.log(logging.WARN, "Tried to attach from state %d" % self.state)
+            self.error_logger.log(logging.WARN, "Tried to attach from state %d" % target.state)
 
-    def exit_attached_state(self):
+    def exit_attached_state(self, target=None):
         pass
 
-    def enter_running_state(self):
-        menu.manager.publish(menu.TARGET_RUNNING)
-        if self.state == ATTACHED:
-            self.exit_current_state()
-            self.frame.statusbar.set_icon(self.frame.statusbar.RUNNING)
-            self.frame.statusbar.set_state("Running",blink=True)
-            self.state = RUNNING
+    def enter_running_state(self, target=None):
+        target = target or self.target
+        active = self.is_active(target)
+        if active:
+            menu.manager.publish(menu.TARGET_RUNNING)
+        if target.state == ATTACHED:
+            self.exit_current_state(target)
+            if active:
+                self.frame.statusbar.set_icon(self.frame.statusbar.RUNNING)
+                self.frame.statusbar.set_state(self.status_text("Running"),blink=True)
+            target.state = RUNNING
         else:
-            self.error_logger.log(logging.WARN, "Tried to run from state %d" % self.state)
+            self.error_logger.log(logging.WARN, "Tried to run from state %d" % target.state)
 
-    def exit_running_state(self):
-        menu.manager.publish(menu.TARGET_HALTED)
+    def exit_running_state(self, target=None):
+        if self.is_active(target or self.target):
+            menu.manager.publish(menu.TARGET_HALTED)
 
-    def enter_idle_state(self):
-        self.exit_current_state()
-        menu.manager.publish(menu.TARGET_DETACHED)
-        self.frame.statusbar.set_icon(self.frame.statusbar.RUNNING)
-        self.frame.statusbar.working = False
-        self.frame.statusbar.text = ""
+    def enter_idle_state(self, target=None):
+        target = target or self.target
+        self.exit_current_state(target)
+        if self.is_active(target):
+            menu.manager.publish(menu.TARGET_DETACHED)
+            self.frame.statusbar.set_icon(self.frame.statusbar.RUNNING)
+            self.frame.statusbar.working = False
+            self.frame.statusbar.text = ""
 
-        self.state = IDLE
+        target.state = IDLE
 
-    def exit_idle_state(self):
+    def exit_idle_state(self, target=None):
         pass
 
-    def exit_current_state(self):
+    def exit_current_state(self, target=None):
+        target = target or self.target
         try:
             callable =  {ATTACHED   : self.exit_attached_state,
                          RUNNING    : self.exit_running_state,
-                         IDLE       : self.exit_idle_state}[self.state]
-            wx.CallAfter(callable)
+                         IDLE       : self.exit_idle_state}[target.state]
+            wx.CallAfter(callable, target)
         except Exception, e:
             print e
             pass
 
-    def enter_state(self, state):
+    def enter_state(self, state, target=None):
+        target = target or self.target
         try:
             callable =  {ATTACHED   : self.enter_attached_state,
                          RUNNING    : self.enter_running_state,
                          IDLE       : self.enter_idle_state}[state]
-            wx.CallAfter(callable)
+            wx.CallAfter(callable, target)
         except Exception, e:
             print e
             pass
 
-    def change_state(self, state):    
-        self.enter_state(state)
+    def change_state(self, state, target=None):    
+        self.enter_state(state, target)
 
-    def do_post_attach_cmd(self, cmd):
-        if self.project.debug.post_attach_cmd:
-            self.gdb.command(self.project.debug.post_attach_cmd, self.do_post_post_attach_cmd)
+    def do_post_attach_cmd(self, target, cmd):
+        post_attach_cmd = self.setting('post_attach_cmd', target)
+        if post_attach_cmd:
+            target.session.command(post_attach_cmd, functools.partial(self.do_post_post_attach_cmd, target))
         else:
-            if self.download_request:
-                self.download()
+            if target.download_request:
+                self.download(target)
             
-    def do_post_post_attach_cmd(self, result):
-        if self.download_request:
-            self.download()
+    def do_post_post_attach_cmd(self, target, result):
+        if target.download_request:
+            self.download(target)
 
     # ==========================================================
     
@@ -286,14 +464,15 @@ class Controller(wx.EvtHandler):
             self.change_state(ATTACHED)
         elif self.state == RUNNING:
             return
-        self.gdb.exec_continue(self.on_running)
+        self.gdb.exec_continue(functools.partial(self.on_running, self.target))
             
-    def on_running(self, result):
+    def on_running(self, target, result):
         try:
             if result.cls.lower() == "running":
-                self.change_state(RUNNING)
-                evt = AppEvent(EVT_APP_TARGET_RUNNING, self)
-                wx.PostEvent(self, evt)
+                self.change_state(RUNNING, target)
+                if self.is_active(target):
+                    evt = AppEvent(EVT_APP_TARGET_RUNNING, self)
+                    wx.PostEvent(self, evt)
             elif result.cls.lower() == "stopped":
                 print result
             else:
@@ -347,9 +526,10 @@ class Controller(wx.EvtHandler):
     def add_watch(self, s):
         self.frame.runtime_view.add_watch(s)
         
-    def halt(self, callback=None, download=False):
-        self.download_request = download
-        self.gdb.exec_interrupt(callback)
+    def halt(self, callback=None, download=False, target=None):
+        target = target or self.target
+        target.download_request = download
+        target.session.exec_interrupt(callback)
         #self.gdb.sig_interrupt()
         
     def set_exec_location(self, file, line, goto=False):
@@ -358,101 +538,148 @@ class Controller(wx.EvtHandler):
     def on_halted(self, result):
         self.gdb.update()
        
-    def reset(self):
-        if self.project.debug.reset_cmd:
-            self.gdb.command(self.project.debug.reset_cmd, callback=self.jump_to_entry_point)
+    def reset(self, target=None):
+        target = target or self.target
+        reset_cmd = self.setting('reset_cmd', target)
+        if reset_cmd:
+            target.session.command(reset_cmd, callback=functools.partial(self.jump_to_entry_point, target))
 
-    def jump_to_entry_point(self, dummy=None):
+    def jump_to_entry_point(self, target=None, dummy=None):
             #TODO: This is a hack, not cross-platform compatible.
+            target = target or self.target
             wx.CallAfter(self.frame.start_busy, "Jumping to entry point...")
-            self.gdb.set("$pc", self.project.program.entry_point, self.on_at_entry_point)
+            target.session.set("$pc", self.setting('entry_point', target), functools.partial(self.on_at_entry_point, target))
 
-    def on_at_entry_point(self, result):
+    def on_at_entry_point(self, target, result):
         wx.CallAfter(self.frame.stop_busy)
         if result.cls == 'error':
             wx.CallAfter(self.frame.error_msg, result.msg)
         else:
-            self.frame.statusbar.text = "Ready!"
-            self.gdb.halt()
-            self.gdb.update()
+            self.frame.statusbar.text = self.status_text("Ready!", target)
+            target.session.halt()
+            target.session.update()
          
-    def download(self):
-        self.download_request = False
-        if self.state == ATTACHED:
+    def download(self, target=None):
+        target = target or self.target
+        target.download_request = False
+        if target.state == ATTACHED:
             wx.CallAfter(self.frame.start_busy_frame)
             wx.CallAfter(self.frame.start_busy, "Downloading to target...")
-            if self.project.debug.pre_download_cmd:
-                self.gdb.command(self.project.debug.pre_download_cmd, callback=self.download_stage_2)
+            pre_download_cmd = self.setting('pre_download_cmd', target)
+            if pre_download_cmd:
+                stage_1 = target.session.command(pre_download_cmd)
             else:
-                self.download_stage_2(None)
+                stage_1 = gdb.completed()
+            # A failing pre-download command doesn't stop the download, but a failure after that does
+            download_stage_2 = functools.partial(self.download_stage_2, target)
+            stage_1.then(download_stage_2, download_stage_2).then(functools.partial(self.download_stage_3, target)).add_callback(functools.partial(self.on_downloaded, target))
         else:
-            print "Can't download from state %s" % self.state
+            print "Can't download from state %s" % target.state
 
-    def download_stage_2(self, result):
-        self.gdb.set_exec(self.project.absolute_path(self.project.program.target), callback=self.download_stage_3)
+    def download_stage_2(self, target, result):
+        return target.session.set_exec(self.project.absolute_path(self.setting('target', target)))
         
-    def download_stage_3(self, result):
-        if not self.project.debug.download_cmd:
-            self.gdb.target_download(callback=self.on_downloaded)
+    def download_stage_3(self, target, result):
+        download_cmd = self.setting('download_cmd', target)
+        if not download_cmd:
+            return target.session.target_download()
         else:
-            self.gdb.command(self.project.debug.download_cmd, callback=self.on_downloaded)
+            return target.session.command(download_cmd, timeout=None)
 
 
-    def on_downloaded(self, result):
+    def on_downloaded(self, target, result):
         wx.CallAfter(self.frame.stop_busy_frame)
         wx.CallAfter(self.frame.stop_busy)
         if result.cls == 'error':
             wx.CallAfter(self.frame.error_msg, result.msg)
         else:
-            self.jump_to_entry_point()
+            self.jump_to_entry_point(target)
             
     # ATTACH TO GDB
-    def attach(self, download=False):
-        self.download_request = download
-        if self.state == IDLE:
-            self.gdb.cmd_string = "%s -n -q -i mi" % self.project.debug.gdb_executable
+    def attach(self, download=False, target=None):
+        target = target or self.target
+        target.download_request = download
+        if target.state == IDLE:
+            target.session.cmd_string = "%s -n -q -i mi" % self.setting('gdb_executable', target)
             try:
-                self.gdb.start()
+                target.session.start()
             except Exception, e:
                 self.frame.error(e)
                 return
             wx.CallAfter(self.frame.start_busy, "Attaching to GDB...")
         else:
-            print "Cannot attach to process from state %d" % self.state
+            print "Cannot attach to process from state %d" % target.state
+
+    def attach_all(self, download=False):
+        for target in self.targets.values():
+            if target.state == IDLE:
+                self.attach(download, target)
+
+    # MI TRANSCRIPTS (see gdb/transcript.py, and tests/replay_transcript.py to play them back)
+    @property
+    def recording(self):
+        return self.gdb.recorder is not None
+
+    def record_transcript(self, filename):
+        self.gdb.record(filename)
+        self.frame.statusbar.text = self.status_text("Recording MI traffic to %s" % os.path.basename(filename))
+
+    def stop_recording(self):
+        recorder = self.gdb.recorder
+        if recorder:
+            recorder.stop()
+            self.frame.statusbar.text = self.status_text("Recorded %d MI records" % recorder.count)
             
-    def on_attach_cmd(self, result):
+    def send_attach_cmd(self, target):
+        target.session.command(self.setting('attach_cmd', target), callback=functools.partial(self.on_attach_cmd, target))
+
+    def on_attach_cmd(self, target, result):
+        if result.cls == "error" and gdb.refuses_non_stop(result.msg) and target.session.all_stop(result.msg):
+            # Live watch asked for non-stop mode, and the target can't do it: try again without
+            self.send_attach_cmd(target)
+            return
         self.frame.statusbar.working = False
         self.frame.statusbar.text = ""
         if result.cls == "error":
             self.frame.error_msg(result.msg)
             self.frame.statusbar.working = False
             self.frame.statusbar.text = ""
-            self.change_state(IDLE)
+            self.change_state(IDLE, target)
         else:
-            self.change_state(ATTACHED)
+            self.change_state(ATTACHED, target)
         
     # DETACH FROM TARGET
-    def detach(self):
-        if self.gdb and self.gdb.attached:
+    def detach(self, target=None):
+        target = target or self.target
+        if target.session.attached:
             try:
-                self.gdb.quit()
+                target.session.quit()
             except:
                 pass
-        self.change_state(IDLE)
+        self.change_state(IDLE, target)
+
+    def detach_all(self):
+        for target in self.targets.values():
+            self.detach(target)
     
     # GDB EVENTS
+    # These come from every session, not just the active one
     def on_gdb_started(self, evt):
+        target = self.target_of(evt.GetEventObject())
+        session = target.session
         try:
-            self.gdb.command('set target-async on')
-            self.frame.statusbar.text = "Attaching to target..."
-            self.gdb.set_exec(self.project.absolute_path(self.project.program.target))
-            self.gdb.command(self.project.debug.attach_cmd, callback=self.on_attach_cmd)
+            session.command('set target-async on')
+            self.frame.statusbar.text = self.status_text("Attaching to target...", target)
+            session.set_exec(self.project.absolute_path(self.setting('target', target)))
+            self.send_attach_cmd(target)
         except Exception, e:
             self.frame.error(e)
             wx.CallAfter(self.frame.stop_busy)
 
     def on_gdb_finished(self, evt):
-        self.detach()
+        target = self.target_of(evt.GetEventObject())
+        if target:
+            self.detach(target)
 #        self.change_state(IDLE)
     
     def on_gdb_error(self, evt):
@@ -463,11 +690,24 @@ class Controller(wx.EvtHandler):
         frame = stack.top
         filename = os.path.normpath(frame.fullname or frame.file)
         line = frame.line
-        self.stopped_at(filename, line)
+        self.stopped_at(filename, line, self.target_of(evt.GetEventObject()))
+        evt.Skip()
+
+    def on_gdb_snapshot(self, evt):
+        target = self.target_of(evt.GetEventObject())
+        frame = evt.data.top
+        if frame and target:
+            filename = os.path.normpath(frame.fullname or frame.file)
+            # The *stopped record has usually told us where we are already
+            if (filename, frame.line) != target.halted_at:
+                self.stopped_at(filename, frame.line, target)
         evt.Skip()
 
     def on_gdb_stopped(self, evt):
-        self.change_state(ATTACHED)
+        target = self.target_of(evt.GetEventObject())
+        if not target:
+            return
+        self.change_state(ATTACHED, target)
         result = evt.data
         filename, line = None, None
         try:
@@ -475,19 +715,27 @@ class Controller(wx.EvtHandler):
             line = int(result.frame.line)            
         except:
             pass
-        self.stopped_at(filename, line)
+        self.stopped_at(filename, line, target)
 
-    def stopped_at(self, file=None, line=None):
+    def stopped_at(self, file=None, line=None, target=None):
+        target = target or self.target
+        if not target:
+            return
+        target.halted_at = (file, line)
+        if not self.is_active(target):
+            return # Shown when the session is selected
         if not file:
-            self.frame.statusbar.set_state("Halted in the weeds.", color=wx.RED)
+            self.frame.statusbar.set_state(self.status_text("Halted in the weeds."), color=wx.RED)
         else:
-            self.frame.statusbar.set_state("Halted at %s:%d" % (os.path.basename(file), line))
+            self.frame.statusbar.set_state(self.status_text("Halted at %s:%d" % (os.path.basename(file), line)))
             evt = AppEvent(EVT_APP_TARGET_HALTED, self, data=(file, line))
             wx.PostEvent(self, evt)
             
             
     def on_gdb_running(self, evt):
-        self.change_state(RUNNING)
+        target = self.target_of(evt.GetEventObject())
+        if target:
+            self.change_state(RUNNING, target)
         
     def on_gdb_done(self, data):
         if data.cls == 'error':
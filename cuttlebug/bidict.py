@@ -0,0 +1,51 @@
+'''
+Two way dictionary: values can be looked up by key, and keys by value.
+'''
+class bidict(object):
+    
+    def __init__(self, d=None):
+        d=d or {}
+        self.d1 = {}
+        self.d2 = {}
+        for key, value in d.iteritems():
+            self[key] = value
+    def __getitem__(self, key):
+        try: return self.d1[key]
+        except KeyError: return self.d2[key]
+                
+    def __setitem__(self, key, value):
+        self.d1[key] = value
+        self.d2[value] = key
+    
+    def __contains__(self, key):
+        return (key in self.d1) or (key in self.d2)
+    
+    def keys(self, direction=False):
+        return self.d1.keys() if not direction else self.d2.keys()
+    
+    def values(self, direction=False):
+        return self.keys(not direction)
+    
+    def reverse(self):
+        self.d1, self.d2 = self.d2, self.d1
+        
+    def get(self, key, default):
+        try:
+            return self[key]
+        except KeyError:
+            return default    
+    def iteritems(self, direction=False):
+        return self.d1.iteritems() if not direction else self.d2.iteritems()
+    
+    def pop(self, key):
+        try:
+            val = self.d1.pop(key)
+            self.d2.pop(val)
+            return val
+        except KeyError:
+            val = self.d2.pop(key)
+            self.d1.pop(val)
+            return val
+        
+    def __str__(self):
+        return 'b' + str(self.d1)
@@ -1,6 +1,17 @@
-from gdb import GDB, GDBEvent, EVT_GDB_STARTED, EVT_GDB_FINISHED, EVT_GDB_UPDATE, EVT_GDB_ERROR, EVT_GDB_RUNNING, EVT_GDB_STOPPED, EVT_GDB_UPDATE_BREAKPOINTS, EVT_GDB_UPDATE_VARS, EVT_GDB_UPDATE_STACK, EVT_GDB_UPDATE_REGISTERS
-from GDBMIParser import GDBMIParser
-from GDBMILexer import GDBMILexer
+'''
+The GDB session.  core.Session is the session itself and doesn't need wx; GDB (from gdb.py) is the same session
+posting wx events, and is only available when wx is.
+'''
+from core import Session, Dispatcher, Event, Breakpoint, BreakpointTable, EVT_STARTED, EVT_FINISHED, EVT_UPDATE, EVT_ERROR, EVT_RUNNING, EVT_STOPPED, EVT_UPDATE_BREAKPOINTS, EVT_UPDATE_VARS, EVT_UPDATE_STACK, EVT_UPDATE_REGISTERS, EVT_SNAPSHOT, EVT_LIVE_WATCH, refuses_non_stop
 from gdbvars import Type, Variable, GDBVarModel
-from models import TYPES, GDBStackFrame
-session = GDB()
\ No newline at end of file
+from models import TYPES, GDBStackFrame, StopSnapshot
+from future import Future, TimeoutError, gather, completed
+from eventloop import EventLoop, coroutine, Return, create_transport
+from sessions import SessionManager, EVT_SESSION_ADDED, EVT_SESSION_REMOVED, EVT_SESSION_SELECTED
+from transcript import Recorder, Replayer, read_transcript
+from varpool import VarPool
+from livewatch import LiveWatch, LiveItem
+try:
+    from gdb import GDB, GDBEvent, EVT_GDB_STARTED, EVT_GDB_FINISHED, EVT_GDB_UPDATE, EVT_GDB_ERROR, EVT_GDB_RUNNING, EVT_GDB_STOPPED, EVT_GDB_UPDATE_BREAKPOINTS, EVT_GDB_UPDATE_VARS, EVT_GDB_UPDATE_STACK, EVT_GDB_UPDATE_REGISTERS, EVT_GDB_SNAPSHOT, EVT_GDB_LIVE_WATCH
+except ImportError:
+    pass # No wx, headless sessions only
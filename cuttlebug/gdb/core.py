@@ -0,0 +1,1100 @@
+'''
+The GDB session core: drives a GDB process over the MI interface, and keeps the breakpoint, stack, variable,
+register and memory models up to date.
+
+Nothing in here depends on wx.  Events are handed to a dispatcher, which by default calls the bound handlers right away
+(on whichever thread the event happened on.)  The wx GDB class in gdb.py is this same session with a dispatcher that
+turns events into wx events.  Without it, a session can be driven from a plain script:
+
+    session = Session('arm-none-eabi-gdb -n -q -i mi')
+    session.start()
+    session.command('target remote localhost:3333').result(10)
+    session.set_exec('blink.elf').result(10)
+    session.target_download().result()
+    print session.data_evaluate_expression('counter').result(5).value
+    session.quit()
+'''
+import os, threading, logging, re, time, collections, contextlib
+import functools, binascii
+import miparser, stream, eventloop, pending, future, transcript, latency
+from livewatch import LiveWatch, EVT_LIVE_WATCH
+from records import GDBMIResultRecord
+from models import Type, Variable, GDBVarModel, GDBStackModel, GDBRegisterModel, MemoryBlock, StopSnapshot
+from memcache import MemoryCache
+from cuttlebug import odict, trace
+
+STOPPED = 0
+RUNNING = 1
+
+HEXADECIMAL = 'x'
+OCTAL = 'o'
+BINARY = 't'
+DECIMAL = 'd'
+RAW = 'r'
+NATURAL = 'n'
+
+# Register refresh modes
+REGISTERS_ALL = 'all'         # Fetch every register value
+REGISTERS_CHANGED = 'changed' # Ask GDB which registers changed, and fetch only those
+
+EXPIRE_INTERVAL = 1.0 # How often (in seconds) to check for commands that have timed out
+
+# Call stack paging.  When the target stops, only the top STACK_PAGE frames are listed; more are listed a page at a time
+# when asked for (see Session.stack_list_more).  GDB is never asked to unwind more than STACK_MAX_DEPTH frames, so a
+# runaway recursion or a corrupt stack can't hold everything else up.
+STACK_PAGE = 16
+STACK_MAX_DEPTH = 256
+
+# Priority lanes.  Commands wait in their lane until there's room in the window of commands in flight, and the lanes
+# are served in order.  Execution control doesn't wait at all.
+EXEC = 0        # -exec-* (step, continue, interrupt...)
+USER = 1        # Everything else, unless asked for in the background
+BACKGROUND = 2  # Refreshes: the stop snapshot, memory fetches, SFRs, hover values (see Session.background)
+DEFAULT_WINDOW = 8 # How many USER/BACKGROUND commands may be in flight at once
+
+STALE = "Result from before the target last ran or stopped"
+
+# What GDB says when the target (or GDB itself) can't do non-stop mode, which live watch needs (see Session.start)
+NON_STOP_REFUSED = ("does not support non-stop", "doesn't support non-stop")
+def refuses_non_stop(msg):
+    return any(text in (msg or '') for text in NON_STOP_REFUSED)
+
+# Queries that are asked for over and over (after every breakpoint change, variable assignment, stop...)  If one of
+# these is asked for while the same query is already waiting to be sent, or has been sent and nothing that might
+# change the answer has been sent since, the request is joined on to that one instead of being sent again.
+COALESCED = frozenset(['-break-list', '-stack-list-frames', '-var-update --all-values *', '-data-list-changed-registers', '-data-list-register-values r'])
+
+# Commands (by verb) that only look at GDB's state.  Anything else might change it, so coalesced queries wait until
+# the changes sent before them are done, and can't be shared across one.
+READ_ONLY = frozenset(['-break-list', '-stack-list-frames', '-stack-list-locals', '-stack-list-arguments', '-stack-list-variables', '-stack-info-depth',
+                       '-stack-info-frame', '-data-list-register-names', '-data-list-register-values', '-data-read-memory', '-data-read-memory-bytes',
+                       '-data-disassemble', '-var-list-children', '-var-evaluate-expression', '-symbol-list-variables', '-thread-info', '-target-exec-status'])
+
+def function_name(x):
+    retval = ''
+    if isinstance(x, functools.partial):
+        retval = 'functools.partial (args=%s, kw=%s): ' % (x.args, x.keywords)
+        x = x.func
+        
+    if hasattr(x, 'im_func'):
+        return retval + str(x.im_self.__class__.__name__) + '.' + x.im_func.__name__
+    elif hasattr(x, '__name__'):
+        return retval + x.__name__
+    
+    return '<UNKNOWN FUNCTION NAME: %s>' % x
+
+def escape(s):
+    return s.replace("\\", "\\\\")
+
+assignment = re.compile(r'(^|[^=!<>])=($|[^=])')
+def is_assignment(expression):
+    return assignment.search(expression) is not None
+
+# Events
+EVT_STARTED = 'started'
+EVT_FINISHED = 'finished'
+EVT_ERROR = 'error'
+EVT_UPDATE = 'update'
+EVT_UPDATE_BREAKPOINTS = 'update_breakpoints'
+EVT_UPDATE_VARS = 'update_vars'
+EVT_UPDATE_STACK = 'update_stack'
+EVT_UPDATE_REGISTERS = 'update_registers'
+EVT_RUNNING = 'running'
+EVT_STOPPED = 'stopped'
+EVT_SNAPSHOT = 'snapshot'
+
+class Event(object):
+    def __init__(self, type, session=None, data=None):
+        self.type = type
+        self.session = session
+        self.data = data
+
+    def Skip(self, skip=True):
+        # Handlers written for wx events call this; there's nothing to skip to here
+        pass
+
+    def GetEventObject(self):
+        return self.session
+
+    def __str__(self):
+        return "<Event type=%s>" % self.type
+
+class Dispatcher(object):
+    '''
+    Calls the handlers bound to an event as soon as it is posted, on the thread that posted it
+    '''
+    def __init__(self):
+        self.handlers = {}
+        self.lock = threading.Lock()
+
+    def bind(self, event, handler):
+        with self.lock:
+            self.handlers.setdefault(event, []).append(handler)
+
+    def unbind(self, event, handler):
+        with self.lock:
+            if handler in self.handlers.get(event, []):
+                self.handlers[event].remove(handler)
+
+    def post(self, event, session, data=None):
+        with self.lock:
+            handlers = list(self.handlers.get(event, []))
+        for handler in handlers:
+            try:
+                handler(Event(event, session, data))
+            except Exception, e:
+                logging.getLogger('errors').exception("Exception handling %s event: %s" % (event, e))
+
+
+class Session(object):
+
+    def __init__(self, cmd="arm-elf-gdb -n -q -i mi", mi_log=None, console_log=None, target_log=None, log_log=None, parser=miparser.FAST, command_timeout=pending.DEFAULT_TIMEOUT, dispatcher=None, transport=None):
+        self.dispatcher = dispatcher or Dispatcher()
+        self.__transport_kind = None
+        self.transport = transport or eventloop.THREADS # How the GDB process is run and read (see stream.py, eventloop.py)
+        self.subprocess = None # The GDB process, once started: anything with its send() will do (see transcript.NullProcess)
+        self.commands = eventloop.Commands(self) # Future returning versions of the commands, for coroutines
+        self.attached = False
+        self.state = STOPPED
+        self.__command_timeout = command_timeout
+        self.window = DEFAULT_WINDOW
+        self.stack_page = STACK_PAGE
+        self.stack_max_depth = STACK_MAX_DEPTH
+        self.__local = threading.local()
+        self.register_refresh = REGISTERS_CHANGED
+        self.__dispatch_lock = threading.RLock()
+        self.recorder = None # transcript.Recorder writing down the MI traffic, if any
+        self.latency = latency.LatencyStats() # How long each kind of command takes (see latency.py)
+        self.live = LiveWatch(self) # Memory polled while the target runs, if enabled (see livewatch.py)
+        self.non_stop = False       # Whether GDB has been asked for non-stop mode (see start)
+        
+        # Console streams.  Everything goes to the tracer (see trace.py), and to the loggers too, if there are any
+        self.tracer = trace.tracer
+        self.trace_source = 0
+        self.mi_log = mi_log
+        self.console_log = console_log
+        self.target_log = target_log
+        self.log_log = log_log
+
+        # Parser for GDBMI commands
+        self.cmd_string = cmd
+        self.__parser_kind = None
+        self.parser = parser
+        
+        self.__clear()
+        
+    def start(self):
+        self.__clear()
+        self.subprocess = self.transport.spawn(self.cmd_string, start=self.on_start, batch=self.on_stdout_batch, end=self.on_end)
+        self.transport.repeat(EXPIRE_INTERVAL, self.expire_commands)
+        self.non_stop = self.live.enabled
+        if self.non_stop:
+            # In all-stop mode GDB won't touch the target while it runs, so live watch needs non-stop mode, and that has
+            # to be asked for before the target is connected to.
+            self.__cmd('-gdb-set target-async on')
+            self.__cmd('-gdb-set non-stop on', internal_callback=self.__on_non_stop)
+        self.data_list_register_names()
+
+    def __on_non_stop(self, result):
+        if result.cls == 'error':
+            self.all_stop(result.msg)
+
+    def all_stop(self, reason):
+        '''
+        Go back to all-stop mode, because non-stop mode can't be had (for the specified reason), and turn live watch off.
+        The target has to be connected to again for it to take effect.  Returns False if the session was in all-stop mode already.
+        '''
+        if not self.non_stop:
+            return False
+        self.non_stop = False
+        self.live.enabled = False
+        self.live.stop()
+        self.__cmd('-gdb-set non-stop off')
+        self.post_event(EVT_ERROR, "Live watch is off: it needs non-stop mode, which this target doesn't support (%s)" % reason)
+        return True
+        
+    def __clear(self):
+        self.pending = pending.CommandTable(self.__command_timeout) # Pending commands
+        self.__query_lock = threading.RLock()
+        self.__queries = {}   # Coalesced queries that can still be joined, by command (see __query)
+        self.__queued = []    # Coalesced queries waiting for the changes in flight to finish
+        self.__changes = set() # Commands in flight (or waiting to be sent) that might change GDB's state
+        self.__generation = 0 # Goes up every time one of those is asked for
+        self.__lanes = (collections.deque(), collections.deque(), collections.deque()) # Commands waiting to be sent, by lane
+        self.__in_window = 0  # USER/BACKGROUND commands in flight
+        self.epoch = 0        # Goes up every time the target runs or stops
+        
+        self.__varnames = {} # Variable names pending
+        self.__varname_idx = 0
+        
+        self.token = 1    # Command token (increments on each command
+        self.breakpoints = BreakpointTable(self)
+        self.locals = []
+        self.vars = GDBVarModel(self)
+        self.stack = GDBStackModel(self)
+        self.registers = GDBRegisterModel(self)
+        self.memory = MemoryCache(self)
+        self.__stack_more = None # Future for the page of frames being listed by stack_list_more, if any
+        self.__last_stack = None # (frames, exact depth) of the stack before the page being listed now
+        self.snapshot = None
+        self.thread_id = None # Thread the target last stopped in
+        self.__deleted = []
+       
+    def update(self, record=None):
+        '''
+        Refresh the breakpoints, stack, locals, variables and registers all at once.  The queries are sent back to back
+        without waiting on each other, and once they have all come back, the results are put together in a StopSnapshot
+        which is posted in a single EVT_SNAPSHOT event.  Returns a future for the snapshot.
+
+        Only the first page of the call stack is listed (see STACK_PAGE), along with how deep the stack goes.
+        '''
+        with self.background(), self.batch():
+            queries = [self.__cmd('-break-list', internal_callback=functools.partial(self.__process_breakpoint_update, notify=False)),
+                       self.__cmd('-stack-list-frames 0 %d' % (self.stack_page-1), internal_callback=functools.partial(self.__on_stack_list_frames, notify=False, page=self.stack_page)),
+                       self.stack_info_depth(),
+                       self.stack_list_locals(0),
+                       self.__cmd('-var-update --all-values *', internal_callback=functools.partial(self.__on_var_updated, notify=False)),
+                       self.refresh_registers(notify=False)]
+        return future.gather(queries).then(functools.partial(self.__on_snapshot, self.epoch, record))
+
+    def __on_snapshot(self, epoch, record, results):
+        if epoch != self.epoch:
+            return None # The target has moved on since; a newer snapshot is on its way
+        breakpoints, stack, depth, frame_locals, variables, registers = results
+        snapshot = StopSnapshot(record=record,
+                                frames=tuple(self.stack),
+                                locals=tuple(frame_locals.locals if hasattr(frame_locals, 'locals') else ()),
+                                changed_vars=tuple(variables.changed if hasattr(variables, 'changed') else ()),
+                                changed_registers=tuple(registers.changed if hasattr(registers, 'changed') else ()),
+                                breakpoints=tuple(self.breakpoints))
+        self.snapshot = snapshot
+        self.post_event(EVT_SNAPSHOT, snapshot)
+        return snapshot
+
+    def parse(self, string):
+        '''
+        Parse a SINGLE gdb-mi response, returning a GDBMIResponse object
+        '''
+        output = self.mi_parser.parse(string)
+        if self.mi_parser.error:
+            msg = self.mi_parser.error.strip() + " : '" + string.strip() + "'\n"
+            logging.getLogger('errors').error(msg)
+        return output
+
+    def __get_parser(self):
+        return self.__parser_kind
+    def __set_parser(self, kind):
+        '''
+        Select the GDB/MI parser implementation ('fast' or 'antlr')
+        '''
+        kind = str(kind).lower()
+        if kind != self.__parser_kind:
+            self.mi_parser = miparser.create_parser(kind)
+            self.__parser_kind = kind
+    parser = property(__get_parser, __set_parser)
+
+    def __get_transport(self):
+        return self.__transport
+    def __set_transport(self, transport):
+        '''
+        Select how GDB is run ('threads' or 'loop', or a transport object.)  Takes effect the next time GDB is started.
+        '''
+        if isinstance(transport, basestring):
+            kind = transport.lower()
+            if kind == self.__transport_kind:
+                return
+            self.__transport = eventloop.create_transport(kind)
+            self.__transport_kind = kind
+        else:
+            self.__transport = transport
+            self.__transport_kind = None
+    transport = property(__get_transport, __set_transport)
+
+    def __get_command_timeout(self):
+        return self.__command_timeout
+    def __set_command_timeout(self, timeout):
+        '''
+        Set how long (in seconds) to wait on the result of a command before giving up on it.  0 waits forever.
+        '''
+        self.__command_timeout = float(timeout) or None
+        self.pending.timeout = self.__command_timeout
+    command_timeout = property(__get_command_timeout, __set_command_timeout)
+
+    @property
+    def running(self):
+        return self.state == RUNNING
+    
+    def __console_log(self, txt):
+        self.tracer.emit(trace.CONSOLE, self.trace_source, txt)
+        if self.console_log:
+            self.console_log.log(logging.INFO,txt )
+
+    def __target_log(self, txt):
+        self.tracer.emit(trace.TARGET, self.trace_source, txt)
+        if self.target_log:
+            self.target_log.log(logging.INFO, txt)
+    
+    def __log_log(self, txt):
+        self.tracer.emit(trace.LOG, self.trace_source, txt)
+        if self.log_log:
+            self.log_log.log(logging.INFO, txt )
+   
+    def __mi_log(self, txt):
+        if self.mi_log:
+            self.mi_log.log(logging.INFO, txt)
+
+    def on_start(self):
+        self.attached = True
+        self.post_event(EVT_STARTED)
+    
+    def on_end(self):
+        self.attached = False
+        self.post_event(EVT_FINISHED)
+
+    def on_stdout(self, line):
+        if line.strip() != '(gdb)':
+            self.on_stdout_batch([line])
+
+    def on_stdout_batch(self, lines):
+        '''
+        Handle a batch of MI records read from GDB in one go.  Each line is a single, complete record.
+        '''
+        received = time.time()
+        self.tracer.emit(trace.MI_RECEIVED, self.trace_source, lines, len(lines))
+        if self.mi_log:
+            self.__mi_log(''.join(lines))
+        if self.recorder:
+            self.recorder.received(lines)
+        responses = [self.parse(line) for line in lines]
+        with self.__dispatch_lock:
+            self.handle_responses(responses, received)
+
+    def record(self, filename):
+        '''
+        Start recording the MI traffic of this session to a transcript file (see transcript.py.)  Returns the Recorder;
+        call its stop() method to finish.
+        '''
+        if self.recorder:
+            self.recorder.stop()
+        return transcript.Recorder(self, filename)
+
+    def expire_commands(self):
+        '''
+        Give up on any commands that have timed out.  Returns False once the session has ended.
+        '''
+        if not self.attached:
+            return False
+        for entry in self.pending.expire():
+            self.latency.timed_out(entry.command)
+            self.__settle(entry)
+            self.__on_timeout(entry)
+        self.__flush_queries()
+        self.__pump()
+
+    def __on_timeout(self, entry):
+        # Stand in for the result that never came, so the callbacks still hear about the command
+        record = GDBMIResultRecord()
+        record.token = entry.token
+        record.cls = 'error'
+        record.msg = "Timed out waiting for a response to '%s'" % entry.command
+        if not entry.quiet:
+            logging.getLogger('errors').error(record.msg)
+        with self.__dispatch_lock:
+            self.__dispatch(entry, record)
+            if not entry.quiet:
+                self.__on_error(entry.command, record)
+
+    def __dispatch(self, entry, result):
+        # Background requests from before the target last ran or stopped only get the models updated: their callbacks
+        # (which do UI work) are dropped, and their futures are resolved with an error, so then() chains stop too
+        stale = entry.lane == BACKGROUND and entry.epoch != self.epoch
+        if stale:
+            self.pending.stale += 1
+        try:
+            if callable(entry.internal_callback):
+                entry.internal_callback(result)
+            if callable(entry.callback) and not stale:
+                entry.callback(result)
+        finally:
+            entry.future.set_result(future.error_record(STALE) if stale else result)
+            for follower in entry.followers:
+                self.__dispatch(follower, result)
+    
+    def __on_running(self, record):
+        self.state = RUNNING
+        self.epoch += 1
+        self.memory.invalidate()
+        self.post_event(EVT_RUNNING, record)
+        if self.non_stop:
+            self.live.start()
+    
+    def __on_stopped(self, record):
+        self.state = STOPPED
+        self.epoch += 1
+        if 'thread-id' in record:
+            self.thread_id = record['thread-id']
+        self.memory.invalidate()
+        self.live.stop()
+        self.post_event(EVT_STOPPED, record)
+        self.update(record)
+        
+    def __on_error(self, command, record):
+        # We make some corrections to the debugger state based on feedback from error messages
+        if refuses_non_stop(record.msg):
+            self.all_stop(record.msg)
+            return
+        if "while target is running" in record.msg or "while the target is running" in record.msg:
+            if self.state != RUNNING:
+                self.__on_running(record)
+        elif "while target is stopped" in record.msg or "not executing" in record.msg or "not running" in record.msg:
+            print "stopping due to ", record.msg
+            self.__on_stopped(record)
+        elif "connection closed" in record.msg:
+            print "The GDB connection was closed unexpectedly"
+            self.on_end()
+        self.post_event(EVT_ERROR, record.msg)
+   
+    
+    def handle_responses(self, responses, received=None):
+        '''
+        Handle a batch of parsed responses.  received is when they were read from GDB (now, if not specified.)
+        '''
+        received = received or time.time()
+        for response in responses:
+            self.handle_response(response, received)
+
+    def handle_response(self, response, received=None):
+        # Deal with the console streams in the response
+        for txt in response.console:
+            self.__console_log(txt)
+        for txt in response.target:
+            self.__target_log(txt)
+        for txt in response.log:
+            self.__log_log(txt)
+
+        results = (response.result, response.exc, response.status, response.notify)
+        for result in results:
+            command = ''
+            quiet = False
+            if result != None: 
+                if result.token:
+                    # Call any function setup to be called as a result of this.... result.
+                    entry = self.pending.pop(result.token)
+                    if entry:
+                        command = entry.command
+                        quiet = entry.quiet
+                        self.__settle(entry)
+                        dispatched = time.time()
+                        self.__dispatch(entry, result)
+                        self.latency.record(command, entry.sent, received or dispatched, dispatched, time.time(), error=(result.cls == 'error'))
+                        self.__flush_queries()
+                        self.__pump()
+                        
+                # Post an event on error
+                if result.cls == 'error':
+                    if not quiet:
+                        self.__on_error(command, result)
+                elif result.cls == 'stopped':
+                    self.__on_stopped(result)
+                elif result.cls == 'running':
+                    self.__on_running(result)
+                else:
+                    pass
+                    #self.post_event(EVT_UPDATE, result)
+        
+    def __update_breakpoints(self, data=None):
+        return self.__cmd('-break-list\n', self.__process_breakpoint_update)
+    def __process_breakpoint_update(self, data, notify=True):
+        if hasattr(data, 'BreakpointTable'):
+            self.breakpoints.clear()
+            for item in data.BreakpointTable.body:
+                item = item.get('bkpt', None)
+                if item:
+                    number = int(item['number'])
+                    address = int(item['addr'], 16)
+                    fullname = item.get('fullname', '<Unknown File>')
+                    file = item.get('file', '<Unknown File>')
+                    enabled = True if (item['enabled'].upper() == 'Y' or item['enabled'] == '1') else False
+                    line = int(item.get('line', -1))
+                    bp = Breakpoint(number, fullname, file, line, enabled=enabled, address=address)
+                    self.breakpoints[number] = bp
+            if notify:
+                self.post_event(EVT_UPDATE_BREAKPOINTS, self.breakpoints)
+                        
+    def post_event(self, event, data=None):
+        self.dispatcher.post(event, self, data)
+
+    def bind(self, event, handler):
+        '''
+        Call handler with an event object whenever event (one of the EVT_* names) happens
+        '''
+        self.dispatcher.bind(event, handler)
+        
+    def __send(self, data):
+        self.tracer.emit(trace.MI_SENT, self.trace_source, data)
+        self.__mi_log(data)
+        if self.recorder:
+            self.recorder.sent(data)
+        batch = getattr(self.__local, 'batch', None)
+        if batch is not None:
+            batch.append(data)
+        else:
+            self.subprocess.send(data)
+
+    @contextlib.contextmanager
+    def batch(self):
+        '''
+        Commands sent (from this thread) inside a with session.batch(): block are written to GDB in one go when the block
+        ends, rather than one write each.  They're tracked as usual, but don't wait on their results inside the block.
+        '''
+        outer = getattr(self.__local, 'batch', None) is None
+        if outer:
+            self.__local.batch = []
+        try:
+            yield
+        finally:
+            if outer:
+                data, self.__local.batch = self.__local.batch, None
+                if data:
+                    self.subprocess.send(''.join(data))
+
+    def __cmd(self, cmd, callback=None, internal_callback=None, timeout=-1):
+        '''
+        Send a command, returning a Future for its result.  Callbacks are called with the result record before the future is resolved.
+        '''
+        command = cmd.strip()
+        lane = self.__lane(command)
+        if command in COALESCED:
+            return self.__query(command, callback, internal_callback, timeout, lane)
+        entry = self.__entry(command, callback, internal_callback, timeout, lane)
+        if latency.verb(command) not in READ_ONLY:
+            with self.__query_lock:
+                self.__changes.add(entry)
+                self.__generation += 1
+        self.__submit(entry)
+        return entry.future
+
+    def __lane(self, command):
+        if command.startswith('-exec-'):
+            return EXEC
+        return getattr(self.__local, 'lane', USER)
+
+    @contextlib.contextmanager
+    def background(self):
+        '''
+        Commands sent (from this thread) inside a with session.background(): block go in the BACKGROUND lane, behind
+        anything the user asked for, and their callbacks are dropped if the target runs or stops before they come back.
+        '''
+        previous = getattr(self.__local, 'lane', USER)
+        self.__local.lane = BACKGROUND
+        try:
+            yield
+        finally:
+            self.__local.lane = previous
+
+    @contextlib.contextmanager
+    def quiet(self):
+        '''
+        Errors from commands sent (from this thread) inside a with session.quiet(): block are left to their callbacks:
+        they aren't posted as EVT_ERROR, logged, or taken as news of the target's state.  For polling, which fails a lot
+        and deals with it itself.
+        '''
+        previous = getattr(self.__local, 'quiet', False)
+        self.__local.quiet = True
+        try:
+            yield
+        finally:
+            self.__local.quiet = previous
+
+    def __entry(self, command, callback, internal_callback, timeout, lane):
+        timeout = self.pending.timeout if timeout == -1 else timeout
+        return pending.PendingCommand(None, command, callback, internal_callback, timeout, lane=lane, epoch=self.epoch, quiet=getattr(self.__local, 'quiet', False))
+
+    def __submit(self, entry):
+        '''
+        Send a command now if it's execution control, otherwise queue it in its lane until there's room in the window
+        '''
+        if entry.lane == EXEC:
+            with self.__query_lock:
+                self.__start(entry)
+            self.__send("%d%s\n" % (entry.token, entry.command))
+        else:
+            with self.__query_lock:
+                self.__lanes[entry.lane].append(entry)
+            self.__pump()
+
+    def __pump(self):
+        '''
+        Send queued commands, highest priority lane first, while there's room in the window
+        '''
+        sending = []
+        with self.__query_lock:
+            for lane in self.__lanes:
+                while lane and self.__in_window < self.window:
+                    entry = lane.popleft()
+                    self.__start(entry)
+                    self.__in_window += 1
+                    sending.append(entry)
+        with self.batch():
+            for entry in sending:
+                self.__send("%d%s\n" % (entry.token, entry.command))
+
+    def __start(self, entry):
+        entry.restart(self.token)
+        entry.generation = self.__generation
+        self.pending.put(entry)
+        self.token += 1
+
+    def __query(self, command, callback=None, internal_callback=None, timeout=-1, lane=USER):
+        '''
+        Send one of the COALESCED queries, or join the request on to the same query if it's already waiting to be sent,
+        or has been sent and nothing that could change the answer has been asked for since.  If changes are in flight,
+        the query waits until they're done, so that everyone asking in the meantime can share it.
+        '''
+        with self.__query_lock:
+            entry = self.__queries.get(command)
+            if entry and (entry.token is None or entry.generation == self.__generation):
+                self.pending.coalesced += 1
+                return entry.join(callback, internal_callback, lane=lane, epoch=self.epoch)
+            entry = self.__entry(command, callback, internal_callback, timeout, lane)
+            self.__queries[command] = entry
+            if self.__changes:
+                self.__queued.append(entry)
+                return entry.future
+        self.__submit(entry)
+        return entry.future
+
+    def __settle(self, entry):
+        '''
+        A command is done (or given up on): free its place in the window, stop counting it as a change in flight, and
+        stop joining requests on to it
+        '''
+        with self.__query_lock:
+            if entry.lane in (USER, BACKGROUND):
+                self.__in_window -= 1
+            self.__changes.discard(entry)
+            if self.__queries.get(entry.command) is entry:
+                del self.__queries[entry.command]
+
+    def __flush_queries(self):
+        '''
+        Submit the queued queries, once there are no more changes in flight for them to wait on
+        '''
+        with self.__query_lock:
+            if self.__changes or not self.__queued:
+                return
+            queued, self.__queued = self.__queued, []
+        for entry in queued:
+            self.__submit(entry)
+
+    # Utility Stuff
+    def command(self, cmd, callback=None, timeout=-1):
+        # Console commands can change memory in all sorts of ways (set var, monitor reset, restore...) so the cache is
+        # thrown away when they're sent, and again once they're done, in case anything was read back in the meantime
+        self.memory.invalidate()
+        return self.__cmd('-interpreter-exec console "%s"' % cmd, callback, internal_callback=self.__on_memory_changed, timeout=timeout)
+    def __on_memory_changed(self, data):
+        self.memory.invalidate()
+   
+    def cmd(self, cmd, callback=None):
+        return self.__cmd(cmd, callback)
+    
+    def frame_options(self, frame=0, thread=None):
+        '''
+        Return the --thread/--frame options that point an MI command at a particular frame, without selecting it.
+        '''
+        try: frame = int(frame)
+        except: frame = 0
+        return '--thread %s --frame %d' % (thread or self.thread_id or 1, frame)
+
+    def stack_select_frame(self, frame, callback=None):
+        try: frame = int(frame)
+        except: frame = 0
+        return self.__cmd('-stack-select-frame %d' % frame, callback)
+
+    def stack_list_frames(self, callback=None):
+        return self.__cmd('-stack-list-frames', internal_callback=self.__on_stack_list_frames, callback=callback)
+    def __on_stack_list_frames(self, data, notify=True, page=None):
+        if hasattr(data, 'stack'):
+            if page is not None:
+                self.__last_stack = (list(self.stack), self.stack.exact_depth) # See __on_stack_info_depth
+            self.stack.clear()
+            self.__add_frames(data)
+            if page is None or len(self.stack) < page:
+                self.stack.total_depth = len(self.stack) # That's the whole stack
+            if notify:
+                self.post_event(EVT_UPDATE_STACK, self.stack)
+
+    def __add_frames(self, data):
+        frames = sorted([item['frame'] for item in data.stack], cmp=lambda x,y : cmp(int(x['level']), int(y['level'])))
+        for frame in frames:
+            level = int(frame['level'])
+            addr = int(frame['addr'], 16)
+            func = frame.get('func', '')
+            fullname = frame.get('fullname', '')
+            line = int(frame.get('line', -1))
+            self.stack.add_frame(level, addr, func,  fullname, line)
+
+    def stack_info_depth(self, callback=None):
+        '''
+        Find out how deep the stack is, unwinding no further than stack_max_depth frames
+        '''
+        return self.__cmd('-stack-info-depth %d' % self.stack_max_depth, internal_callback=self.__on_stack_info_depth, callback=callback)
+    def __on_stack_info_depth(self, data):
+        if hasattr(data, 'depth'):
+            self.stack.total_depth = max(min(int(data.depth), self.stack_max_depth), len(self.stack))
+            self.stack.capped = int(data.depth) >= self.stack_max_depth
+            if self.__last_stack:
+                # Frames listed further down than the first page last time (by stack_list_more) stay listed
+                frames, depth = self.__last_stack
+                self.__last_stack = None
+                self.stack.carry(frames, depth)
+
+    def stack_list_more(self, callback=None):
+        '''
+        List the next page of the call stack, below the frames listed so far, and post EVT_UPDATE_STACK when they're in.
+        Returns a future for the -stack-list-frames result, or None if there are no more frames to list.
+        '''
+        if self.__stack_more and not self.__stack_more.done():
+            if callback:
+                self.__stack_more.add_callback(callback)
+            return self.__stack_more
+        low = len(self.stack)
+        high = low + self.stack_page
+        if self.stack.total_depth is not None:
+            high = min(high, self.stack.total_depth)
+        high = min(high, self.stack_max_depth)
+        if high <= low:
+            return None
+        self.__stack_more = self.__cmd('-stack-list-frames %d %d' % (low, high-1), callback=callback,
+                                       internal_callback=functools.partial(self.__on_stack_list_more, self.epoch, low, high))
+        return self.__stack_more
+    def __on_stack_list_more(self, epoch, low, high, data):
+        if epoch != self.epoch or len(self.stack) != low or not hasattr(data, 'stack'):
+            return # The stack has changed since these were asked for
+        self.__add_frames(data)
+        if len(self.stack) < high:
+            self.stack.total_depth = len(self.stack) # Ran out of frames early
+        self.post_event(EVT_UPDATE_STACK, self.stack)
+
+    def var_create(self, expression, floating=False, frame=0, callback=None, name=None):
+        '''
+        Create a variable object for expression, returning its name.  callback is called with the result of the -var-create
+        '''
+        name = name or "cvar%d" % self.__varname_idx # We keep our own names so we can track expressions
+        self.__varname_idx += 1
+        if floating:
+            frame = "@"
+            cmd = '-var-create %s @ %s' % (name, expression)
+        else:
+            cmd = '-var-create %s %s * %s' % (self.frame_options(frame), name, expression)
+        self.__cmd(cmd, callback=callback, internal_callback = functools.partial(self.__on_var_created, expression, frame))
+        return name
+    
+    def __on_var_created(self, expression, frame, data):
+        # Created variable info
+        try:
+            type = Type.parse(data.type)
+            numchild = int(data.numchild)
+            name = data.name
+            value = [] if numchild else data.value
+            # Update the model and notify
+            self.vars.add(name, Variable(name, expression, type, children=numchild, data=value, frame=frame))
+            self.post_event(EVT_UPDATE_VARS, [name])
+        except Exception, e:
+            print "Exception creating variable: %s" % e
+            print data
+        
+    def var_delete(self, name, callback=None):
+        return self.__cmd('-var-delete %s' % name, callback, internal_callback=functools.partial(self.__on_var_deleted, name))
+    def __on_var_deleted(self, name, data):
+        self.vars.remove(name)
+        self.post_event(EVT_UPDATE_VARS, [name])
+                
+    
+    def var_update(self, name=None, callback=None):
+        return self.__cmd('-var-update --all-values %s' % (name or '*'), callback=callback, internal_callback = self.__on_var_updated)
+    def __on_var_updated(self, data, notify=True):
+        if hasattr(data,'changelist'):
+            names = [item['name'] for item in data.changelist]
+            data.changed = names
+            for item in data.changelist:
+                if 'value' in item:
+                    self.vars.vars[item['name']].data = item['value']
+                if 'new_type' in item:
+                    self.vars.vars[item['name']].type = Type.parse(item['new_type'])
+                if 'new_num_children' in item:
+                    self.vars.vars[item['name']].children = int(item['new_num_children'])                    
+            if names and notify:
+                self.post_event(EVT_UPDATE_VARS, names)
+                
+    def var_list_children(self, name, callback=None):
+        return self.__cmd('-var-list-children --all-values %s' % name, internal_callback=self.__on_var_list_children, callback=callback)
+    def __on_var_list_children(self, data):
+        kids = []
+        updated_kids =[]
+        for item in data.children:
+            child = item['child']
+            numchild = int(child['numchild'])
+            value = [] if numchild else child['value']
+            type = Type.parse(child['type'])
+            expression = child['exp']
+            name = child['name']
+            parent = GDBVarModel.parent_name(name)
+            if name not in self.vars:
+                self.vars.add(name, Variable(name, expression, type, children=numchild, data=value))
+                updated_kids.append(name)
+            kids.append(name)
+        if parent:
+            self.vars[parent].data = kids
+
+        if updated_kids:
+            self.post_event(EVT_UPDATE_VARS, kids)
+            
+    def var_assign(self, name, value, callback=None):
+        self.memory.invalidate()
+        return self.__cmd('-var-assign %s %s' % (name, value), internal_callback=self.__on_var_assign, callback=callback)
+    def __on_var_assign(self, data):
+        self.memory.invalidate()
+        self.var_update()
+        
+    def stack_list_locals(self, frame=0, thread=None, callback=None):
+        return self.__cmd('-stack-list-locals %s 0' % self.frame_options(frame, thread), callback)
+
+    def stack_list_arguments(self, frame=0, thread=None, callback=None):
+        frame = int(frame)
+        return self.__cmd('-stack-list-arguments %s 0 %d %d' % (self.frame_options(0, thread), frame, frame), callback)
+
+    def stack_list_variables(self, frame=0, thread=None, callback=None):
+        '''
+        List the arguments and locals of a frame in one go.  The result has a variables attribute, a list of
+        {'name' : name} dictionaries, arguments also have an 'arg' item.
+        '''
+        return self.__cmd('-stack-list-variables %s 0' % self.frame_options(frame, thread), callback)
+        
+    def file_list_globals(self, file='', callback=None):
+        return self.__cmd('-symbol-list-variables', callback)
+
+    def target_exec_status(self, callback=None):
+        return self.__cmd('-target-exec-status', callback, internal_callback=self.__on_exec_status)
+        
+    def __on_exec_status(self, data):
+        return
+        print data
+        
+    def data_disassemble(self, start_addr=None, end_addr=None, filename=None, linenum=None, lines=1, mode=0, callback=None):
+        if filename:
+            return self.__cmd('-data-disassemble -f %s -l %s %s %d' % (filename, linenum, lines, mode), callback=callback)
+        else:
+            return self.__cmd('-data-disassemble -s %s -e %s %d' % (start_addr, end_addr, mode), callback=callback)
+            
+    def exec_continue(self, callback=None):
+        return self.__cmd('-exec-continue\n', callback)
+    def exec_step(self, callback=None):
+        return self.__cmd('-exec-step\n', callback)
+    def exec_next(self, callback=None):
+        return self.__cmd('-exec-next\n', callback)
+    def exec_jump(self, address, callback=None):
+        return self.__cmd('-exec-jump %s\n' % address, callback)
+   
+    def exec_finish(self, callback=None):
+        return self.__cmd('-exec-finish %s\n' % self.frame_options(0), callback)
+   
+    def exec_until(self, file, line, callback=None):
+        line = int(line)
+        file = str(file)
+        return self.__cmd('-exec-until "%s:%d"\n' % (file, line), callback)
+
+    def exec_interrupt(self, callable=None):
+        return self.__cmd('-exec-interrupt\n', callable)
+    halt = exec_interrupt
+
+    def exec_next_instruction(self, callable=None):
+        return self.__cmd('-exec-next-instruction\n', callable)
+
+    def exec_step_instruction(self, callable=None):
+        return self.__cmd('-exec-step-instruction\n', callable)
+        
+    def target_download(self, callback=None):
+        # Downloads take as long as they take
+        return self.__cmd('-target-download\n', callback, timeout=None)
+
+    def sig_interrupt(self):
+        self.sigint()
+        
+    def quit(self):
+        return self.__cmd('-gdb-exit\n', internal_callback=self.__on_quit)
+    def __on_quit(self, data):
+        self.subprocess.terminate()
+        
+    
+    def read_memory(self, start_addr, stride, count, callback=None):
+        return self.__cmd('-data-read-memory 0x%x u %d %d 1\n' % (start_addr, stride, count), callback)
+
+    def read_memory_bytes(self, start_addr, count, callback=None):
+        '''
+        Read count bytes of target memory starting at start_addr.  The result passed to the callback
+        has a blocks attribute, a list of MemoryBlock objects for the regions that could be read.
+        '''
+        return self.__cmd('-data-read-memory-bytes 0x%x %d' % (start_addr, count), callback=callback, internal_callback=self.__on_read_memory_bytes)
+    def __on_read_memory_bytes(self, data):
+        data.blocks = []
+        if 'memory' in data:
+            for item in data.memory:
+                data.blocks.append(MemoryBlock.from_hex(int(item['begin'], 16), item['contents']))
+
+    def write_memory_bytes(self, start_addr, data, callback=None):
+        '''
+        Write data (a string or bytearray) to target memory starting at start_addr
+        '''
+        self.memory.invalidate()
+        return self.__cmd('-data-write-memory-bytes 0x%x %s' % (start_addr, binascii.hexlify(str(data))), callback=callback, internal_callback=self.__on_memory_changed)
+        
+    def break_list(self, callback=None):
+        return self.__cmd('-break-list\n', callback)
+
+    def data_list_register_names(self, callback=None):
+        return self.__cmd('-data-list-register-names', internal_callback=self.__on_list_register_names, callback=callback)        
+    def __on_list_register_names(self, data):
+        if 'register-names' in data:
+            self.registers.set_names(data['register-names'])
+
+    def data_list_register_values(self, callback=None, numbers=None, notify=True):
+        '''
+        Fetch register values, either all of them or just the listed register numbers
+        '''
+        numbers = ' '.join([str(n) for n in numbers]) if numbers else ''
+        return self.__cmd('-data-list-register-values r %s' % numbers, internal_callback=functools.partial(self.__on_list_register_values, notify=notify), callback=callback)
+    def __on_list_register_values(self, data, notify=True):
+        if 'register-values' in data:
+            self.registers.clear_changed()
+            for d in data['register-values']:
+                self.registers.set_value_from_number(int(d['number']), d['value'])
+            changed = self.registers.changed_names()
+            data.changed = changed
+            if notify:
+                self.post_event(EVT_UPDATE_REGISTERS, changed)
+
+    def data_list_changed_registers(self, callback=None):
+        '''
+        Ask GDB which registers have changed since it was last asked.  The result has a changed-registers item, a list of register numbers.
+        '''
+        return self.__cmd('-data-list-changed-registers', callback)
+
+    def refresh_registers(self, callback=None, notify=True):
+        '''
+        Bring the register model up to date, according to the register_refresh mode.  In REGISTERS_CHANGED mode, only
+        the registers GDB reports as changed are fetched (unless some registers have never been fetched at all.)
+        Returns a future for the result, which has a changed attribute listing the names of the registers that changed.
+        '''
+        if self.register_refresh == REGISTERS_ALL:
+            return self.data_list_register_values(callback, notify=notify)
+        complete = self.registers.complete
+        def fetch_changed(result):
+            numbers = [int(n) for n in result.get('changed-registers', [])]
+            if not complete:
+                return self.data_list_register_values(notify=notify)
+            if numbers:
+                return self.data_list_register_values(numbers=numbers, notify=notify)
+            self.registers.clear_changed()
+            result.changed = []
+            return result
+        # Always ask, even if we're going to fetch everything, so GDB's idea of what changed starts from here
+        # GDBs that don't know -data-list-changed-registers get everything fetched
+        fetch_all = lambda result : self.data_list_register_values(notify=notify)
+        return self.data_list_changed_registers().then(fetch_changed, fetch_all).add_callback(callback)
+
+    def data_evaluate_expression(self, expression, callback=None):
+        if is_assignment(expression):
+            self.memory.invalidate()
+            return self.__cmd('-data-evaluate-expression "%s"' % expression, callback=callback, internal_callback=self.__on_memory_changed)
+        return self.__cmd('-data-evaluate-expression "%s"' % expression, callback=callback)
+        
+    def break_insert(self, file, line, hardware=False, temporary=False, callback=None):
+        return self.__cmd('-break-insert %s %s %s:%d' % ("-h" if hardware else "", "-t" if temporary else "", os.path.normpath(file), line), callback=callback, internal_callback=self.__update_breakpoints)
+                
+    def break_delete(self, num, callback=None):
+        if isinstance(num, Breakpoint):
+            num = num.number
+        return self.__cmd("-break-delete %d" % int(num), callback, internal_callback=self.__update_breakpoints)
+
+    def break_disable(self, num, callback=None):
+        if isinstance(num, Breakpoint):
+            num = num.number
+        return self.__cmd("-break-disable %d" % int(num), callback, internal_callback=self.__update_breakpoints)
+
+    def break_enable(self, num, callback=None):
+        if isinstance(num, Breakpoint):
+            num = num.number
+        return self.__cmd("-break-enable %d" % int(num), callback, internal_callback=self.__update_breakpoints)
+                
+    def set(self, name, val, callback=None):
+        return self.__cmd("-gdb-set %s=%s" % (name, val), callback)
+    # Set Executable
+    def set_exec(self, file, callback=None):
+        return self.__cmd('-file-exec-and-symbols "%s"\n' % escape(file), callback)
+
+    def environment_cd(self, path, callback=None):
+        return self.__cmd('-environment-cd "%s"\n' % escape(path), callback)
+    cd = environment_cd
+    
+    def OnTerminate(self, *args, **kwargs):
+        self.post_event(EVT_FINISHED)
+
+
+
+class BreakpointTable(object):
+    def __init__(self, parent):
+        self.__data = odict.OrderedDict()
+        self.parent = parent
+        
+    def __setitem__(self, key, val):
+        self.__data[int(key)] = val
+        
+    def __str__(self):
+        return '\n'.join([str(self.__data[num]) for num in sorted(self.__data)])
+        
+    def clear(self):
+        self.__data= odict.OrderedDict()
+    
+    def __iter__(self):
+        return iter([self.__data[key] for key in sorted(self.__data.keys())])
+
+    def remove(self, key):
+        try:
+            del self.__data[key]
+        except:
+            pass
+
+    def compare_paths(self, p1, p2):
+        return os.path.normcase(os.path.normpath(p1)) == os.path.normcase(os.path.normpath(p2))
+    
+    def get_number(self, file, line):
+        for key, breakpoint in self.__data.iteritems():
+            if (breakpoint.line == line) and (self.compare_paths(file, breakpoint.fullname) or self.compare_paths(file, breakpoint.file)): 
+                return key
+        raise KeyError
+                    
+class Breakpoint(object):
+    
+    def __init__(self, number, fullname, file, line, enabled=True, address=None):
+        self.number = number
+        self.line = line
+        self.fullname = fullname
+        self.file = file
+        self.enabled = enabled
+        self.address = address
+        
+    def __str__(self):
+        return "<Breakpoint %s [%02d] %s:%d (%s)>" % ('+' if self.enabled else ' ', self.number, self.fullname, self.line, self.file) 
+        
+if __name__ == "__main__":
+    
+    session = Session()
+    #result = session.parse('*stopped,frame={addr="0x08000252",func="Delay",args=[{name="nCount",value="275526"}],file="main.c",fullname="C:\\Documents and Settings\\Cuttlebug Developer\\My Documents\\projects\\example_projects\\stm32f103\\blink_led/main.c",line="81"},thread-id="1",stopped-threads="all"')
+    #print result.exc
+    #print result
+    
+    test = ('~"Remote debugging using localhost:3333\\n"\r\n=thread-group-created,id="42000"\r\n=thread-created,id="1",group-id="42000"\r\n~"0x08000268 in Delay (nCount=539340) at main.c:80\\n"\r\n~"80\\t  for(; nCount != 0; nCount--) {\\n"\r\n*stopped,frame={addr="0x08000268",func="Delay",args=[{name="nCount",value="539340"}],file="main.c",fullname="C:\\\\Documents and Settings\\\\Cuttlebug Developer\\\\My Documents\\\\projects\\\\example_projects\\\\stm32f103\\\\blink_led/main.c",line="80"},thread-id="1",stopped-threads="all"\r\n2^done\r\n(gdb) \r\n')
+    result = session.parse(test) 
+    print result
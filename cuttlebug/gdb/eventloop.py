@@ -0,0 +1,317 @@
+'''
+Event loop transport for the GDB session.
+
+Instead of a reader thread per output stream, LoopTransport runs GDB as a LoopProcess, whose pipes are watched by a
+single select() based EventLoop.  MI output is framed and parsed on the loop, and so every callback, future and event
+of the session is handled on that one thread, in the order the output arrived.  Commands sent from other threads are
+queued onto the loop, so they go out in the order they were issued.  (asyncio doesn't exist in Python 2, so this is the
+same idea built on select.)
+
+Session commands already return futures, which makes generator based coroutines possible:
+
+    @coroutine
+    def locals_of(session, frame):
+        result = yield session.stack_list_variables(frame)
+        values = yield [session.data_evaluate_expression(v['name']) for v in result.variables]
+        raise Return(dict((v['name'], r.value) for v, r in zip(result.variables, values)))
+
+Yielding a future suspends the coroutine until the result is in; yielding a list of futures waits on all of them.
+A coroutine returns a future itself.  session.commands provides a future returning version of every session command,
+for the few (like var_create) that return something else.
+
+select() can't wait on pipes on Windows.  There, each stream gets a reader thread that does nothing but hand chunks
+over to the loop, so the parsing and callbacks still happen on the loop thread.
+'''
+import os, select, threading, time, heapq, collections, functools, types, logging
+import stream
+from future import Future, gather, completed, error_record
+
+THREADS = 'threads'
+LOOP = 'loop'
+
+class EventLoop(object):
+
+    __default = None
+
+    def __init__(self):
+        self.selectable = os.name != 'nt'
+        self.readers = {}
+        self.ready = collections.deque()
+        self.timers = []
+        self.sequence = 0
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        if self.selectable:
+            self.wake_r, self.wake_w = os.pipe()
+            self.readers[self.wake_r] = self.__drain_wakeup
+
+    @staticmethod
+    def default():
+        '''
+        Return the shared loop, running on a thread of its own
+        '''
+        if EventLoop.__default is None:
+            EventLoop.__default = EventLoop().start()
+        return EventLoop.__default
+
+    def in_loop_thread(self):
+        return threading.currentThread() is self.thread
+
+    def call_soon(self, func, *args):
+        with self.lock:
+            self.ready.append((func, args))
+            self.condition.notify()
+        self.__wakeup()
+
+    def call_later(self, delay, func, *args):
+        with self.lock:
+            self.sequence += 1
+            heapq.heappush(self.timers, (time.time() + delay, self.sequence, func, args))
+            self.condition.notify()
+        self.__wakeup()
+
+    def add_reader(self, fd, callback):
+        with self.lock:
+            self.readers[fd] = callback
+        self.__wakeup()
+
+    def remove_reader(self, fd):
+        with self.lock:
+            self.readers.pop(fd, None)
+
+    def __wakeup(self):
+        if self.selectable and not self.in_loop_thread():
+            os.write(self.wake_w, 'x')
+
+    def __drain_wakeup(self):
+        os.read(self.wake_r, 4096)
+
+    def __timeout(self, limit):
+        # How long to wait for something to happen
+        if self.ready:
+            return 0
+        timeout = limit
+        if self.timers:
+            timeout = max(self.timers[0][0] - time.time(), 0)
+            if limit is not None:
+                timeout = min(timeout, limit)
+        return timeout
+
+    def run_once(self, timeout=None):
+        '''
+        Wait (up to timeout seconds) for something to do, and do it
+        '''
+        with self.lock:
+            timeout = self.__timeout(timeout)
+            readers = dict(self.readers)
+            if not self.selectable and timeout != 0:
+                self.condition.wait(timeout)
+        if self.selectable:
+            try:
+                readable, writable, errors = select.select(readers.keys(), [], [], timeout)
+            except (select.error, OSError), e:
+                logging.getLogger('errors').error("Event loop select failed: %s" % e)
+                readable = []
+            for fd in readable:
+                self.__call(readers[fd])
+
+        now = time.time()
+        with self.lock:
+            while self.timers and self.timers[0][0] <= now:
+                when, sequence, func, args = heapq.heappop(self.timers)
+                self.ready.append((func, args))
+            ready, self.ready = self.ready, collections.deque()
+        for func, args in ready:
+            self.__call(func, *args)
+
+    def __call(self, func, *args):
+        try:
+            func(*args)
+        except Exception, e:
+            logging.getLogger('errors').exception("Exception in event loop callback: %s" % e)
+
+    def run(self):
+        self.thread = threading.currentThread()
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def run_until_complete(self, future, timeout=None):
+        '''
+        Run the loop on this thread until future is resolved, and return its result.  Raises TimeoutError on timeout.
+        '''
+        self.thread = threading.currentThread()
+        deadline = time.time() + timeout if timeout is not None else None
+        while not future.done():
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                break
+            self.run_once(remaining)
+        return future.result(0)
+
+    def start(self):
+        '''
+        Run the loop on a new thread.  Returns the loop.
+        '''
+        worker = threading.Thread(target=self.run)
+        worker.setDaemon(True)
+        self.thread = worker
+        worker.start()
+        return self
+
+    def stop(self):
+        self.call_soon(setattr, self, 'running', False)
+
+class LoopProcess(stream.MIProcess):
+    '''
+    MIProcess whose output is read and handled on an EventLoop, rather than on reader threads
+    '''
+    def __init__(self, loop, cmd, **kwargs):
+        self.loop = loop
+        self.stderr_buffer = ''
+        self.outbox = []
+        self.outbox_lock = threading.Lock()
+        stream.MIProcess.__init__(self, cmd, **kwargs)
+
+    def start_readers(self):
+        if self.loop.selectable:
+            self.loop.add_reader(self.stdout.fileno(), functools.partial(self.__read, self.stdout, self.on_stdout_data))
+            self.loop.add_reader(self.stderr.fileno(), functools.partial(self.__read, self.stderr, self.on_stderr_data))
+        else:
+            for pipe, handler in ((self.stdout, self.on_stdout_data), (self.stderr, self.on_stderr_data)):
+                worker = threading.Thread(target=self.__forward, args=(pipe, handler))
+                worker.setDaemon(True)
+                worker.start()
+
+    def __read(self, pipe, handler):
+        try:
+            data = os.read(pipe.fileno(), stream.CHUNK_SIZE)
+        except (IOError, OSError), e:
+            print e
+            data = ''
+        if not data:
+            self.loop.remove_reader(pipe.fileno())
+        handler(data)
+
+    def __forward(self, pipe, handler):
+        # Windows only: read on this thread, handle on the loop
+        while True:
+            try:
+                data = os.read(pipe.fileno(), stream.CHUNK_SIZE)
+            except (IOError, OSError), e:
+                print e
+                data = ''
+            self.loop.call_soon(handler, data)
+            if not data:
+                break
+
+    def on_stderr_data(self, data):
+        data = self.stderr_buffer + data
+        lines = data.splitlines(True)
+        self.stderr_buffer = lines.pop() if lines and not lines[-1].endswith('\n') and data else ''
+        if self.stderr_func:
+            for line in lines:
+                self.stderr_func(line)
+
+    def send(self, data):
+        # Everything sent during one turn of the loop goes to GDB in a single write, at the start of the next turn
+        with self.outbox_lock:
+            self.outbox.append(data)
+            first = len(self.outbox) == 1
+        if first:
+            self.loop.call_soon(self.__flush_outbox)
+
+    def __flush_outbox(self):
+        with self.outbox_lock:
+            data, self.outbox = ''.join(self.outbox), []
+        if data:
+            self.stdin.write(data)
+
+class LoopTransport(object):
+    '''
+    Runs GDB as a LoopProcess on an event loop (the shared, background loop unless one is given)
+    '''
+    def __init__(self, loop=None):
+        self.loop = loop or EventLoop.default()
+
+    def spawn(self, cmd, start=None, batch=None, stderr=None, end=None):
+        return LoopProcess(self.loop, cmd, start=start, batch=batch, stderr=stderr, end=end)
+
+    def repeat(self, interval, func):
+        def run():
+            if func() is not False:
+                self.loop.call_later(interval, run)
+        self.loop.call_later(interval, run)
+
+TRANSPORTS = {THREADS : stream.ThreadTransport, LOOP : LoopTransport}
+
+def create_transport(kind=THREADS):
+    '''
+    Return a new transport of the specified kind ('threads' or 'loop')
+    '''
+    try:
+        return TRANSPORTS[str(kind).lower()]()
+    except KeyError:
+        raise ValueError("Unknown GDB transport '%s'" % kind)
+
+class Return(Exception):
+    '''
+    Raised by a coroutine to finish with a value (generators can't return one in Python 2)
+    '''
+    def __init__(self, value=None):
+        Exception.__init__(self, value)
+        self.value = value
+
+def coroutine(func):
+    '''
+    Turn a generator function into a coroutine that returns a Future.  The generator yields futures (or lists of them)
+    and is resumed with their results.  Exceptions end the coroutine with an error record.
+    '''
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = Future(func.__name__)
+        generator = func(*args, **kwargs)
+        if not isinstance(generator, types.GeneratorType):
+            result.set_result(generator)
+            return result
+        def step(value):
+            try:
+                yielded = generator.send(value)
+            except Return, e:
+                result.set_result(e.value)
+                return
+            except StopIteration:
+                result.set_result(None)
+                return
+            except Exception, e:
+                logging.getLogger('errors').exception("Exception in coroutine %s: %s" % (func.__name__, e))
+                result.set_result(error_record(str(e)))
+                return
+            if isinstance(yielded, (list, tuple)):
+                yielded = gather(yielded)
+            elif not isinstance(yielded, Future):
+                yielded = completed(yielded)
+            yielded.add_callback(step)
+        step(None)
+        return result
+    return wrapper
+
+class Commands(object):
+    '''
+    Future returning versions of a session's commands: session.commands.var_create('x') returns a future for the
+    -var-create result, where session.var_create('x') returns the variable name.
+    '''
+    def __init__(self, session):
+        self.session = session
+
+    def __getattr__(self, name):
+        method = getattr(self.session, name)
+        def command(*args, **kwargs):
+            result = Future(name)
+            kwargs['callback'] = result.set_result
+            method(*args, **kwargs)
+            return result
+        command.__name__ = name
+        return command
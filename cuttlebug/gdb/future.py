@@ -0,0 +1,139 @@
+'''
+Futures for GDB commands.
+
+Every command sent through the GDB session returns a Future, which is resolved with the command's result record
+when it comes back (or with a synthesized ^error record if the command times out.)  A future can be:
+
+  - waited on:   future.wait(timeout) / future.result(timeout), from any thread except the one delivering results
+  - listened to: future.add_callback(func), func is called with the result record
+  - chained:     future.then(func), func is called with the result when it is not an error, and may itself
+                 return a Future, so that dependent commands can be sequenced without blocking anybody
+
+Error results pass straight through a then() to the end of the chain, unless an errback is provided to handle them.
+'''
+import threading, logging
+from records import GDBMIResultRecord
+
+class TimeoutError(Exception): pass
+
+def is_error(result):
+    return isinstance(result, GDBMIResultRecord) and result.cls == 'error'
+
+def error_record(msg):
+    record = GDBMIResultRecord()
+    record.cls = 'error'
+    record.msg = msg
+    return record
+
+class Future(object):
+
+    def __init__(self, command=None):
+        self.command = command
+        self.__value = None
+        self.__done = threading.Event()
+        self.__callbacks = []
+        self.__lock = threading.Lock()
+
+    def __str__(self):
+        return "<Future '%s' %s>" % (self.command, 'done' if self.done() else 'pending')
+
+    def done(self):
+        return self.__done.isSet()
+
+    def wait(self, timeout=None):
+        '''
+        Block until the future is resolved, or timeout seconds have passed.  Returns True if the future is resolved.
+        Never call this from the thread that delivers GDB output, or from the GUI thread.
+        '''
+        self.__done.wait(timeout)
+        return self.__done.isSet()
+
+    def result(self, timeout=None):
+        '''
+        Return the result, waiting up to timeout seconds for it.  Raises TimeoutError if it doesn't arrive in time.
+        '''
+        if not self.wait(timeout):
+            raise TimeoutError("Timed out waiting for %s" % (self.command or 'result'))
+        return self.__value
+
+    def set_result(self, value):
+        with self.__lock:
+            if self.__done.isSet():
+                return
+            self.__value = value
+            self.__done.set()
+            callbacks, self.__callbacks = self.__callbacks, []
+        for callback in callbacks:
+            self.__call(callback)
+
+    def add_callback(self, callback):
+        '''
+        Call callback with the result once it is available (right away if it is already)  Returns this future.
+        '''
+        if callable(callback):
+            with self.__lock:
+                if not self.__done.isSet():
+                    self.__callbacks.append(callback)
+                    return self
+            self.__call(callback)
+        return self
+
+    def __call(self, callback):
+        try:
+            callback(self.__value)
+        except Exception, e:
+            logging.getLogger('errors').exception("Exception in callback for %s: %s" % (self.command, e))
+
+    def then(self, func, errback=None):
+        '''
+        Return a new future for the result of func(result).  If func returns a Future, the new future is resolved
+        when that one is.  If the result is an error, errback(result) is used instead, or if there is no errback,
+        the error is passed along untouched.
+        '''
+        chained = Future(self.command)
+        def step(value):
+            handler = errback if is_error(value) else func
+            if handler is None:
+                chained.set_result(value)
+                return
+            try:
+                following = handler(value)
+            except Exception, e:
+                logging.getLogger('errors').exception("Exception in chained call after %s: %s" % (self.command, e))
+                following = error_record(str(e))
+            if isinstance(following, Future):
+                following.add_callback(chained.set_result)
+            else:
+                chained.set_result(following)
+        self.add_callback(step)
+        return chained
+
+def completed(value=None):
+    '''
+    Return a future that is already resolved with value
+    '''
+    future = Future()
+    future.set_result(value)
+    return future
+
+def gather(futures):
+    '''
+    Return a future that is resolved with the list of results of all the specified futures, once they are all resolved
+    '''
+    futures = list(futures)
+    combined = Future()
+    results = [None]*len(futures)
+    remaining = [len(futures)]
+    lock = threading.Lock()
+    def resolve(index, value):
+        with lock:
+            results[index] = value
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished:
+            combined.set_result(results)
+    for index, future in enumerate(futures):
+        future.add_callback(lambda value, index=index: resolve(index, value))
+    if not futures:
+        combined.set_result(results)
+    return combined
@@ -1,5 +1,4 @@
-import gdb
-import odict
+from cuttlebug import odict
 
 class ParseError(Exception): pass
 
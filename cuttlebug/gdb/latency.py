@@ -0,0 +1,139 @@
+'''
+How long the commands sent to GDB take, totted up by command verb (-var-update, -data-evaluate-expression ...)
+
+The time each command takes is split into three stages, to tell a slow probe or GDB from a slow Cuttlebug:
+
+    gdb     from sending the command until its result record arrives (the probe, the target and GDB itself)
+    queue   from the result arriving until its callbacks are called (parsing, and waiting behind the other records
+            read along with it)
+    handle  running the callbacks (Cuttlebug's own processing of the result)
+
+Each stage, and the total, is kept as a histogram with fixed buckets, so the stats stay the same size however long the
+session runs.
+'''
+import threading, bisect
+
+STAGES = ('gdb', 'queue', 'handle')
+
+# Upper bounds of the histogram buckets, in seconds.  There's one more bucket on the end for anything slower.
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+def verb(command):
+    '''
+    The verb of a command line: '-var-update --all-values *' -> '-var-update'
+    '''
+    parts = command.split(None, 1)
+    return parts[0] if parts else ''
+
+def format_time(seconds):
+    if seconds < 1.0:
+        return "%.1fms" % (seconds*1000.0)
+    return "%.2fs" % seconds
+
+class Histogram(object):
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0]*(len(buckets)+1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total/self.count if self.count else 0.0
+
+    def percentile(self, p):
+        '''
+        Upper bound of the bucket the p'th percentile (0-100) falls in.  The last bucket has no bound, so that's the max.
+        '''
+        if not self.count:
+            return 0.0
+        target = self.count*p/100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def labels(self):
+        return ["<%s" % format_time(b) for b in self.buckets] + [">%s" % format_time(self.buckets[-1])]
+
+class VerbStats(object):
+
+    def __init__(self, verb):
+        self.verb = verb
+        self.errors = 0
+        self.timeouts = 0
+        self.total = Histogram()
+        self.stages = dict((stage, Histogram()) for stage in STAGES)
+
+    @property
+    def count(self):
+        return self.total.count
+
+    def __str__(self):
+        return "%-32s %6d %8s %8s %8s  (gdb %s, queue %s, handle %s)" % (self.verb, self.count, format_time(self.total.mean), format_time(self.total.percentile(90)),
+                                                                         format_time(self.total.max), format_time(self.stages['gdb'].mean),
+                                                                         format_time(self.stages['queue'].mean), format_time(self.stages['handle'].mean))
+
+class LatencyStats(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.verbs = {}
+
+    def __get(self, command):
+        v = verb(command)
+        if v not in self.verbs:
+            self.verbs[v] = VerbStats(v)
+        return self.verbs[v]
+
+    def record(self, command, sent, received, dispatched, done, error=False):
+        '''
+        Record a completed command: when it was sent, when its result arrived, when its callbacks were called and when they finished
+        '''
+        with self.lock:
+            stats = self.__get(command)
+            stats.total.add(done - sent)
+            stats.stages['gdb'].add(received - sent)
+            stats.stages['queue'].add(max(dispatched - received, 0.0))
+            stats.stages['handle'].add(done - dispatched)
+            if error:
+                stats.errors += 1
+
+    def timed_out(self, command):
+        with self.lock:
+            self.__get(command).timeouts += 1
+
+    def __getitem__(self, verb):
+        return self.verbs[verb]
+
+    def __contains__(self, verb):
+        return verb in self.verbs
+
+    def __len__(self):
+        return len(self.verbs)
+
+    def items(self):
+        '''
+        The stats for each verb, the ones that have taken the most time in total first
+        '''
+        with self.lock:
+            return sorted(self.verbs.values(), key=lambda stats : stats.total.total, reverse=True)
+
+    def clear(self):
+        with self.lock:
+            self.verbs.clear()
+
+    def report(self):
+        lines = ["%-32s %6s %8s %8s %8s" % ('Command', 'Count', 'Mean', '90%', 'Max')]
+        lines.extend(str(stats) for stats in self.items())
+        return '\n'.join(lines)
@@ -0,0 +1,249 @@
+'''
+Live watch: reading target memory while the target runs.
+
+Many probes (OpenOCD, J-Link...) can read memory in the background while the core runs, but GDB only asks them to in
+non-stop mode: in all-stop mode, GDB refuses every command that touches the target until it stops.  So if live watch
+is enabled when the session starts, it asks for non-stop mode before the target is connected to, and if GDB or the
+target can't do that, the session goes back to all-stop mode and turns live watch off (see Session.all_stop.)
+
+A LiveWatch polls the watched ranges of memory every interval seconds for as long as the target runs, and posts
+EVT_LIVE_WATCH with just the cells whose values changed since the last poll.
+
+The polls back off when the link can't keep up: if the reads from one poll haven't all come back by the time the next
+one is due, that poll is skipped and the interval doubled (up to MAX_INTERVAL).  Once polls come back in well under
+the interval, it comes back down to the interval asked for.
+
+Reads that fail don't go to the error log (they're sent quietly, see Session.quiet): the item keeps the error, and a
+poll with any failed reads puts the interval straight up to MAX_INTERVAL.  After MAX_FAILURES failed polls in a row,
+polling stops until the target next runs, with one EVT_ERROR to say so.
+
+    item = session.live.add(0x40010800, 0x1c, owner=self)    # GPIOA, a word at a time
+    session.live.add_expression('counter', owner=self)       # The address and size are looked up with GDB
+'''
+import threading, time, re, functools, binascii
+import future
+
+EVT_LIVE_WATCH = 'live_watch' # data is a list of (LiveItem, [(cell index, value)...]) for the items that changed
+EVT_ERROR = 'error' # The session's (core.EVT_ERROR, which can't be imported from here)
+
+DEFAULT_INTERVAL = 0.2 # seconds
+MAX_INTERVAL = 5.0
+MAX_FAILURES = 3 # Failed polls in a row before polling stops
+
+def unpack(block, address, size):
+    '''
+    The unsigned (little endian) value of size bytes at address in block
+    '''
+    if size in (1, 2, 4):
+        return block.read(address, size)
+    return int(binascii.hexlify(block.view(address, size).tobytes()[::-1]) or '0', 16)
+
+class LiveItem(object):
+    '''
+    A range of memory to watch, split into cells (offset, size) that are compared from one poll to the next.
+    owner and key are for whoever added it, to find their items by.  callback, if there is one, is called with the
+    item and its changed cells after each poll that changes any.
+    '''
+    def __init__(self, address, size, cells=None, cell_size=4, owner=None, key=None, callback=None):
+        self.address = address
+        self.size = size
+        self.cells = cells or [(offset, min(cell_size, size - offset)) for offset in range(0, size, cell_size)]
+        self.owner = owner
+        self.key = key
+        self.callback = callback
+        self.values = [None]*len(self.cells)
+        self.block = None # What was last read
+        self.error = None # Why the last read failed, if it did
+
+    def __repr__(self):
+        return "<LiveItem 0x%08x (%d bytes, %d cells)>" % (self.address, self.size, len(self.cells))
+
+    def update(self, block):
+        '''
+        Take the values of the cells from block, and return (index, value) for the ones that changed
+        '''
+        self.block = block
+        changed = []
+        for i, (offset, size) in enumerate(self.cells):
+            address = self.address + offset
+            if block.contains(address, size):
+                value = unpack(block, address, size)
+                if value != self.values[i]:
+                    self.values[i] = value
+                    changed.append((i, value))
+        return changed
+
+class LiveWatch(object):
+
+    def __init__(self, session, interval=DEFAULT_INTERVAL):
+        self.session = session
+        self.lock = threading.RLock()
+        self.enabled = False
+        self.interval = interval        # How often to poll, as asked for
+        self.current_interval = interval # How often polls are going out, having backed off
+        self.items = []
+        self.addresses = {} # Expression -> (address, size), as looked up by add_expression
+        self.polls = 0
+        self.skipped = 0
+        self.failures = 0         # Failed polls in a row
+        self.__run = 0            # Goes up every time polling starts or stops, so a poll loop can tell it's been stopped
+        self.__due = 0.0
+        self.__outstanding = 0    # Reads from the last poll still to come back
+        self.__sent = 0.0
+        self.__changes = []
+        self.__failed = None      # Why a read from the poll going on failed, if one did
+
+    def __str__(self):
+        return "<LiveWatch %d items, every %.3fs, %d polls, %d skipped>" % (len(self.items), self.current_interval, self.polls, self.skipped)
+
+    @property
+    def running(self):
+        return self.__run % 2 == 1
+
+    def add(self, address, size, cells=None, cell_size=4, owner=None, key=None, callback=None):
+        item = LiveItem(address, size, cells=cells, cell_size=cell_size, owner=owner, key=key, callback=callback)
+        with self.lock:
+            self.items.append(item)
+        return item
+
+    def add_expression(self, expression, owner=None, key=None, callback=None):
+        '''
+        Watch the memory an expression (a variable, array element, struct member...) lives in.  Its address and size are
+        looked up with GDB the first time, which doesn't need the target, so can be done while it runs.  Returns a future
+        for the LiveItem, or for None if the expression has no address.
+        '''
+        if expression in self.addresses:
+            address, size = self.addresses[expression]
+            return future.completed(self.__add_expression(address, size, owner, key, callback))
+        queries = [self.session.data_evaluate_expression('&(%s)' % expression), self.session.data_evaluate_expression('sizeof(%s)' % expression)]
+        return future.gather(queries).then(functools.partial(self.__on_resolved, expression, owner, key, callback))
+
+    def __on_resolved(self, expression, owner, key, callback, results):
+        address, size = results
+        match = re.search(r'0x[0-9a-fA-F]+', getattr(address, 'value', ''))
+        try:
+            size = int(size.value)
+        except (AttributeError, ValueError):
+            return None
+        if not match or size <= 0:
+            return None
+        self.addresses[expression] = (int(match.group(0), 16), size)
+        return self.__add_expression(int(match.group(0), 16), size, owner, key, callback)
+
+    def __add_expression(self, address, size, owner, key, callback):
+        # Scalars are one cell, anything bigger (arrays, structs) is watched a word at a time
+        cells = [(0, size)] if size in (1, 2, 4, 8) else None
+        return self.add(address, size, cells=cells, owner=owner, key=key, callback=callback)
+
+    def remove(self, item):
+        with self.lock:
+            if item in self.items:
+                self.items.remove(item)
+
+    def discard(self, owner):
+        '''
+        Stop watching everything added by owner
+        '''
+        with self.lock:
+            self.items = [item for item in self.items if item.owner is not owner]
+
+    def clear(self):
+        with self.lock:
+            self.items = []
+
+    def start(self):
+        '''
+        Start polling (the session calls this when the target starts running)
+        '''
+        with self.lock:
+            if not self.enabled or self.running:
+                return
+            self.__run += 1
+            run = self.__run
+            self.current_interval = self.interval
+            self.__due = 0.0
+            self.__outstanding = 0
+            self.__changes = []
+            self.__failed = None
+            self.failures = 0
+        self.session.transport.repeat(self.interval, functools.partial(self.__tick, run))
+
+    def stop(self):
+        with self.lock:
+            if self.running:
+                self.__run += 1
+
+    def __tick(self, run):
+        with self.lock:
+            if run != self.__run:
+                return False
+            now = time.time()
+            if now < self.__due:
+                return
+            if self.__outstanding:
+                # The last poll isn't back yet, so the link's saturated: back off
+                self.skipped += 1
+                self.current_interval = min(self.current_interval*2, MAX_INTERVAL)
+                self.__due = now + self.current_interval
+                return
+            self.__due = now + self.current_interval
+        self.poll(run)
+
+    def poll(self, run=None):
+        '''
+        Read everything being watched, once
+        '''
+        with self.lock:
+            run = self.__run if run is None else run
+            items = list(self.items)
+            if not items:
+                return
+            self.polls += 1
+            self.__outstanding = len(items)
+            self.__sent = time.time()
+            self.__changes = []
+            self.__failed = None
+        session = self.session
+        with session.background(), session.quiet(), session.batch():
+            for item in items:
+                session.read_memory_bytes(item.address, item.size, callback=functools.partial(self.__on_read, run, item))
+
+    def __on_read(self, run, item, data):
+        changed = []
+        if getattr(data, 'cls', None) == 'error':
+            item.error = getattr(data, 'msg', None) or "Read failed"
+        else:
+            item.error = None
+            for block in getattr(data, 'blocks', []):
+                changed.extend(item.update(block))
+        with self.lock:
+            if run != self.__run:
+                return
+            if changed:
+                self.__changes.append((item, changed))
+            if item.error:
+                self.__failed = item.error
+            self.__outstanding -= 1
+            if self.__outstanding:
+                return
+            # That's the poll done
+            failed = None
+            if self.__failed:
+                self.failures += 1
+                self.current_interval = MAX_INTERVAL
+                self.__due = time.time() + MAX_INTERVAL
+                if self.failures >= MAX_FAILURES:
+                    failed = self.__failed
+                    self.__run += 1 # Stop polling
+            else:
+                self.failures = 0
+                if time.time() - self.__sent < self.current_interval/2:
+                    self.current_interval = max(self.current_interval/2, self.interval)
+            changes, self.__changes = self.__changes, []
+        if failed:
+            self.session.post_event(EVT_ERROR, "Live watch stopped after %d failed polls in a row: %s" % (self.failures, failed))
+        for item, changed in changes:
+            if item.callback:
+                item.callback(item, changed)
+        if changes:
+            self.session.post_event(EVT_LIVE_WATCH, changes)
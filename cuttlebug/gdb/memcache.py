@@ -0,0 +1,202 @@
+'''
+Session level cache of target memory.
+
+Memory is cached in fixed size pages, with least recently used pages evicted once the cache is full.
+Every cached page belongs to a generation.  The generation is bumped whenever target memory may have changed
+(the target runs or stops, something writes to memory, or a console command is run) which throws away everything cached so far,
+and causes reads that were in flight when the generation changed to be discarded and reissued.
+'''
+import threading, collections, functools, struct
+from models import MemoryBlock, STRUCT_FORMATS
+
+PAGE_SIZE = 256
+MAX_PAGES = 1024
+WORDS = dict((size, struct.Struct('<' + fmt)) for size, fmt in STRUCT_FORMATS.items())
+
+class MemoryRequest(object):
+    def __init__(self, address, size, callback):
+        self.address = address
+        self.size = size
+        self.callback = callback
+        self.waiting = set()
+        self.pages = {} # Page address -> data, as the pages come in
+        self.failed = False
+        self.finished = False
+
+class MemoryCache(object):
+
+    def __init__(self, session, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+        self.session = session
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.lock = threading.RLock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.pages = collections.OrderedDict() # Page address -> bytearray, in least->most recently used order
+        self.pending = {} # Page address -> requests waiting on that page
+
+    def __str__(self):
+        return "<MemoryCache generation=%d %d/%d pages, %d hits, %d misses>" % (self.generation, len(self.pages), self.max_pages, self.hits, self.misses)
+
+    def page_range(self, address, size):
+        '''
+        Return the addresses of all the pages that cover size bytes starting at address
+        '''
+        first = address - (address % self.page_size)
+        return range(first, address + max(size, 1), self.page_size)
+
+    def invalidate(self):
+        '''
+        Discard everything in the cache.  Reads in flight will be reissued when they complete.
+        '''
+        with self.lock:
+            self.generation += 1
+            self.pages.clear()
+
+    def clear(self):
+        with self.lock:
+            self.invalidate()
+            self.pending.clear()
+
+    def peek(self, address, size):
+        '''
+        Return a MemoryBlock for the specified range if it is entirely cached, otherwise None.  Never talks to the target.
+        '''
+        with self.lock:
+            data = bytearray()
+            for page in self.page_range(address, size):
+                if page not in self.pages:
+                    return None
+                data.extend(self.pages[page])
+            first = self.page_range(address, size)[0]
+            return MemoryBlock(address, data[address-first:address-first+size])
+
+    def peek_word(self, address, size):
+        '''
+        Return the unsigned little endian word of the specified size at address if it is cached, otherwise None.  The
+        memory view calls this for every cell it draws, so the word is unpacked straight out of its page.
+        '''
+        offset = address % self.page_size
+        with self.lock:
+            if offset + size > self.page_size: # Straddles two pages
+                block = self.peek(address, size)
+                return block.read(address, size) if block else None
+            data = self.pages.get(address - offset)
+            if data is None or len(data) < offset + size:
+                return None
+            return WORDS[size].unpack_from(buffer(data), offset)[0]
+
+    def read(self, address, size, callback=None):
+        '''
+        Read size bytes starting at address.  The callback is called with a MemoryBlock covering the range,
+        or None if the target memory could not be read.  If everything is cached, the callback is called right away.
+        '''
+        with self.lock:
+            request = MemoryRequest(address, size, callback)
+            for page in self.page_range(address, size):
+                if page in self.pages:
+                    self.pages[page] = request.pages[page] = self.pages.pop(page) # Move to the most recently used end
+                else:
+                    request.waiting.add(page)
+            if not request.waiting:
+                self.hits += 1
+                self.__complete(request)
+                return
+            self.misses += 1
+            to_fetch = []
+            for page in sorted(request.waiting):
+                if page not in self.pending:
+                    self.pending[page] = []
+                    to_fetch.append(page)
+                self.pending[page].append(request)
+            generation = self.generation
+
+        for start, count in self.__runs(to_fetch):
+            # Wait on the future rather than passing a callback: a background read that went stale still resolves it
+            # (with an error), so the requests waiting on it get reissued
+            self.session.read_memory_bytes(start, count*self.page_size).add_callback(functools.partial(self.__on_fetched, generation, start, count))
+
+    def prefetch(self, address, size):
+        '''
+        Pull the specified range into the cache, if the target is halted.
+        '''
+        if not self.session.running:
+            self.read(address, size)
+
+    def __runs(self, pages):
+        # Coalesce sorted page addresses into (start address, page count) runs
+        runs = []
+        for page in pages:
+            if runs and runs[-1][0] + runs[-1][1]*self.page_size == page:
+                runs[-1][1] += 1
+            else:
+                runs.append([page, 1])
+        return runs
+
+    def __on_fetched(self, generation, start, count, result):
+        blocks = result.blocks if hasattr(result, 'blocks') else []
+        pages = range(start, start + count*self.page_size, self.page_size)
+        retry = []
+        done = []
+        with self.lock:
+            stale = generation != self.generation
+            for page in pages:
+                requests = self.pending.pop(page, [])
+                data = None if stale else self.__find_page(blocks, page)
+                if data is not None:
+                    self.pages[page] = data
+                for request in requests:
+                    if request.finished:
+                        continue
+                    if stale:
+                        retry.append(request)
+                    elif data is None:
+                        request.failed = True
+                        done.append(request)
+                    else:
+                        request.pages[page] = data
+                        request.waiting.discard(page)
+                        if request.waiting:
+                            continue
+                        done.append(request)
+                    request.finished = True
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+
+        for request in done:
+            self.__complete(request)
+        with self.session.background():
+            for request in retry:
+                self.read(request.address, request.size, request.callback)
+
+    def fill(self, block):
+        '''
+        Cache the whole pages covered by a block read from the target some other way (see livewatch.py)
+        '''
+        with self.lock:
+            first = block.address + (-block.address % self.page_size)
+            for page in range(first, block.end - self.page_size + 1, self.page_size):
+                offset = page - block.address
+                self.pages.pop(page, None)
+                self.pages[page] = block.data[offset:offset+self.page_size]
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+
+    def __find_page(self, blocks, page):
+        for block in blocks:
+            if block.contains(page, self.page_size):
+                offset = page - block.address
+                return block.data[offset:offset+self.page_size]
+        return None
+
+    def __complete(self, request):
+        # The block is made from the pages the request was given, which may have been evicted or invalidated since
+        if callable(request.callback):
+            block = None
+            if not request.failed:
+                pages = self.page_range(request.address, request.size)
+                data = bytearray().join(request.pages[page] for page in pages)
+                offset = request.address - pages[0]
+                block = MemoryBlock(request.address, data[offset:offset+request.size])
+            request.callback(block)
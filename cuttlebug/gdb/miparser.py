@@ -0,0 +1,172 @@
+'''
+Parsers for GDB/MI output.
+
+MIParser is a hand-written recursive descent parser for the GDB/MI output syntax.  It produces exactly
+the same GDBMIResponse/GDBMIResultRecord/GDBMITuple structures as the ANTLR generated parser (see GDBMI.g)
+but doesn't have to spin up a lexer, token stream and parser for every line that comes out of GDB.
+
+ANTLRParser wraps the generated parser behind the same interface so it can still be selected as a fallback.
+
+Both parsers expose parse(string) which returns a GDBMIResponse, and an error attribute that holds a
+description of the last parse error (or None if the last parse was clean.)
+'''
+import re
+from records import GDBMITuple, GDBMIResultRecord, GDBMIResponse
+
+FAST = 'fast'
+ANTLR = 'antlr'
+
+class MIParseError(Exception): pass
+
+_string = re.compile(r'"((?:[^"\\\r\n]|\\.)*)"')
+_variable = re.compile(r'([A-Za-z_][\w\-]*)=')
+_result_class = re.compile(r'[\w\-]+')
+_token = re.compile(r'[0-9]+')
+
+STREAM_RECORDS = {'~' : 'console', '@' : 'target', '&' : 'log'}
+ASYNC_RECORDS = {'*' : 'exc', '+' : 'status', '=' : 'notify'}
+
+class MIParser(object):
+
+    def __init__(self):
+        self.error = None
+
+    def parse(self, string):
+        '''
+        Parse gdb-mi output, returning a GDBMIResponse object.  Normally this is a single record, but
+        several newline separated records are accepted and merged into the one response.
+        '''
+        self.error = None
+        response = GDBMIResponse()
+        for line in string.splitlines():
+            line = line.strip()
+            if not line or line == '(gdb)':
+                continue
+            try:
+                self.parse_record(line, response)
+            except MIParseError, e:
+                self.error = str(e)
+            except IndexError:
+                self.error = "Unexpected end of record"
+        return response
+
+    def parse_record(self, line, response):
+        c = line[0]
+        if c in STREAM_RECORDS:
+            m = _string.match(line, 1)
+            if not m:
+                raise MIParseError("Malformed stream record")
+            getattr(response, STREAM_RECORDS[c]).append(m.group(1).decode('string_escape'))
+            return
+
+        m = _token.match(line)
+        i = m.end() if m else 0
+        c = line[i]
+        if c == '^':
+            record = self._record(line, i+1)
+            if m:
+                record.token = int(m.group())
+            response.result = record
+        elif c in ASYNC_RECORDS:
+            # The grammar throws away tokens on async records, and so do we
+            setattr(response, ASYNC_RECORDS[c], self._record(line, i+1))
+        else:
+            raise MIParseError("Unknown record type '%s'" % c)
+
+    def _record(self, s, i):
+        record = GDBMIResultRecord()
+        m = _result_class.match(s, i)
+        if not m:
+            raise MIParseError("Expected a result class at column %d" % i)
+        record.cls = m.group()
+        i = m.end()
+        n = len(s)
+        while i < n and s[i] == ',':
+            key, val, i = self._result(s, i+1)
+            record[key] = val
+        if s[i:].strip():
+            raise MIParseError("Unexpected '%s' at column %d" % (s[i], i))
+        return record
+
+    def _result(self, s, i):
+        m = _variable.match(s, i)
+        if not m:
+            raise MIParseError("Expected a variable at column %d" % i)
+        val, i = self._value(s, m.end())
+        return m.group(1), val, i
+
+    def _value(self, s, i):
+        c = s[i]
+        if c == '"':
+            m = _string.match(s, i)
+            if not m:
+                raise MIParseError("Unterminated string at column %d" % i)
+            return m.group(1), m.end()
+        elif c == '{':
+            return self._tuple(s, i+1)
+        elif c == '[':
+            return self._list(s, i+1)
+        raise MIParseError("Expected a value at column %d" % i)
+
+    def _tuple(self, s, i):
+        items = GDBMITuple()
+        if s[i] == '}':
+            return items, i+1
+        while True:
+            key, val, i = self._result(s, i)
+            items[key] = val
+            c = s[i]
+            if c == '}':
+                return items, i+1
+            elif c != ',':
+                raise MIParseError("Expected ',' or '}' at column %d" % i)
+            i += 1
+
+    def _list(self, s, i):
+        items = []
+        if s[i] == ']':
+            return items, i+1
+        results = _variable.match(s, i) is not None
+        while True:
+            if results:
+                key, val, i = self._result(s, i)
+                items.append({key : val})
+            else:
+                val, i = self._value(s, i)
+                items.append(val)
+            c = s[i]
+            if c == ']':
+                return items, i+1
+            elif c != ',':
+                raise MIParseError("Expected ',' or ']' at column %d" % i)
+            i += 1
+
+class ANTLRParser(object):
+
+    def __init__(self):
+        import GDBMILexer, GDBMIParser
+        self.error = None
+        self.__lexer = GDBMILexer.GDBMILexer(None)
+        self.__parser = GDBMIParser.GDBMIParser(None)
+
+    def parse(self, string):
+        import antlr3
+        self.__parser.gdbmi_error = None
+        stream = antlr3.ANTLRStringStream(unicode(string))
+        self.__lexer.setCharStream(stream)
+        tokens = antlr3.CommonTokenStream(self.__lexer)
+        self.__parser.setTokenStream(tokens)
+        output = self.__parser.output().response
+        self.error = self.__parser.gdbmi_error
+        return output
+
+PARSERS = {FAST : MIParser, ANTLR : ANTLRParser}
+
+def create_parser(kind=FAST):
+    '''
+    Return a new parser of the specified kind ('fast' or 'antlr')
+    '''
+    try:
+        return PARSERS[str(kind).lower()]()
+    except KeyError:
+        raise ValueError("Unknown GDB/MI parser '%s'" % kind)
@@ -1,5 +1,5 @@
-from cuttlebug.util import bidict
-import collections
+from cuttlebug.bidict import bidict
+import collections, array, binascii, struct, sys
 
 class ParseError(Exception): pass
 
@@ -142,6 +142,9 @@ class GDBStackFrame(object):
         return str(self)
         
 class GDBRegisterModel(object):
+    '''
+    Register values, by name.  changed is a bitmap of the register numbers whose values changed on the last refresh.
+    '''
     def __init__(self, parent):
         self.parent = parent
         self.set_names([])
@@ -152,6 +155,7 @@ class GDBRegisterModel(object):
     def set_names(self, names): 
         self.__names = list(names)
         self.__values = collections.OrderedDict()
+        self.changed = 0
         for name in self.__names:
             if name:
                 self.__values[name] = None
@@ -160,9 +164,31 @@ class GDBRegisterModel(object):
         return self.__names[int(number)]
 
     def set_value_from_number(self, number, value):
+        '''
+        Set the value of a register, returning True (and setting its bit in the changed bitmap) if the value changed
+        '''
         name = self.get_name_from_number(number)
-        if name:
+        if name and self.__values[name] != value:
             self.__values[name] = value
+            self.changed |= 1 << int(number)
+            return True
+        return False
+
+    def clear_changed(self):
+        self.changed = 0
+
+    def is_changed(self, number):
+        return bool(self.changed & (1 << int(number)))
+
+    def changed_names(self):
+        return [name for number, name in enumerate(self.__names) if name and self.is_changed(number)]
+
+    @property
+    def complete(self):
+        '''
+        True if every register has a value
+        '''
+        return None not in self.__values.itervalues()
 
     def get_value_from_number(self, number):
         name = self.__names[int(number)]
@@ -178,6 +204,61 @@ class GDBRegisterModel(object):
     def iteritems(self):
         return self.__values.iteritems()
     
+WORD_TYPECODES = {1:'B', 2:'H', 4:'I' if array.array('I').itemsize == 4 else 'L'}
+STRUCT_FORMATS = {1:'B', 2:'H', 4:'I'}
+
+class MemoryBlock(object):
+    '''
+    A contiguous block of target memory, stored as raw bytes.
+    Words are only unpacked on demand, either one at a time with read(), or all at once into an array with words()
+    '''
+    def __init__(self, address, data):
+        self.address = int(address)
+        self.data = data if isinstance(data, bytearray) else bytearray(data)
+
+    @staticmethod
+    def from_hex(address, contents):
+        return MemoryBlock(address, bytearray(binascii.unhexlify(contents)))
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def end(self):
+        return self.address + len(self.data)
+
+    def contains(self, address, size=1):
+        return address >= self.address and address + size <= self.end
+
+    def view(self, address=None, size=None):
+        '''
+        Return a memoryview on the data, optionally restricted to size bytes starting at address
+        '''
+        start = 0 if address is None else address - self.address
+        end = len(self.data) if size is None else start + size
+        return memoryview(self.data)[start:end]
+
+    def words(self, size, byteorder='little'):
+        '''
+        Return the contents of this block as an array of unsigned words of the specified size (1, 2 or 4 bytes)
+        '''
+        retval = array.array(WORD_TYPECODES[size])
+        n = len(self.data) - (len(self.data) % size)
+        retval.fromstring(buffer(self.data, 0, n))
+        if size > 1 and byteorder != sys.byteorder:
+            retval.byteswap()
+        return retval
+
+    def read(self, address, size, byteorder='little'):
+        '''
+        Return the unsigned word of the specified size at address
+        '''
+        fmt = ('<' if byteorder == 'little' else '>') + STRUCT_FORMATS[size]
+        return struct.unpack_from(fmt, buffer(self.data), address - self.address)[0]
+
+    def __str__(self):
+        return "<MemoryBlock 0x%08x-0x%08x (%d bytes)>" % (self.address, self.end, len(self.data))
+
 class GDBStackModel(object):
     def __init__(self, parent):
         self.parent = parent
@@ -194,6 +275,8 @@ class GDBStackModel(object):
                 
     def clear(self):
         self.frames = []
+        self.total_depth = None # How many frames the whole stack has (no more than the session's stack_max_depth), if known
+        self.capped = False     # True if the stack may go deeper than total_depth, which stopped at stack_max_depth
             
     def __iter__(self):
         return iter(self.frames)
@@ -206,18 +289,95 @@ class GDBStackModel(object):
     
     @property        
     def top(self):
-        if self.depth:
+        if self.frames:
             return self.frames[0]
     
     @property
     def depth(self):
-        return len(self.frames)
+        return self.total_depth if self.total_depth is not None else len(self.frames)
+
+    @property
+    def exact_depth(self):
+        '''
+        How many frames the whole stack has, or None if that isn't known exactly (it hasn't been asked yet, or the stack
+        goes at least as deep as the session will unwind)
+        '''
+        if self.total_depth is not None and not self.capped:
+            return self.total_depth
+
+    @property
+    def remaining(self):
+        '''
+        How many frames are still to be listed, or None if that isn't known
+        '''
+        if self.total_depth is not None:
+            return max(self.total_depth - len(self.frames), 0)
+
+    @property
+    def complete(self):
+        return self.remaining == 0
+
+    def carry(self, frames, depth):
+        '''
+        Bring the frames listed at the last stop (frames, from a stack depth frames deep) over below the ones listed now,
+        if the outermost frame listed now is the same frame it was then: everything under it is untouched, just further
+        from (or nearer to) the top.  Only done when both depths are known exactly.  Returns how many frames were added.
+        '''
+        if depth is None or self.exact_depth is None or not self.frames:
+            return 0
+        shift = self.exact_depth - depth
+        outermost = self.frames[-1]
+        level = outermost.level - shift
+        if not 0 <= level < len(frames) or frames[level].key != outermost.key or frames[level].addr != outermost.addr:
+            return 0
+        count = 0
+        for frame in frames[level+1:]:
+            if frame.level + shift >= self.exact_depth:
+                break
+            self.add_frame(frame.level + shift, frame.addr, frame.func, frame.file, frame.line)
+            count += 1
+        return count
+
+    def match(self, frames, depth):
+        '''
+        Pair up frames from an earlier stop (outermost first, from a stack depth frames deep) with the ones listed now:
+        by how far they are from the bottom of the stack if both depths are known exactly, otherwise from the top.
+        Returns the frames listed now that the earlier ones still are, in the same order, up to the first that isn't.
+        '''
+        shift = self.exact_depth - depth if depth is not None and self.exact_depth is not None else 0
+        retval = []
+        for frame in frames:
+            level = frame.level + shift
+            if not 0 <= level < len(self.frames) or self.frames[level].key != frame.key:
+                break
+            retval.append(self.frames[level])
+        return retval
     
     def pretty(self):
         retval =''
         for frame in reversed(self):
             retval += ('  '*(len(self)-frame.level)) + str(frame) + "\n"
         return retval
+
+class StopSnapshot(collections.namedtuple('StopSnapshot', 'record frames locals changed_vars changed_registers breakpoints')):
+    '''
+    Everything that gets refreshed when the target stops, gathered up so it can be handed to the views in one go.
+
+    record is the *stopped record (None if the refresh wasn't caused by a stop)
+    frames is a tuple of GDBStackFrames, innermost first
+    locals is a tuple of the locals of the top frame, as listed by -stack-list-locals
+    changed_vars and changed_registers are tuples of the names of the variable objects and registers that changed
+    breakpoints is a tuple of Breakpoints
+    '''
+    __slots__ = ()
+
+    @property
+    def top(self):
+        if self.frames:
+            return self.frames[0]
+
+    def __str__(self):
+        return "<StopSnapshot %d frames, %d locals, %d vars changed, %d registers changed, %d breakpoints>" % (len(self.frames), len(self.locals), len(self.changed_vars), len(self.changed_registers), len(self.breakpoints))
     
 class GDBVarModel(object):
 
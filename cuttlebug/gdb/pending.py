@@ -0,0 +1,120 @@
+'''
+Bookkeeping for commands that have been sent to GDB and are waiting on a result record.
+
+Every tokened command gets an entry in the CommandTable.  The entry is removed when the result with its token
+comes back, or when it has been waiting longer than its timeout.  Nothing else holds on to the callbacks, so
+a command that GDB never answers doesn't keep its callback (and whatever the callback refers to) alive forever.
+
+A command can also have followers: later requests for the same thing that were joined on to it rather than sent
+(see Session.__query.)  They get the same result record, once the command's own callbacks have had it.
+'''
+import threading, time
+from future import Future
+
+DEFAULT_TIMEOUT = 30.0
+
+class PendingCommand(object):
+    def __init__(self, token, command, callback=None, internal_callback=None, timeout=None, lane=None, epoch=None, quiet=False):
+        self.token = token
+        self.command = command
+        self.callback = callback
+        self.internal_callback = internal_callback
+        self.lane = lane    # Which queue the command waits in before it's sent, and the stop it was asked for in
+        self.epoch = epoch  # (see Session.__submit)
+        self.quiet = quiet  # Errors are left to the callbacks (see Session.quiet)
+        self.future = Future(command)
+        self.timeout = timeout
+        self.followers = []
+        self.restart(token)
+
+    def restart(self, token):
+        '''
+        Start the clock (again), for a command that is only being sent now, with the specified token
+        '''
+        self.token = token
+        self.sent = time.time()
+        self.deadline = self.sent + self.timeout if self.timeout else None
+
+    def join(self, callback=None, internal_callback=None, lane=None, epoch=None):
+        '''
+        Share this command's result with another request for the same thing.  Returns a Future for the result.
+        '''
+        follower = PendingCommand(self.token, self.command, callback, internal_callback, lane=lane, epoch=epoch)
+        self.followers.append(follower)
+        return follower.future
+
+    def __str__(self):
+        return "<PendingCommand %d '%s'>" % (self.token, self.command)
+
+class CommandTable(object):
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.commands = {}
+        self.completed = 0
+        self.timed_out = 0
+        self.late = 0
+        self.coalesced = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __contains__(self, token):
+        return token in self.commands
+
+    @property
+    def in_flight(self):
+        return len(self.commands)
+
+    def add(self, token, command, callback=None, internal_callback=None, timeout=-1):
+        '''
+        Start tracking a command.  timeout is in seconds; the default (-1) uses the table's timeout, and None or 0 never times out.
+        '''
+        if timeout == -1:
+            timeout = self.timeout
+        return self.put(PendingCommand(token, command, callback, internal_callback, timeout))
+
+    def put(self, entry):
+        '''
+        Start tracking a command that was created ahead of being sent
+        '''
+        with self.lock:
+            self.commands[entry.token] = entry
+        return entry
+
+    def pop(self, token):
+        '''
+        Stop tracking the command with the specified token, and return it.
+        Returns None if there is no such command, which is the case if it already timed out.
+        '''
+        with self.lock:
+            entry = self.commands.pop(token, None)
+            if entry:
+                self.completed += 1
+            else:
+                self.late += 1
+        return entry
+
+    def expire(self, now=None):
+        '''
+        Stop tracking all the commands whose deadline has passed, and return them, oldest first.
+        '''
+        now = now or time.time()
+        with self.lock:
+            expired = [entry for entry in self.commands.itervalues() if entry.deadline and entry.deadline <= now]
+            for entry in expired:
+                del self.commands[entry.token]
+            self.timed_out += len(expired)
+        return sorted(expired, key=lambda entry : entry.token)
+
+    def clear(self):
+        with self.lock:
+            self.commands.clear()
+
+    def stats(self):
+        return {'in_flight' : self.in_flight, 'completed' : self.completed, 'timed_out' : self.timed_out, 'late' : self.late, 'coalesced' : self.coalesced, 'stale' : self.stale}
+
+    def __str__(self):
+        return "<CommandTable %d in flight, %d completed, %d timed out, %d late, %d coalesced, %d stale>" % (self.in_flight, self.completed, self.timed_out, self.late, self.coalesced, self.stale)
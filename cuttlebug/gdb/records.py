@@ -0,0 +1,36 @@
+'''
+Record types produced by the GDB/MI parsers.
+
+Both the ANTLR generated parser and the hand-written parser in miparser.py build their output
+out of these classes, so anything consuming a parsed response doesn't care which one produced it.
+'''
+DONE = 1
+RUNNING = 2
+ERROR = 3
+CONNECTED = 4
+EXIT = 5
+STOPPED = 6
+
+class GDBMITuple(dict):
+    def __getattr__(self, key):
+        return self[key]
+
+class GDBMIResultRecord(GDBMITuple):
+    def __init__(self):
+        super(GDBMIResultRecord, self).__init__(self)
+        self.token = None
+        self.cls = None
+    def __str__(self):
+        return "<GDBMIRresultRecord token=%s class=%s %s>" % (self.token, self.cls, super(GDBMIResultRecord, self).__str__())
+
+class GDBMIResponse(object):
+    def __init__(self):
+        self.console = []
+        self.target = []
+        self.log = []
+        self.exc = None
+        self.status = None
+        self.notify = None
+        self.result = None
+    def __str__(self):
+        return "<GDBMIResponse console=%s target=%s log=%s result=%s>" % (self.console, self.target, self.log, self.result)
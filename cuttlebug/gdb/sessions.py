@@ -0,0 +1,105 @@
+'''
+Several GDB sessions at once, one for each core or MCU being debugged.
+
+Every session is a complete core.Session: its own GDB process, parser, models, pending commands and event dispatcher.
+Sessions share nothing with each other, so one of them being busy (or hung) doesn't hold up the others.  The
+SessionManager just keeps track of which sessions exist, by name, and which one is active (the one the views show and
+the debug commands go to.)
+
+    sessions = SessionManager()
+    sessions.add('cm4', GDB(cmd='arm-none-eabi-gdb -n -q -i mi'))
+    sessions.add('cm0', GDB(cmd='arm-none-eabi-gdb -n -q -i mi'))
+    sessions.bind(EVT_SESSION_SELECTED, lambda evt : show(sessions[evt.data]))
+    sessions.select('cm0')
+'''
+from core import Dispatcher
+from cuttlebug import odict
+
+# Events (the data is the session name)
+EVT_SESSION_ADDED = 'session_added'
+EVT_SESSION_REMOVED = 'session_removed'
+EVT_SESSION_SELECTED = 'session_selected'
+
+class SessionManager(object):
+
+    def __init__(self, dispatcher=None):
+        self.dispatcher = dispatcher or Dispatcher()
+        self.sessions = odict.OrderedDict()
+        self.__active = None
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions.values())
+
+    def __contains__(self, name):
+        return name in self.sessions
+
+    def __getitem__(self, name):
+        return self.sessions[name]
+
+    @property
+    def names(self):
+        return list(self.sessions.keys())
+
+    @property
+    def active(self):
+        '''
+        The active session, or None if there are no sessions
+        '''
+        return self.sessions.get(self.__active)
+
+    @property
+    def active_name(self):
+        return self.__active
+
+    def name_of(self, session):
+        '''
+        Return the name of the specified session, or None if it isn't one of ours
+        '''
+        for name, s in self.sessions.items():
+            if s is session:
+                return name
+        return None
+
+    def bind(self, event, handler):
+        self.dispatcher.bind(event, handler)
+
+    def unbind(self, event, handler):
+        self.dispatcher.unbind(event, handler)
+
+    def add(self, name, session):
+        '''
+        Add a session under the specified name.  The first session added becomes the active one.  Returns the session.
+        '''
+        if name in self.sessions:
+            raise ValueError("There is already a session called '%s'" % name)
+        self.sessions[name] = session
+        self.dispatcher.post(EVT_SESSION_ADDED, session, name)
+        if self.__active is None:
+            self.select(name)
+        return session
+
+    def remove(self, name):
+        '''
+        Remove the named session and return it.  If it was the active one, the first remaining session becomes active.
+        The session is not stopped; that's up to the caller.
+        '''
+        session = self.sessions.pop(name)
+        self.dispatcher.post(EVT_SESSION_REMOVED, session, name)
+        if name == self.__active:
+            self.__active = None
+            if self.sessions:
+                self.select(self.sessions.keys()[0])
+        return session
+
+    def select(self, name):
+        '''
+        Make the named session the active one
+        '''
+        if name not in self.sessions:
+            raise KeyError("No session called '%s'" % name)
+        if name != self.__active:
+            self.__active = name
+            self.dispatcher.post(EVT_SESSION_SELECTED, self.sessions[name], name)
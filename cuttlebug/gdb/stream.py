@@ -0,0 +1,148 @@
+'''
+Chunked reading of the GDB/MI output stream.
+
+Rather than waking up once per line, the stdout reader pulls whatever is available on the pipe (up to CHUNK_SIZE bytes)
+and splits it into MI records.  Records are handed on in batches: a batch ends at each '(gdb)' prompt, and whatever
+complete records are left at the end of a read are delivered as a batch of their own.  A partial record at the end of a
+read is held until the rest of it arrives.
+'''
+import os, subprocess, threading, time
+
+CHUNK_SIZE = 65536
+PROMPT = '(gdb)'
+
+class MIFramer(object):
+
+    def __init__(self):
+        self.buffer = ''
+
+    def feed(self, data):
+        '''
+        Add data read from the stream, and return a list of the batches of records that are now complete.
+        Each batch is a list of records, each of which is a single line (including its line terminator)
+        '''
+        data = self.buffer + data
+        end = data.rfind('\n') + 1
+        self.buffer = data[end:]
+        batches = []
+        batch = []
+        for line in data[:end].splitlines(True):
+            stripped = line.strip()
+            if stripped == PROMPT:
+                if batch:
+                    batches.append(batch)
+                    batch = []
+            elif stripped:
+                batch.append(line)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def flush(self):
+        '''
+        Return any incomplete record left in the buffer (as a batch) and clear it
+        '''
+        data, self.buffer = self.buffer, ''
+        if data.strip() and data.strip() != PROMPT:
+            return [[data]]
+        return []
+
+class MIProcess(subprocess.Popen):
+    '''
+    Subprocess whose stdout is read in chunks and delivered as batches of MI records.
+
+    start is called once the process has been spawned, batch is called (on the reader thread) with each list of records,
+    stderr is called with each line of standard error and end is called when the stdout stream closes.
+    '''
+    def __init__(self, cmd, start=None, batch=None, stderr=None, end=None, cwd=os.curdir):
+        self.batch_func = batch
+        self.stderr_func = stderr
+        self.end = end
+        self.done = False
+        self.framer = MIFramer()
+        super(MIProcess, self).__init__(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE, cwd=cwd)
+        if start:
+            start()
+        self.start_readers()
+
+    def start_readers(self):
+        self.stdoutworker = threading.Thread(target=self.monitor_stdout)
+        self.stderrworker = threading.Thread(target=self.monitor_stderr)
+        for worker in (self.stdoutworker, self.stderrworker):
+            worker.setDaemon(True)
+            worker.start()
+
+    def send(self, data):
+        self.stdin.write(data)
+
+    def monitor_stdout(self):
+        fd = self.stdout.fileno()
+        while True:
+            try:
+                data = os.read(fd, CHUNK_SIZE)
+            except (IOError, OSError), e:
+                print e
+                data = ''
+            self.on_stdout_data(data)
+            if not data:
+                break
+
+    def on_stdout_data(self, data):
+        '''
+        Handle a chunk of standard output.  An empty chunk means the stream has closed.
+        '''
+        if data:
+            for batch in self.framer.feed(data):
+                self.deliver(batch)
+            return
+        for batch in self.framer.flush():
+            self.deliver(batch)
+        self.done = True
+        if self.end:
+            self.end()
+
+    def deliver(self, batch):
+        if self.batch_func:
+            try:
+                self.batch_func(batch)
+            except Exception, e:
+                print "Exception handling GDB output: %s" % e
+
+    def monitor_stderr(self):
+        while True:
+            try:
+                data = self.stderr.readline()
+            except IOError, e:
+                print e
+                break
+            if not data:
+                break
+            if self.stderr_func:
+                self.stderr_func(data)
+
+    def sigint(self):
+        try:
+            import win32api, win32con
+            win32api.GenerateConsoleCtrlEvent(win32con.CTRL_C_EVENT, self.pid)
+        except:
+            pass
+
+class ThreadTransport(object):
+    '''
+    Runs GDB as an MIProcess, with a reader thread for each of its output streams
+    '''
+    def spawn(self, cmd, start=None, batch=None, stderr=None, end=None):
+        return MIProcess(cmd, start=start, batch=batch, stderr=stderr, end=end)
+
+    def repeat(self, interval, func):
+        '''
+        Call func every interval seconds (on a thread of its own) until it returns False
+        '''
+        def run():
+            while True:
+                time.sleep(interval)
+                if func() is False:
+                    break
+        worker = threading.Thread(target=run)
+        worker.setDaemon(True)
+        worker.start()
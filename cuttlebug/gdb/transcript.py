@@ -0,0 +1,152 @@
+'''
+Recording and replaying GDB/MI traffic.
+
+A Recorder attached to a session writes everything sent to GDB, and every batch of records read back, to a transcript
+file with the time it happened.  The file is a gzipped stream of binary records:
+
+    header:  'CBMI' + version byte
+    record:  kind (1 byte, SENT or RECEIVED), time since the start (8 byte double), length (4 bytes), data
+
+A Replayer feeds a transcript back through a session with no GDB behind it: the recorded commands go into the
+pending command table (so results find their commands, as they did live) and the recorded output is parsed and
+handled, either as fast as possible or at the speed it was recorded.  The parse and dispatch stages are timed
+separately, so a slow session can be recorded once and then profiled offline, over and over.
+'''
+import gzip, struct, threading, time, re
+
+MAGIC = 'CBMI\x01'
+SENT = 0
+RECEIVED = 1
+RECORD_HEADER = struct.Struct('<BdI')
+
+# Commands the replay session sends of its own accord (a *stopped record starts a refresh) are numbered from here,
+# so they can't be mistaken for recorded ones
+REPLAY_TOKEN_BASE = 1 << 24
+
+class TranscriptError(Exception): pass
+
+class Recorder(object):
+    '''
+    Record the MI traffic of a session to a file, until stop() is called
+    '''
+    def __init__(self, session, filename):
+        self.session = session
+        self.filename = filename
+        self.file = gzip.open(filename, 'wb')
+        self.file.write(MAGIC)
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.count = 0
+        session.recorder = self
+
+    def __write(self, kind, data):
+        with self.lock:
+            if self.file:
+                self.file.write(RECORD_HEADER.pack(kind, time.time() - self.start, len(data)) + data)
+                self.count += 1
+
+    def sent(self, data):
+        self.__write(SENT, data)
+
+    def received(self, lines):
+        self.__write(RECEIVED, ''.join(lines))
+
+    def stop(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+        if self.session.recorder is self:
+            self.session.recorder = None
+
+def read_transcript(filename):
+    '''
+    Yield the (kind, time, data) records of a transcript file
+    '''
+    fp = gzip.open(filename, 'rb')
+    try:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise TranscriptError("%s is not an MI transcript" % filename)
+        while True:
+            header = fp.read(RECORD_HEADER.size)
+            if not header:
+                break
+            if len(header) < RECORD_HEADER.size:
+                raise TranscriptError("Truncated record in %s" % filename)
+            kind, when, length = RECORD_HEADER.unpack(header)
+            yield kind, when, fp.read(length)
+    finally:
+        fp.close()
+
+class NullProcess(object):
+    '''
+    Stands in for the GDB process during a replay: whatever the session sends goes nowhere
+    '''
+    def send(self, data):
+        pass
+
+class ReplayStats(object):
+    def __init__(self):
+        self.commands = 0
+        self.batches = 0
+        self.records = 0
+        self.bytes = 0
+        self.parse_time = 0.0
+        self.dispatch_time = 0.0
+        self.wall_time = 0.0
+
+    @property
+    def busy_time(self):
+        return self.parse_time + self.dispatch_time
+
+    def __str__(self):
+        busy = self.busy_time or 1e-9
+        return '\n'.join(["%d commands, %d records in %d batches (%d bytes)" % (self.commands, self.records, self.batches, self.bytes),
+                          "parse    %8.3fs %10.0f records/s" % (self.parse_time, self.records/(self.parse_time or 1e-9)),
+                          "dispatch %8.3fs %10.0f records/s" % (self.dispatch_time, self.records/(self.dispatch_time or 1e-9)),
+                          "total    %8.3fs %10.0f records/s %8.2f MB/s" % (self.busy_time, self.records/busy, self.bytes/busy/(1024*1024)),
+                          "wall     %8.3fs" % self.wall_time])
+
+class Replayer(object):
+    '''
+    Replay a transcript through a session.  The session shouldn't be started; it has no GDB process behind it.
+    '''
+    def __init__(self, filename, session):
+        self.filename = filename
+        self.records = list(read_transcript(filename))
+        self.session = session
+
+    def run(self, realtime=False, speed=1.0):
+        '''
+        Replay the transcript through the session, and return a ReplayStats.  If realtime is True, the records are
+        replayed with the gaps between them as recorded (divided by speed), otherwise as fast as possible.
+        '''
+        session = self.session
+        session.subprocess = NullProcess()
+        session.token = REPLAY_TOKEN_BASE
+        stats = ReplayStats()
+        start = time.time()
+        for kind, when, data in self.records:
+            if realtime:
+                delay = start + when/speed - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            if kind == SENT:
+                match = re.match(r'(\d+)(.*)', data)
+                if match:
+                    session.pending.add(int(match.group(1)), match.group(2).strip(), timeout=None)
+                    stats.commands += 1
+            elif kind == RECEIVED:
+                lines = data.splitlines(True)
+                t0 = time.time()
+                responses = [session.parse(line) for line in lines]
+                t1 = time.time()
+                session.handle_responses(responses)
+                t2 = time.time()
+                stats.parse_time += t1 - t0
+                stats.dispatch_time += t2 - t1
+                stats.batches += 1
+                stats.records += len(lines)
+                stats.bytes += len(data)
+        stats.wall_time = time.time() - start
+        return stats
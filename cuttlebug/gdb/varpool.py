@@ -0,0 +1,138 @@
+'''
+Pool of variable objects for the locals of the frames on the call stack, kept from one stop to the next.
+
+A variable object created in a frame stays bound to that frame, and the -var-update that goes out with every stop
+refreshes it for as long as the frame is there.  So rather than deleting and recreating the variable objects for
+every local whenever the stack changes, they're pooled by (function, depth, expression) - depth being the frame's
+distance from the bottom of the stack, which stays put as frames come and go above it - and reused whenever the
+same local of the same frame is wanted again.  Only the variable objects of frames that have gone are deleted.
+
+The depth from the bottom can only be worked out when the whole depth of the stack is known.  When the stack goes
+deeper than the session will unwind (see Session.stack_max_depth) it isn't, and the pool is bypassed: variable
+objects are created as asked, but not pooled, and whoever asked for them deletes them.
+'''
+import threading, functools
+import future
+
+class VarPool(object):
+
+    def __init__(self, session):
+        self.session = session
+        self.lock = threading.RLock()
+        self.names = {} # (func, depth, expression) -> variable object name
+        self.keys = {}  # variable object name -> (func, depth, expression)
+        self.futures = {} # variable object name -> Future for its -var-create result
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return "<VarPool %d variable objects, %d hits, %d misses>" % (len(self.names), self.hits, self.misses)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.root(name) in self.keys
+
+    @staticmethod
+    def root(name):
+        return name.split('.')[0]
+
+    def frame_key(self, frame):
+        '''
+        (function, depth from the bottom of the stack) for frame, or None if the depth of the stack isn't known exactly
+        '''
+        depth = self.session.stack.exact_depth
+        if depth is not None:
+            return (frame.func, depth - 1 - frame.level)
+
+    def get(self, frame, expression):
+        '''
+        The name of the pooled variable object for expression in frame, or None if there isn't one
+        '''
+        key = self.frame_key(frame)
+        if key is None:
+            return None
+        with self.lock:
+            name = self.names.get(key + (expression,))
+            if name:
+                self.hits += 1
+            return name
+
+    def create(self, frame, expression, name, callback=None):
+        '''
+        Create a variable object called name for expression in frame, and pool it if the frame's depth is known
+        '''
+        key = self.frame_key(frame)
+        if key is None:
+            return self.session.var_create(expression, frame=frame.level, callback=callback, name=name)
+        func, depth = key
+        with self.lock:
+            self.misses += 1
+            old = self.names.get((func, depth, expression))
+            if old:
+                self.keys.pop(old, None)
+            self.names[(func, depth, expression)] = name
+            self.keys[name] = (func, depth, expression)
+            self.futures[name] = created = future.Future(name)
+        self.session.var_create(expression, frame=frame.level, callback=functools.partial(self.__on_created, name, created, callback), name=name)
+        return name
+
+    def __on_created(self, name, created, callback, result):
+        if getattr(result, 'cls', None) == 'error':
+            self.forget(name)
+        if callback:
+            callback(result)
+        created.set_result(result)
+
+    def created(self, name):
+        '''
+        A future for the -var-create result of the pooled variable object name (done already, or still on its way), or
+        None if name isn't pooled
+        '''
+        with self.lock:
+            return self.futures.get(name)
+
+    def forget(self, name):
+        with self.lock:
+            key = self.keys.pop(name, None)
+            self.futures.pop(name, None)
+            if key and self.names.get(key) == name:
+                del self.names[key]
+
+    def holds(self, name, frame):
+        '''
+        True if name is a pooled variable object (or a child of one) that belongs to frame
+        '''
+        with self.lock:
+            key = self.keys.get(self.root(name))
+        return key is not None and key[:2] == self.frame_key(frame)
+
+    def sync(self):
+        '''
+        Delete the variable objects of frames that aren't on the stack any more: those as deep as the stack is now or
+        deeper, and those whose depth is listed with another function in it.  Frames further down than the ones listed
+        are still there.  Returns their names.
+        '''
+        stack = self.session.stack
+        depth = stack.exact_depth
+        if not len(stack) or depth is None:
+            return [] # Can't tell which frames have gone
+        def left(key):
+            func, at = key[:2]
+            level = depth - 1 - at
+            return level < 0 or (level < len(stack) and stack[level].func != func)
+        with self.lock:
+            gone = [name for name, key in self.keys.iteritems() if left(key)]
+            for name in gone:
+                self.names.pop(self.keys.pop(name), None)
+                self.futures.pop(name, None)
+        for name in gone:
+            self.session.var_delete(name)
+        return gone
+
+    def clear(self):
+        with self.lock:
+            self.names.clear()
+            self.keys.clear()
+            self.futures.clear()
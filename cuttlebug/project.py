@@ -6,6 +6,9 @@ from lxml import etree
 
 SIZES = {'byte':1, 'short':2, 'int':4, '1':1,'2':2,'4':4}
 
+# SFRs of a peripheral are read in blocks, as long as the gap between one register and the next is no more than this
+SFR_MAX_GAP = 64
+
 def str2int(s):
     return int(s, 16) if 'x' in s else int(s)
 
@@ -83,8 +86,10 @@ class Target(Group):
             for reg in item.iter('reg'):
                 name, fullname, offset, size = reg.get('name'), reg.get('fullname'), str2int(reg.get('offset')), reg.get('as')
                 size = SIZES.get(size.strip().lower(), 4)
+                # noread marks registers that reading changes (read-to-clear flags, data registers) so the debugger leaves them be
+                permissions = 'w' if (reg.get('noread') or '').strip().lower() in ('1', 'true', 'yes') else 'rw'
                 
-                register = SpecialFunctionRegister(name, fullname, offset, size, 'rw')
+                register = SpecialFunctionRegister(name, fullname, offset, size, permissions)
                 for f in reg.iter('field'):
                     field = Target.__make_a_field(f)
                     register.add_field(field)
@@ -174,6 +179,10 @@ class SpecialFunctionRegister(Register):
     def expression(self):
         size = {1:"unsigned char",2:"unsigned short",4:"unsigned int"}[self.size]
         return "*((%s*)0x%x)" % (size, self.address)
+
+    @property
+    def readable(self):
+        return 'r' in self.permissions
              
     def instantiate(self, base_address):
         sfr = SpecialFunctionRegister(self.name, self.fullname, base_address+self.address, self.size, self.permissions)
@@ -183,6 +192,31 @@ class SpecialFunctionRegister(Register):
     
     def __str__(self):
         return '<SFR name="%s" %s0x%x %d %s>' % (self.name, '' if self.fullname == self.name else 'fullname="%s" ' % self.fullname, self.address, self.size, self.permissions)
+
+def sfr_blocks(registers, all_registers=None, max_gap=SFR_MAX_GAP):
+    '''
+    Group SFRs into blocks that can each be fetched with a single memory read.  Returns a list of (address, size, registers).
+    Registers that can't be read are left out, and no block spans a gap of more than max_gap bytes, or one of the
+    registers that can't be read out of all_registers (the whole peripheral, say, not just the registers wanted).
+    '''
+    unreadable = [(r.address, r.address + r.size) for r in (all_registers or registers) if not r.readable]
+    blocks = []
+    members = []
+    for register in sorted(registers, key=lambda r : r.address):
+        if not register.readable:
+            continue
+        if members:
+            stop = register.address + register.size
+            if register.address - end > max_gap or any(a < stop and b > end for a, b in unreadable):
+                blocks.append((start, end - start, members))
+                members = []
+        if not members:
+            start = end = register.address
+        members.append(register)
+        end = max(end, register.address + register.size)
+    if members:
+        blocks.append((start, end - start, members))
+    return blocks
             
 class Project(util.Category):
 
@@ -215,6 +249,7 @@ class Project(util.Category):
         debug.add_item("pre_download_cmd", "")
         debug.add_item("download_cmd","")
         debug.add_item("reset_cmd", "monitor reset halt")
+        debug.add_item("sessions", []) # More targets to debug at once, each a dict of debug/program settings and a name
         
         # Program
         program = self.add_category('program')
@@ -0,0 +1,292 @@
+'''
+Time series of watched values, for plotting.
+
+The sampler keeps a Series for each watch expression it's given values for: a ring buffer of (time, value) samples in
+two arrays of doubles, so a series costs 16 bytes a sample however long the session runs, and once it has
+capacity samples in it, each new sample overwrites the oldest.  Values come from the runtime view's watches, when the
+target halts and, if live watch is on, while it runs.
+
+A plot can't show millions of samples, and doesn't need to: decimate() boils a series down to the min and max of each
+of a fixed number of buckets, which draws the same as the whole series would.  So that doesn't cost more the more
+history there is, each series also keeps the min and max of every FANOUT samples, of every FANOUT of those, and so
+on, kept up to date as samples are added; a bucket's min and max come from a few slices of those, whatever its size.
+
+Series can be exported as CSV (series,time,value rows) or in a compact binary format:
+
+    header:  'CBTS' + version byte
+    series:  name length (2 bytes), name, sample count (4 bytes), times (8 byte doubles), values (8 byte doubles)
+
+all little endian.
+'''
+import sys, array, struct, threading, time, re, collections
+from bisect import bisect_left, bisect_right
+
+CAPACITY = 1 << 20 # Samples kept per series
+FANOUT = 16        # Samples (or blocks) summed up by each block of the level above
+
+MAGIC = 'CBTS\x01'
+NAME_HEADER = struct.Struct('<H')
+COUNT_HEADER = struct.Struct('<I')
+BIG_ENDIAN = sys.byteorder == 'big'
+
+class SamplerError(Exception): pass
+
+number = re.compile(r'^\s*([-+]?(0x[0-9a-fA-F]+|[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?))')
+def to_number(value):
+    '''
+    The number in a value as GDB formats it ('42', '0x1f', '-3.5', "65 'A'"...), or None if it isn't one
+    '''
+    if isinstance(value, (int, long, float)):
+        return float(value)
+    match = number.match(str(value))
+    if not match:
+        return None
+    text = match.group(1)
+    try:
+        return float(int(text, 16)) if 'x' in text.lower() else float(text)
+    except ValueError:
+        return None
+
+class Ring(object):
+    '''
+    The samples in a ring buffer array, oldest first, without copying them (for bisect)
+    '''
+    def __init__(self, data, offset, length):
+        self.data = data
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        return self.data[(self.offset + i) % len(self.data)]
+
+class Series(object):
+
+    def __init__(self, name, capacity=CAPACITY):
+        self.name = name
+        self.capacity = capacity
+        self.times = array.array('d')
+        self.values = array.array('d')
+        self.head = 0 # How many samples have ever been added
+        self.lock = threading.Lock()
+        # (mins, maxes) of every FANOUT values, every FANOUT of those... by where they are in the arrays (see decimate)
+        self.levels = []
+        size = FANOUT
+        while size < capacity:
+            self.levels.append((array.array('d'), array.array('d')))
+            size *= FANOUT
+
+    def __len__(self):
+        return min(self.head, self.capacity)
+
+    def __repr__(self):
+        return "<Series %s %d samples>" % (self.name, len(self))
+
+    @property
+    def dropped(self):
+        return self.head - len(self)
+
+    def add(self, value, t=None):
+        t = time.time() if t is None else t
+        with self.lock:
+            if self.head < self.capacity:
+                self.times.append(t)
+                self.values.append(value)
+            else:
+                i = self.head % self.capacity
+                self.times[i] = t
+                self.values[i] = value
+            self.__summarize(self.head % self.capacity)
+            self.head += 1
+
+    def __summarize(self, i):
+        # Bring the blocks covering the value at i up to date
+        mins, maxes = self.values, self.values
+        for level_mins, level_maxes in self.levels:
+            i //= FANOUT
+            low, high = min(mins[i*FANOUT:(i+1)*FANOUT]), max(maxes[i*FANOUT:(i+1)*FANOUT])
+            if i == len(level_mins):
+                level_mins.append(low)
+                level_maxes.append(high)
+            else:
+                level_mins[i] = low
+                level_maxes[i] = high
+            mins, maxes = level_mins, level_maxes
+
+    def __extent(self, i, j):
+        # The min and max of the values at i up to j in the arrays, from as high up the levels as they can be had
+        lows, highs = [], []
+        mins, maxes = self.values, self.values
+        level = 0
+        while i < j:
+            if j - i <= 2*FANOUT or level == len(self.levels):
+                lows.append(min(mins[i:j]))
+                highs.append(max(maxes[i:j]))
+                break
+            first, last = -(-i // FANOUT)*FANOUT, j // FANOUT * FANOUT
+            if i < first:
+                lows.append(min(mins[i:first]))
+                highs.append(max(maxes[i:first]))
+            if last < j:
+                lows.append(min(mins[last:j]))
+                highs.append(max(maxes[last:j]))
+            i, j = first // FANOUT, last // FANOUT
+            mins, maxes = self.levels[level]
+            level += 1
+        return min(lows), max(highs)
+
+    def samples(self):
+        '''
+        Copies of the times and values, oldest first
+        '''
+        with self.lock:
+            if self.head <= self.capacity:
+                return self.times[:], self.values[:]
+            i = self.head % self.capacity
+            return self.times[i:] + self.times[:i], self.values[i:] + self.values[:i]
+
+    @property
+    def first(self):
+        with self.lock:
+            if self.head:
+                i = self.head % self.capacity if self.head > self.capacity else 0
+                return self.times[i], self.values[i]
+
+    @property
+    def last(self):
+        with self.lock:
+            if self.head:
+                i = (self.head - 1) % self.capacity
+                return self.times[i], self.values[i]
+
+    def decimate(self, buckets, start=None, end=None):
+        '''
+        Boil the samples between times start and end (all of them, by default) down to at most the specified number of
+        buckets.  Returns a list of (time, min, max), one for each bucket, time being that of its first sample.
+        '''
+        with self.lock:
+            n = len(self)
+            offset = self.head % self.capacity if self.head > self.capacity else 0
+            times, values = Ring(self.times, offset, n), Ring(self.values, offset, n)
+            lo = 0 if start is None else bisect_left(times, start)
+            hi = n if end is None else bisect_right(times, end)
+            if hi <= lo:
+                return []
+            if hi - lo <= buckets:
+                return [(times[i], values[i], values[i]) for i in xrange(lo, hi)]
+            retval = []
+            step = float(hi - lo)/buckets
+            for b in xrange(buckets):
+                i, j = lo + int(b*step), lo + int((b+1)*step)
+                if j > i:
+                    # Where the bucket is in the arrays: in one piece, or in two if it goes round the end
+                    i, j = (offset + i) % self.capacity, (offset + i) % self.capacity + (j - i)
+                    if j <= self.capacity:
+                        low, high = self.__extent(i, j)
+                    else:
+                        (low1, high1), (low2, high2) = self.__extent(i, self.capacity), self.__extent(0, j - self.capacity)
+                        low, high = min(low1, low2), max(high1, high2)
+                    retval.append((self.times[i], low, high))
+            return retval
+
+class Sampler(object):
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.series = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.series
+
+    def __getitem__(self, name):
+        return self.series[name]
+
+    def __len__(self):
+        return len(self.series)
+
+    def names(self):
+        return list(self.series)
+
+    def record(self, name, value, t=None):
+        '''
+        Add a sample to the named series (making it if it's new) if value is a number.  Returns True if it was.
+        '''
+        value = to_number(value)
+        if value is None:
+            return False
+        with self.lock:
+            if name not in self.series:
+                self.series[name] = Series(name, self.capacity)
+            series = self.series[name]
+        series.add(value, t)
+        return True
+
+    def remove(self, name):
+        with self.lock:
+            self.series.pop(name, None)
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def __selected(self, names):
+        return [self.series[name] for name in (self.names() if names is None else names) if name in self.series]
+
+    def export_csv(self, filename, names=None):
+        fp = open(filename, 'w')
+        try:
+            fp.write('series,time,value\n')
+            for series in self.__selected(names):
+                times, values = series.samples()
+                name = '"%s"' % series.name.replace('"', '""')
+                fp.write(''.join('%s,%.6f,%r\n' % (name, t, v) for t, v in zip(times, values)))
+        finally:
+            fp.close()
+
+    def export_binary(self, filename, names=None):
+        fp = open(filename, 'wb')
+        try:
+            fp.write(MAGIC)
+            for series in self.__selected(names):
+                times, values = series.samples()
+                if BIG_ENDIAN: # Arrays are written in the machine's byte order
+                    times.byteswap()
+                    values.byteswap()
+                fp.write(NAME_HEADER.pack(len(series.name)) + series.name)
+                fp.write(COUNT_HEADER.pack(len(times)))
+                times.tofile(fp)
+                values.tofile(fp)
+        finally:
+            fp.close()
+
+def read_binary(filename):
+    '''
+    Read a file written by Sampler.export_binary, returning an ordered dict of name -> (times, values)
+    '''
+    retval = collections.OrderedDict()
+    fp = open(filename, 'rb')
+    try:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise SamplerError("%s is not a sample file" % filename)
+        while True:
+            header = fp.read(NAME_HEADER.size)
+            if not header:
+                break
+            name = fp.read(NAME_HEADER.unpack(header)[0])
+            count = COUNT_HEADER.unpack(fp.read(COUNT_HEADER.size))[0]
+            times, values = array.array('d'), array.array('d')
+            try:
+                times.fromfile(fp, count)
+                values.fromfile(fp, count)
+            except EOFError:
+                raise SamplerError("Truncated series %s in %s" % (name, filename))
+            if BIG_ENDIAN:
+                times.byteswap()
+                values.byteswap()
+            retval[name] = (times, values)
+    finally:
+        fp.close()
+    return retval
@@ -76,6 +76,13 @@ class Settings(util.Category):
         debug.add_item('jump_to_exec_location', False)
         debug.add_item('run_after_download', False)
         debug.add_item('load_after_build', 'no')
+        debug.add_item('mi_parser', 'fast')
+        debug.add_item('command_timeout', 30)
+        debug.add_item('transport', 'threads')
+        debug.add_item('stack_page', 16)
+        debug.add_item('stack_max_depth', 256)
+        debug.add_item('live_watch', False)
+        debug.add_item('live_watch_interval', 200)
         
     @staticmethod
     def load(filename):
@@ -151,6 +158,13 @@ class SettingsDialog(OptionsDialog):
         debug_panel.add("Running", "Jump to Execution Location on HALT", CheckboxWidget, key="debug.jump_to_exec_location")
         debug_panel.add("Running", "Run After Download", CheckboxWidget, key="debug.run_after_download")
         debug_panel.add("Running", "Download After Successful Build", ComboBoxWidget(debug_panel, choices=['Yes', 'No', 'Prompt']), key="debug.load_after_build")
+        debug_panel.add("GDB", "GDB/MI Parser", ComboBoxWidget(debug_panel, choices=['fast', 'antlr']), key="debug.mi_parser")
+        debug_panel.add("GDB", "Command Timeout (s, 0 waits forever)", SpinWidget(debug_panel, range=(0, 3600)), key="debug.command_timeout")
+        debug_panel.add("GDB", "GDB Output Handling", ComboBoxWidget(debug_panel, choices=['threads', 'loop']), key="debug.transport")
+        debug_panel.add("Call Stack", "Frames Listed at a Time", SpinWidget, key="debug.stack_page")
+        debug_panel.add("Call Stack", "Maximum Depth", SpinWidget, key="debug.stack_max_depth")
+        debug_panel.add("Live Watch", "Read Memory While Running", CheckboxWidget, key="debug.live_watch", label_on_right=True)
+        debug_panel.add("Live Watch", "Poll Interval (ms)", SpinWidget, key="debug.live_watch_interval")
         
         self.add_panel(editor_panel, icon='style.png')
         self.add_panel(cursor_panel, parent=editor_panel, icon='textfield_rename.png')
@@ -0,0 +1,65 @@
+'''
+Benchmark the GDB/MI parsers against recorded MI traffic.
+
+Usage: python bench_mi_parser.py [traffic_file] [iterations]
+
+Each parser is fed the traffic a line at a time, the same way GDB.on_stdout does it ('(gdb)' prompts are dropped.)
+The outputs of the two parsers are also compared, so this doubles as a check that the fast parser agrees with the grammar.
+'''
+import os, sys, time
+from cuttlebug.gdb import miparser
+
+DEFAULT_TRAFFIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mi_traffic.txt')
+
+def load_traffic(filename):
+    lines = []
+    for line in open(filename, 'rb'):
+        if line.strip() and line.strip() != '(gdb)':
+            lines.append(line)
+    return lines
+
+def flatten(response):
+    records = [(r.token, r.cls, dict(r)) if r is not None else None for r in (response.result, response.exc, response.status, response.notify)]
+    return (response.console, response.target, response.log, records)
+
+def run(parser, lines, iterations):
+    parse = parser.parse
+    start = time.time()
+    for i in xrange(iterations):
+        for line in lines:
+            parse(line)
+    return time.time() - start
+
+def compare(lines, a, b):
+    mismatches = 0
+    for line in lines:
+        if flatten(a.parse(line)) != flatten(b.parse(line)):
+            mismatches += 1
+            print "MISMATCH: %s" % line.strip()
+    return mismatches
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TRAFFIC
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    lines = load_traffic(filename)
+    nbytes = sum(len(line) for line in lines)
+    print "%d records (%d bytes) x %d iterations" % (len(lines), nbytes, iterations)
+
+    parsers = [miparser.FAST]
+    try:
+        miparser.create_parser(miparser.ANTLR)
+        parsers.append(miparser.ANTLR)
+    except ImportError, e:
+        print "ANTLR parser unavailable (%s), benchmarking the fast parser only." % e
+
+    times = {}
+    for kind in parsers:
+        elapsed = run(miparser.create_parser(kind), lines, iterations)
+        times[kind] = elapsed
+        n = len(lines)*iterations
+        print "%-6s %8.3fs %10.0f records/s %8.2f MB/s" % (kind, elapsed, n/elapsed, (nbytes*iterations)/elapsed/(1024*1024))
+
+    if miparser.ANTLR in times:
+        print "speedup: %.1fx" % (times[miparser.ANTLR]/times[miparser.FAST])
+        mismatches = compare(lines, miparser.create_parser(miparser.FAST), miparser.create_parser(miparser.ANTLR))
+        print "%d of %d records parsed differently" % (mismatches, len(lines))
@@ -0,0 +1,503 @@
+'''
+A stand-in for GDB and a halted target, speaking enough GDB/MI for the commands the GDB session sends.
+
+Usage: python fake_gdb.py [options] [-n -q -i mi]
+
+The GDB flags are accepted and ignored, so the script can be used as a project's GDB executable, or spawned with
+Session(cmd='python fake_gdb.py --latency 5').  Nothing about the target is real: memory is a set of regions filled
+with a pattern, the registers and locals take new values at every stop, and the call stack is as deep as it's told to
+be.  A continue runs until it's interrupted, or (if there are breakpoints) for --run-time seconds and then stops at
+the first enabled breakpoint.
+
+Options:
+  --memory BASE:SIZE   a region of readable/writable memory (may be repeated, default 0x20000000:0x10000 and
+                       0x40000000:0x1000)
+  --registers N        number of registers (default 17, r0-r12 sp lr pc xpsr)
+  --stack-depth N      number of frames on the call stack (default 4)
+  --locals N           number of locals in each frame (default 4)
+  --latency MS         time to wait before each response (default 0)
+  --jitter MS          extra random wait before each response, up to this much (default 0)
+  --run-time S         how long a continue runs before it hits a breakpoint (default 0.1)
+  --seed N             seed for the random parts (default 0)
+'''
+import sys, os, re, time, random, threading, binascii, optparse
+
+ARM_REGISTERS = ['r0', 'r1', 'r2', 'r3', 'r4', 'r5', 'r6', 'r7', 'r8', 'r9', 'r10', 'r11', 'r12', 'sp', 'lr', 'pc', 'xpsr']
+PC_BASE = 0x08000200
+DEFAULT_MEMORY = ['0x20000000:0x10000', '0x40000000:0x1000']
+
+class Result(object):
+    '''
+    A name=value pair inside an MI list, like the frame={...} items of stack=[...]
+    '''
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+def quote(s):
+    return '"%s"' % str(s).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def mi(value):
+    '''
+    Format a Python value as an MI value: strings and numbers are c-strings, dicts are tuples, lists are lists
+    '''
+    if isinstance(value, dict):
+        return '{%s}' % ','.join('%s=%s' % (k, mi(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return '[%s]' % ','.join(mi(v) for v in value)
+    if isinstance(value, Result):
+        return '%s=%s' % (value.name, mi(value.value))
+    return quote(value)
+
+def results(pairs):
+    return ''.join(',%s=%s' % (k, mi(v)) for k, v in pairs)
+
+class MIError(Exception): pass
+
+class FakeTarget(object):
+
+    def __init__(self, options):
+        self.options = options
+        self.random = random.Random(options.seed)
+        self.memory = []
+        for spec in options.memory or DEFAULT_MEMORY:
+            base, size = [int(x, 0) for x in spec.split(':')]
+            self.memory.append((base, bytearray((i*7 + (base >> 8)) & 0xff for i in xrange(size))))
+        n = options.registers
+        self.register_names = (ARM_REGISTERS + ['x%d' % i for i in range(max(n - len(ARM_REGISTERS), 0))])[:n]
+        self.registers = [self.random.randint(0, 0xffff) for name in self.register_names]
+        self.changed_registers = set(range(n))
+        self.stops = 0
+        self.running = False
+        self.run_timer = None
+        self.breakpoints = {}
+        self.next_breakpoint = 1
+        self.hit = None # The breakpoint we're stopped at
+        self.vars = {}
+        self.var_values = {}
+        self.assigned = {}
+        self.directory = os.getcwd()
+        self.lock = threading.RLock()
+        self.stop(None)
+
+    # Output
+    def write(self, *lines):
+        with self.lock:
+            for line in lines:
+                sys.stdout.write(line + '\n')
+            sys.stdout.write('(gdb) \n')
+            sys.stdout.flush()
+
+    def delay(self):
+        wait = self.options.latency + (self.random.uniform(0, self.options.jitter) if self.options.jitter else 0)
+        if wait:
+            time.sleep(wait/1000.0)
+
+    # Target state
+    @property
+    def pc(self):
+        return self.register('pc', PC_BASE + 4*self.stops)
+
+    def register(self, name, default=0):
+        if name in self.register_names:
+            return self.registers[self.register_names.index(name)]
+        return default
+
+    def stop(self, reason='end-stepping-range', breakpoint=None):
+        '''
+        Move the target on to its next stop: new pc, line, register and local values
+        '''
+        self.running = False
+        self.hit = breakpoint
+        self.stops += 1
+        changed = set()
+        for i, name in enumerate(self.register_names):
+            if name == 'pc':
+                value = PC_BASE + 4*self.stops
+            elif i < 4 or name == 'xpsr':
+                value = self.random.randint(0, 0xffffffff)
+            else:
+                continue
+            if value != self.registers[i]:
+                self.registers[i] = value
+                changed.add(i)
+        self.changed_registers |= changed
+        if reason:
+            pairs = [('bkptno', breakpoint['number'])] if breakpoint else []
+            self.write('*stopped,reason=%s%s,thread-id="1",stopped-threads="all"' % (quote(reason), results(pairs + [('frame', self.frame(0))])))
+
+    def frames(self, low=0, high=None):
+        depth = self.options.stack_depth
+        high = depth - 1 if high is None else min(high, depth - 1)
+        return [self.frame(level) for level in range(low, high + 1)]
+
+    def frame(self, level):
+        bottom = level == self.options.stack_depth - 1
+        line = 20 + self.stops % 40 if level == 0 else 100 + level
+        frame = {'level' : level,
+                 'addr' : '0x%08x' % (self.pc if level == 0 else PC_BASE + 0x100*level),
+                 'func' : 'main' if bottom else 'func%d' % level,
+                 'file' : 'main.c',
+                 'fullname' : os.path.join(self.directory, 'main.c'),
+                 'line' : line}
+        if level == 0 and self.hit:
+            frame.update((key, self.hit[key]) for key in ('file', 'fullname', 'line'))
+        return frame
+
+    def local_names(self):
+        return ['local%d' % i for i in range(self.options.locals)]
+
+    def value_of(self, expression, level=0):
+        expression = expression.strip()
+        if expression in self.assigned:
+            return self.assigned[expression]
+        if expression.startswith('$'):
+            return str(self.register(expression[1:]))
+        if expression.startswith('*'):
+            try:
+                return str(self.read_word(int(expression.strip('*() '), 0)))
+            except (ValueError, MIError):
+                raise MIError("Cannot access memory at address %s" % expression[1:])
+        try:
+            return str(int(expression, 0))
+        except ValueError:
+            pass
+        # Locals of the top frame change at every stop, everything else stays put
+        stops = self.stops if level == 0 else 0
+        return str((hash(expression) + 31*level + 17*stops) % 1000)
+
+    def read(self, address, count):
+        '''
+        Return (address, bytes) blocks for the parts of the range that are inside a memory region
+        '''
+        blocks = []
+        for base, data in self.memory:
+            start, end = max(address, base), min(address + count, base + len(data))
+            if start < end:
+                blocks.append((start, data[start - base:end - base]))
+        return blocks
+
+    def read_word(self, address):
+        blocks = self.read(address, 4)
+        if not blocks or len(blocks[0][1]) < 4:
+            raise MIError("Cannot access memory at address 0x%x" % address)
+        data = blocks[0][1]
+        return data[0] | data[1] << 8 | data[2] << 16 | data[3] << 24
+
+    def write_memory(self, address, data):
+        for base, region in self.memory:
+            if base <= address and address + len(data) <= base + len(region):
+                region[address - base:address - base + len(data)] = data
+                return
+        raise MIError("Cannot access memory at address 0x%x" % address)
+
+    # Command dispatch
+    def handle(self, line):
+        match = re.match(r'(\d*)(-?)(\S+)\s*(.*)', line.strip())
+        if not match:
+            return
+        token, dash, command, args = match.groups()
+        self.delay()
+        if not dash:
+            return self.respond(token, 'error', [('msg', 'Undefined command: "%s".' % command)])
+        handler = getattr(self, 'cmd_' + command.replace('-', '_'), None)
+        if not handler:
+            return self.respond(token, 'error', [('msg', 'Undefined MI command: %s' % command)])
+        # Frame and thread options just pick the frame to look at
+        level = 0
+        options = re.match(r'((?:--(?:thread|frame) \S+\s*)*)(.*)', args)
+        frame_option = re.search(r'--frame (\d+)', options.group(1))
+        if frame_option:
+            level = int(frame_option.group(1))
+        try:
+            with self.lock:
+                response = handler(token, options.group(2).strip(), level)
+        except MIError, e:
+            response = self.respond(token, 'error', [('msg', str(e))])
+        except Exception, e:
+            response = self.respond(token, 'error', [('msg', '%s: %s' % (e.__class__.__name__, e))])
+        return response
+
+    def respond(self, token, cls, pairs=(), *after):
+        self.write(*(('%s^%s%s' % (token, cls, results(pairs)),) + after))
+        return cls
+
+    def done(self, token, *pairs):
+        return self.respond(token, 'done', pairs)
+
+    def run(self, token, reason='end-stepping-range'):
+        '''
+        Resume the target.  With a reason, it stops again right away, for that reason.
+        '''
+        if self.running:
+            raise MIError("Cannot execute this command while the target is running.")
+        self.running = True
+        self.respond(token, 'running', (), '*running,thread-id="all"')
+        if reason:
+            self.stop(reason)
+        elif [bp for bp in self.breakpoints.values() if bp['enabled'] == 'y']:
+            self.run_timer = threading.Timer(self.options.run_time, self.hit_breakpoint)
+            self.run_timer.start()
+        return 'running'
+
+    def hit_breakpoint(self):
+        with self.lock:
+            enabled = [self.breakpoints[n] for n in sorted(self.breakpoints) if self.breakpoints[n]['enabled'] == 'y']
+            if self.running and enabled:
+                self.stop('breakpoint-hit', enabled[0])
+
+    # Console commands
+    def cmd_interpreter_exec(self, token, args, level):
+        command = args.split(None, 1)[1].strip('"') if ' ' in args else ''
+        self.done(token)
+        if command.startswith('target '):
+            self.stop('signal-received')
+        return 'done'
+
+    # Setup
+    def cmd_gdb_set(self, token, args, level):
+        name, sep, value = args.partition('=')
+        if name.strip() == '$pc':
+            self.assigned['$pc'] = value.strip()
+        return self.done(token)
+
+    def cmd_gdb_exit(self, token, args, level):
+        self.write('%s^exit' % token)
+        sys.exit(0)
+
+    def cmd_environment_cd(self, token, args, level):
+        self.directory = args.strip('"')
+        return self.done(token)
+
+    def cmd_file_exec_and_symbols(self, token, args, level):
+        return self.done(token)
+
+    def cmd_target_download(self, token, args, level):
+        self.write('+download,{section=".text",section-size="4096",total-size="8192"}')
+        return self.done(token, ('address', '0x08000000'), ('load-size', '8192'), ('transfer-rate', '65536'), ('write-rate', '512'))
+
+    def cmd_target_exec_status(self, token, args, level):
+        return self.done(token, ('status', 'running' if self.running else 'stopped'))
+
+    # Execution
+    def cmd_exec_continue(self, token, args, level):
+        return self.run(token, None)
+
+    def cmd_exec_interrupt(self, token, args, level):
+        if not self.running:
+            return self.done(token)
+        if self.run_timer:
+            self.run_timer.cancel()
+        self.done(token)
+        self.stop('signal-received')
+        return 'done'
+
+    def cmd_exec_step(self, token, args, level):
+        return self.run(token)
+    cmd_exec_next = cmd_exec_step_instruction = cmd_exec_next_instruction = cmd_exec_until = cmd_exec_jump = cmd_exec_step
+
+    def cmd_exec_finish(self, token, args, level):
+        return self.run(token, 'function-finished')
+
+    # Stack
+    def cmd_stack_info_depth(self, token, args, level):
+        parts = args.split()
+        depth = min(self.options.stack_depth, int(parts[-1])) if parts and parts[-1].isdigit() else self.options.stack_depth
+        return self.done(token, ('depth', depth))
+
+    def cmd_stack_list_frames(self, token, args, level):
+        bounds = [int(x) for x in args.split()]
+        frames = self.frames(*bounds) if len(bounds) == 2 else self.frames()
+        return self.done(token, ('stack', [Result('frame', f) for f in frames]))
+
+    def cmd_stack_select_frame(self, token, args, level):
+        return self.done(token)
+
+    def cmd_stack_list_locals(self, token, args, level):
+        return self.done(token, ('locals', self.variables(level, args, arguments=False)))
+
+    def cmd_stack_list_variables(self, token, args, level):
+        return self.done(token, ('variables', self.variables(level, args)))
+
+    def cmd_stack_list_arguments(self, token, args, level):
+        parts = args.split()
+        low, high = (int(parts[1]), int(parts[2])) if len(parts) == 3 else (0, self.options.stack_depth - 1)
+        frames = [Result('frame', {'level' : l, 'args' : [{'name' : 'arg0'}]}) for l in range(low, min(high, self.options.stack_depth - 1) + 1)]
+        return self.done(token, ('stack-args', frames))
+
+    def variables(self, level, args, arguments=True):
+        with_values = args.split()[:1] in (['1'], ['--all-values'])
+        items = [{'name' : 'arg0', 'arg' : '1'}] if arguments else []
+        items += [{'name' : name} for name in self.local_names()]
+        if with_values:
+            for item in items:
+                item['value'] = self.value_of(item['name'], level)
+        return items
+
+    # Variable objects
+    def cmd_var_create(self, token, args, level):
+        name, frame, expression = args.split(None, 2)
+        if name == '-':
+            name = 'var%d' % (len(self.vars) + 1)
+        self.vars[name] = (expression, level)
+        value = self.value_of(expression, level)
+        self.var_values[name] = value
+        return self.done(token, ('name', name), ('numchild', '0'), ('value', value), ('type', 'int'), ('thread-id', '1'), ('has_more', '0'))
+
+    def cmd_var_delete(self, token, args, level):
+        name = args.split()[-1]
+        if name not in self.vars:
+            raise MIError("Variable object not found")
+        del self.vars[name]
+        self.var_values.pop(name, None)
+        return self.done(token, ('ndeleted', '1'))
+
+    def cmd_var_update(self, token, args, level):
+        name = args.split()[-1]
+        names = self.vars.keys() if name == '*' else [name]
+        changes = []
+        for name in names:
+            expression, level = self.vars[name]
+            value = self.value_of(expression, level)
+            if value != self.var_values.get(name):
+                self.var_values[name] = value
+                changes.append({'name' : name, 'value' : value, 'in_scope' : 'true', 'type_changed' : 'false', 'has_more' : '0'})
+        return self.done(token, ('changelist', changes))
+
+    def cmd_var_list_children(self, token, args, level):
+        return self.done(token, ('numchild', '0'), ('children', []), ('has_more', '0'))
+
+    def cmd_var_assign(self, token, args, level):
+        name, value = args.split(None, 1)
+        expression, level = self.vars[name]
+        self.assigned[expression] = value
+        return self.done(token, ('value', value))
+
+    def cmd_var_evaluate_expression(self, token, args, level):
+        expression, level = self.vars[args.split()[-1]]
+        return self.done(token, ('value', self.value_of(expression, level)))
+
+    # Data
+    def cmd_data_evaluate_expression(self, token, args, level):
+        expression = args.strip('"')
+        if re.search(r'(^|[^=!<>])=($|[^=])', expression):
+            name, value = expression.split('=', 1)
+            self.assigned[name.strip()] = value.strip()
+            return self.done(token, ('value', value.strip()))
+        return self.done(token, ('value', self.value_of(expression, level)))
+
+    def cmd_data_list_register_names(self, token, args, level):
+        return self.done(token, ('register-names', self.register_names))
+
+    def cmd_data_list_register_values(self, token, args, level):
+        parts = args.split()
+        numbers = [int(n) for n in parts[1:]] or range(len(self.register_names))
+        values = [{'number' : n, 'value' : str(self.registers[n])} for n in numbers if n < len(self.registers)]
+        return self.done(token, ('register-values', values))
+
+    def cmd_data_list_changed_registers(self, token, args, level):
+        changed, self.changed_registers = sorted(self.changed_registers), set()
+        return self.done(token, ('changed-registers', [str(n) for n in changed]))
+
+    def cmd_data_read_memory_bytes(self, token, args, level):
+        address, count = args.split()[-2:]
+        address, count = int(address, 0), int(count, 0)
+        blocks = self.read(address, count)
+        if not blocks:
+            raise MIError("Unable to read memory.")
+        memory = [{'begin' : '0x%08x' % start, 'offset' : '0x%08x' % (start - address), 'end' : '0x%08x' % (start + len(data)), 'contents' : binascii.hexlify(str(data))} for start, data in blocks]
+        return self.done(token, ('memory', memory))
+
+    def cmd_data_read_memory(self, token, args, level):
+        address, fmt, size, rows, cols = args.split()[-5:]
+        address, size, rows, cols = int(address, 0), int(size), int(rows), int(cols)
+        memory = []
+        for row in range(rows):
+            row_address = address + row*size*cols
+            data = []
+            for col in range(cols):
+                blocks = self.read(row_address + col*size, size)
+                if not blocks or len(blocks[0][1]) < size:
+                    raise MIError("Unable to read memory.")
+                data.append(str(sum(b << (8*i) for i, b in enumerate(blocks[0][1]))))
+            memory.append({'addr' : '0x%08x' % row_address, 'data' : data})
+        total = size*rows*cols
+        return self.done(token, ('addr', '0x%08x' % address), ('nr-bytes', total), ('total-bytes', total),
+                         ('next-row', '0x%08x' % (address + size*cols)), ('prev-row', '0x%08x' % (address - size*cols)),
+                         ('next-page', '0x%08x' % (address + total)), ('prev-page', '0x%08x' % (address - total)), ('memory', memory))
+
+    def cmd_data_write_memory_bytes(self, token, args, level):
+        address, contents = args.split()[:2]
+        self.write_memory(int(address, 0), bytearray(binascii.unhexlify(contents)))
+        return self.done(token)
+
+    def cmd_data_disassemble(self, token, args, level):
+        instructions = [{'address' : '0x%08x' % (self.pc + offset), 'func-name' : 'func0', 'offset' : str(offset + 8), 'inst' : 'nop'} for offset in range(-8, 10, 2)]
+        return self.done(token, ('asm_insns', instructions))
+
+    def cmd_symbol_list_variables(self, token, args, level):
+        return self.done(token, ('symbols', []))
+
+    # Breakpoints
+    def cmd_break_insert(self, token, args, level):
+        location = args.split()[-1]
+        file, sep, line = location.rpartition(':')
+        number = self.next_breakpoint
+        self.next_breakpoint += 1
+        self.breakpoints[number] = {'number' : number, 'type' : 'hw breakpoint' if '-h' in args.split() else 'breakpoint',
+                                    'disp' : 'del' if '-t' in args.split() else 'keep', 'enabled' : 'y',
+                                    'addr' : '0x%08x' % (PC_BASE + 2*int(line or 0)), 'func' : 'func0', 'file' : os.path.basename(file),
+                                    'fullname' : os.path.join(self.directory, file), 'line' : line, 'times' : '0'}
+        return self.done(token, ('bkpt', self.breakpoints[number]))
+
+    def breakpoint(self, args):
+        number = int(args.split()[0])
+        if number not in self.breakpoints:
+            raise MIError("No breakpoint number %d." % number)
+        return number
+
+    def cmd_break_delete(self, token, args, level):
+        del self.breakpoints[self.breakpoint(args)]
+        return self.done(token)
+
+    def cmd_break_enable(self, token, args, level):
+        self.breakpoints[self.breakpoint(args)]['enabled'] = 'y'
+        return self.done(token)
+
+    def cmd_break_disable(self, token, args, level):
+        self.breakpoints[self.breakpoint(args)]['enabled'] = 'n'
+        return self.done(token)
+
+    def cmd_break_list(self, token, args, level):
+        body = [Result('bkpt', self.breakpoints[n]) for n in sorted(self.breakpoints)]
+        table = {'nr_rows' : len(body), 'nr_cols' : 6, 'hdr' : [], 'body' : body}
+        return self.done(token, ('BreakpointTable', table))
+
+def parse_options(argv):
+    parser = optparse.OptionParser(usage="python fake_gdb.py [options]")
+    parser.add_option('--memory', action='append', help="BASE:SIZE of a memory region")
+    parser.add_option('--registers', type='int', default=len(ARM_REGISTERS))
+    parser.add_option('--stack-depth', type='int', default=4)
+    parser.add_option('--locals', type='int', default=4)
+    parser.add_option('--latency', type='float', default=0.0, help="milliseconds")
+    parser.add_option('--jitter', type='float', default=0.0, help="milliseconds")
+    parser.add_option('--run-time', type='float', default=0.1, help="seconds")
+    parser.add_option('--seed', type='int', default=0)
+    # GDB's own flags
+    parser.add_option('-n', action='store_true')
+    parser.add_option('-q', action='store_true')
+    parser.add_option('-i', dest='interpreter')
+    options, args = parser.parse_args(argv)
+    return options
+
+def main(argv):
+    target = FakeTarget(parse_options(argv))
+    target.write() # The first prompt
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        target.handle(line)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
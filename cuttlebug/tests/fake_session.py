@@ -0,0 +1,75 @@
+'''
+A GDB session for the unit tests that runs no GDB at all.
+
+HeadlessSession is a real core.Session, but the process it writes to is a FakeProcess, which keeps what it's sent (one
+command to a line) in sent, and its transport is a ManualTransport, whose repeating calls (command expiry, live watch
+polling) are only made when the test calls tick().  GDB's side of the conversation is played by the test, by handing
+the session the records it would have read with on_stdout_batch().
+'''
+import binascii
+from cuttlebug.gdb import core
+
+class FakeProcess(object):
+    '''
+    Stands in for the GDB process (like transcript.NullProcess), keeping what is sent to it
+    '''
+    def __init__(self):
+        self.writes = [] # Everything sent, as it was written
+        self.sent = []   # The same, a command at a time
+
+    def send(self, data):
+        self.writes.append(data)
+        self.sent.extend(data.splitlines(True))
+
+    def terminate(self):
+        pass
+
+class ManualTransport(object):
+    '''
+    Transport that "spawns" a FakeProcess, and whose repeating calls are made by the test, by calling tick()
+    '''
+    def __init__(self):
+        self.process = FakeProcess()
+        self.repeating = []
+
+    def spawn(self, cmd, **callbacks):
+        return self.process
+
+    def repeat(self, interval, func):
+        self.repeating.append(func)
+
+    def tick(self):
+        self.repeating = [func for func in self.repeating if func() is not False]
+
+class HeadlessSession(core.Session):
+    '''
+    Session that writes to a FakeProcess rather than a GDB process, whether or not it has been started
+    '''
+    def __init__(self, **kwargs):
+        kwargs.setdefault('transport', ManualTransport())
+        core.Session.__init__(self, **kwargs)
+        self.subprocess = self.transport.process
+
+    @property
+    def sent(self):
+        return self.subprocess.sent
+
+    def sent_token(self, index=-1):
+        '''
+        The token of a command sent, the last one by default
+        '''
+        return int(self.sent[index].split('-')[0])
+
+    def answer_memory(self, token, address, data):
+        '''
+        Answer a -data-read-memory-bytes with data
+        '''
+        self.on_stdout_batch(['%d^done,memory=[{begin="0x%08x",offset="0x00000000",end="0x%08x",contents="%s"}]\n' % (token, address, address+len(data), binascii.hexlify(data))])
+
+    def stop_in(self, *funcs):
+        '''
+        Answer a -stack-list-frames with a stack of funcs, innermost first
+        '''
+        self.stack_list_frames()
+        frames = ','.join('frame={level="%d",addr="0x%08x",func="%s"}' % (level, 0x08000000+level, func) for level, func in enumerate(funcs))
+        self.on_stdout_batch(['%d^done,stack=[%s]\n' % (self.sent_token(), frames)])
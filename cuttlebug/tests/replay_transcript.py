@@ -0,0 +1,23 @@
+'''
+Replay a recorded MI transcript (see gdb/transcript.py) through a headless session and report how long it took.
+
+Usage: python replay_transcript.py transcript [--realtime] [--speed N] [--parser fast|antlr]
+
+Without --realtime the transcript is replayed as fast as possible, which is what you want for measuring the parse and
+dispatch stages.  With it, the records arrive with the gaps between them as recorded, which is closer to what the
+session sees live (and is the way to reproduce problems with timing.)
+'''
+import optparse
+from cuttlebug.gdb import core, miparser, transcript
+
+if __name__ == "__main__":
+    parser = optparse.OptionParser(usage="%prog transcript [options]")
+    parser.add_option('--realtime', action='store_true', default=False, help="Replay at the recorded speed")
+    parser.add_option('--speed', type='float', default=1.0, help="Speed up (or slow down) a realtime replay by this factor")
+    parser.add_option('--parser', default=miparser.FAST, help="MI parser to use (fast or antlr)")
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error("Which transcript?")
+    replayer = transcript.Replayer(args[0], core.Session(parser=options.parser))
+    print "%s: %d records" % (args[0], len(replayer.records))
+    print replayer.run(realtime=options.realtime, speed=options.speed)
@@ -0,0 +1,194 @@
+import unittest
+from cuttlebug.gdb import core
+from fake_session import HeadlessSession
+
+class DispatcherTest(unittest.TestCase):
+
+    def test_bind_and_post(self):
+        dispatcher = core.Dispatcher()
+        events = []
+        handler = lambda evt : events.append((evt.type, evt.data))
+        dispatcher.bind(core.EVT_STOPPED, handler)
+        dispatcher.post(core.EVT_STOPPED, None, 'data')
+        dispatcher.post(core.EVT_RUNNING, None)
+        dispatcher.unbind(core.EVT_STOPPED, handler)
+        dispatcher.post(core.EVT_STOPPED, None)
+        self.assertEqual(events, [(core.EVT_STOPPED, 'data')])
+
+class SessionTest(unittest.TestCase):
+
+    def test_command_future(self):
+        session = HeadlessSession()
+        future = session.data_evaluate_expression('counter')
+        self.assertEqual(session.sent, ['1-data-evaluate-expression "counter"\n'])
+        session.on_stdout_batch(['1^done,value="42"\n'])
+        self.assertEqual(future.result(0).value, '42')
+        self.assertEqual(len(session.pending), 0)
+
+    def test_stop_snapshot(self):
+        session = HeadlessSession()
+        snapshots = []
+        session.bind(core.EVT_SNAPSHOT, lambda evt : snapshots.append(evt.data))
+        session.on_stdout_batch(['*stopped,frame={addr="0x08000268",func="Delay",file="main.c",fullname="/main.c",line="80"},thread-id="1"\n'])
+        self.assertEqual(session.state, core.STOPPED)
+        self.assertEqual(session.thread_id, '1')
+        tokens = [int(cmd.split('-')[0]) for cmd in session.sent]
+        session.on_stdout_batch(['%d^done,BreakpointTable={body=[]}\n' % tokens[0],
+                                 '%d^done,stack=[frame={level="0",addr="0x08000268",func="Delay",file="main.c",fullname="/main.c",line="80"}]\n' % tokens[1],
+                                 '%d^done,depth="1"\n' % tokens[2],
+                                 '%d^done,locals=[{name="nCount"}]\n' % tokens[3],
+                                 '%d^done,changelist=[]\n' % tokens[4],
+                                 '%d^done,changed-registers=[]\n' % tokens[5]])
+        self.assertEqual(len(snapshots), 1)
+        self.assertEqual(snapshots[0].top.func, 'Delay')
+        self.assertTrue(session.stack.complete)
+        self.assertEqual(snapshots[0].locals, ({'name' : 'nCount'},))
+
+class CoalescingTest(unittest.TestCase):
+
+    def test_bulk_breakpoints(self):
+        session = HeadlessSession()
+        inserted = [session.break_insert('main.c', line) for line in range(10, 60)]
+        # The inserts go out a window at a time
+        self.assertEqual(len(session.sent), session.window)
+        answered = 0
+        while answered < 50:
+            batch = session.sent[answered:]
+            answered += len(batch)
+            session.on_stdout_batch(['%s^done,bkpt={number="%s"}\n' % (cmd.split('-')[0], cmd.split('-')[0]) for cmd in batch])
+        # One -break-list for the lot, sent once all the inserts were done
+        self.assertEqual(session.sent[50:], ['51-break-list\n'])
+        self.assertEqual(session.pending.coalesced, 49)
+        session.on_stdout_batch(['51^done,BreakpointTable={body=[bkpt={number="1",addr="0x08000268",enabled="y",file="main.c",fullname="/main.c",line="10"}]}\n'])
+        self.assertEqual(len(session.pending), 0)
+        self.assertEqual([bp.line for bp in session.breakpoints], [10])
+        self.assertTrue(all(f.done() for f in inserted))
+
+    def test_join_in_flight(self):
+        session = HeadlessSession()
+        first = session.var_update()
+        second = session.var_update()
+        self.assertEqual(session.sent, ['1-var-update --all-values *\n'])
+        session.var_assign('var1', '3')
+        third = session.var_update()
+        # The assignment might change the answer, so this one can't share the first query
+        self.assertEqual(len(session.sent), 2)
+        session.on_stdout_batch(['1^done,changelist=[]\n', '2^done,value="3"\n'])
+        self.assertTrue(first.done() and second.done() and not third.done())
+        self.assertEqual(session.sent[2:], ['3-var-update --all-values *\n'])
+
+class BatchTest(unittest.TestCase):
+
+    def test_batch(self):
+        session = HeadlessSession()
+        writes = session.subprocess.writes
+        with session.batch():
+            session.data_evaluate_expression('a')
+            with session.batch():
+                session.data_evaluate_expression('b')
+            self.assertEqual(writes, [])
+        self.assertEqual(writes, ['1-data-evaluate-expression "a"\n2-data-evaluate-expression "b"\n'])
+        self.assertEqual(len(session.pending), 2)
+        session.data_evaluate_expression('c')
+        self.assertEqual(writes[-1], '3-data-evaluate-expression "c"\n')
+
+    def test_snapshot_is_one_write(self):
+        session = HeadlessSession()
+        writes = session.subprocess.writes
+        session.update()
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(writes[0].count('\n'), 6)
+
+def frames(low, high):
+    return 'stack=[%s]' % ','.join('frame={level="%d",addr="0x%08x",func="f%d"}' % (level, 0x08000000+level, level) for level in range(low, high+1))
+
+class PagedStackTest(unittest.TestCase):
+
+    def test_paged_stack(self):
+        session = HeadlessSession()
+        session.stack_page = 4
+        session.stack_max_depth = 10
+        session.update()
+        self.assertEqual(session.sent[1:3], ['2-stack-list-frames 0 3\n', '3-stack-info-depth 10\n'])
+        session.on_stdout_batch(['2^done,%s\n' % frames(0, 3), '3^done,depth="10"\n'])
+        self.assertEqual((len(session.stack), session.stack.depth, session.stack.remaining), (4, 10, 6))
+        updates = []
+        session.bind(core.EVT_UPDATE_STACK, lambda evt : updates.append(len(evt.data)))
+        session.stack_list_more()
+        # Asking again while the page is on its way doesn't ask GDB twice
+        session.stack_list_more()
+        self.assertEqual(session.sent[-1], '7-stack-list-frames 4 7\n')
+        session.on_stdout_batch(['7^done,%s\n' % frames(4, 7)])
+        session.stack_list_more()
+        # The last page stops at the maximum depth
+        self.assertEqual(session.sent[-1], '8-stack-list-frames 8 9\n')
+        session.on_stdout_batch(['8^done,%s\n' % frames(8, 9)])
+        self.assertEqual(updates, [8, 10])
+        self.assertTrue(session.stack.complete)
+        self.assertEqual(session.stack_list_more(), None)
+        self.assertEqual([frame.level for frame in session.stack], range(10))
+
+    def test_deep_stack_kept_across_stops(self):
+        # Frames are named for how far they are from the bottom of the stack, so the same frame has the same name
+        def listing(depth, low, high):
+            return 'stack=[%s]' % ','.join('frame={level="%d",addr="0x%08x",func="f%d"}' % (level, 0x08000000+depth-level, depth-1-level) for level in range(low, high+1))
+        def stop(depth):
+            session.update()
+            token = lambda command : [line.split('-')[0] for line in session.sent if command in line][-1]
+            session.on_stdout_batch(['%s^done,%s\n' % (token('stack-list-frames 0 '), listing(depth, 0, 3)), '%s^done,depth="%d"\n' % (token('stack-info-depth'), depth)])
+        session = HeadlessSession()
+        session.stack_page = 4
+        session.stack_max_depth = 20
+        stop(10)
+        session.stack_list_more()
+        session.on_stdout_batch(['%d^done,%s\n' % (session.sent_token(), listing(10, 4, 7))])
+        shown = list(reversed(session.stack)) # As the runtime view shows them, outermost first
+        # Step into a call: the frames listed by stack_list_more are still listed, one further down
+        stop(11)
+        self.assertEqual([frame.func for frame in session.stack], ['f%d' % i for i in range(10, 1, -1)])
+        self.assertEqual(session.stack.match(shown, 10), list(reversed(session.stack))[:-1])
+        shown = list(reversed(session.stack))
+        # And back out of it
+        stop(10)
+        self.assertEqual([frame.func for frame in session.stack], ['f%d' % i for i in range(9, 1, -1)])
+        self.assertEqual(session.stack.match(shown, 11), list(reversed(session.stack)))
+        # Without the depths to go by, frames are matched from the top of the stack
+        self.assertEqual(session.stack.match(shown, None), [])
+
+    def test_short_stack(self):
+        session = HeadlessSession()
+        session.stack_list_frames()
+        session.on_stdout_batch(['1^done,%s\n' % frames(0, 2)])
+        self.assertTrue(session.stack.complete)
+        self.assertEqual(session.stack_list_more(), None)
+
+class PriorityTest(unittest.TestCase):
+
+    def test_exec_jumps_the_queue(self):
+        session = HeadlessSession()
+        with session.background():
+            for address in range(0x20000000, 0x20000400, 0x40):
+                session.read_memory_bytes(address, 0x40)
+        self.assertEqual(len(session.sent), session.window)
+        session.exec_step()
+        self.assertEqual(session.sent[-1], '%d-exec-step\n' % (session.window+1))
+        session.data_evaluate_expression('x')
+        session.on_stdout_batch(['1^done,memory=[]\n'])
+        # The user's command goes ahead of the background reads still waiting
+        self.assertEqual(session.sent[-1], '%d-data-evaluate-expression "x"\n' % (session.window+2))
+
+    def test_stale_results_are_dropped(self):
+        session = HeadlessSession()
+        values = []
+        with session.background():
+            hover = session.data_evaluate_expression('x', callback=values.append)
+        session.on_stdout_batch(['*running,thread-id="all"\n', '1^done,value="1"\n'])
+        self.assertEqual(values, [])
+        self.assertEqual(hover.result(0).cls, 'error')
+        self.assertEqual(session.pending.stale, 1)
+        session.data_evaluate_expression('x', callback=values.append)
+        session.on_stdout_batch(['2^done,value="2"\n'])
+        self.assertEqual([v.value for v in values], ['2'])
+
+if __name__ == "__main__":
+    unittest.main()
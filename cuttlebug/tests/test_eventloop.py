@@ -0,0 +1,70 @@
+import unittest, os
+from cuttlebug.gdb import eventloop, future
+
+class EventLoopTest(unittest.TestCase):
+
+    def test_call_order(self):
+        loop = eventloop.EventLoop()
+        calls = []
+        done = future.Future()
+        loop.call_later(0.02, calls.append, 'later')
+        loop.call_later(0.01, calls.append, 'sooner')
+        loop.call_soon(calls.append, 'soon')
+        loop.call_later(0.03, done.set_result, True)
+        loop.run_until_complete(done, 5)
+        self.assertEqual(calls, ['soon', 'sooner', 'later'])
+
+    def test_run_until_complete_timeout(self):
+        loop = eventloop.EventLoop()
+        self.assertRaises(future.TimeoutError, loop.run_until_complete, future.Future(), 0.01)
+
+    def test_coroutine(self):
+        a, b, c = future.Future(), future.Future(), future.Future()
+        @eventloop.coroutine
+        def add():
+            first = yield a
+            rest = yield [b, c]
+            raise eventloop.Return(first + sum(rest))
+        result = add()
+        a.set_result(1)
+        b.set_result(2)
+        self.assertFalse(result.done())
+        c.set_result(3)
+        self.assertEqual(result.result(0), 6)
+
+    def test_coroutine_error(self):
+        @eventloop.coroutine
+        def fail():
+            yield future.completed(None)
+            raise ValueError("no such frame")
+        self.assertTrue(future.is_error(fail().result(0)))
+
+    @unittest.skipIf(os.name == 'nt', "select() can't wait on pipes on Windows")
+    def test_process(self):
+        loop = eventloop.EventLoop()
+        batches = []
+        finished = future.Future()
+        process = eventloop.LoopProcess(loop, r'printf "1^done\n(gdb)\n*stopped\n(gdb)\n"', batch=batches.append, end=lambda : finished.set_result(True))
+        loop.run_until_complete(finished, 5)
+        self.assertEqual(batches, [['1^done\n'], ['*stopped\n']])
+
+    def test_send_batching(self):
+        loop = eventloop.EventLoop()
+        process = eventloop.LoopProcess(loop, 'cat')
+        stdin, writes = process.stdin, []
+        process.stdin = type('Stdin', (object,), {'write' : lambda self, data : writes.append(data)})()
+        try:
+            process.send('1-exec-step\n')
+            process.send('2-stack-list-frames\n')
+            loop.run_once(0)
+            self.assertEqual(writes, ['1-exec-step\n2-stack-list-frames\n'])
+        finally:
+            stdin.close()
+            process.wait()
+
+    def test_create_transport(self):
+        self.assertTrue(isinstance(eventloop.create_transport('threads'), eventloop.stream.ThreadTransport))
+        self.assertRaises(ValueError, eventloop.create_transport, 'carrier pigeon')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest, os, sys, threading
+from cuttlebug.gdb import core, future
+
+FAKE_GDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_gdb.py')
+TIMEOUT = 10
+
+def fake_gdb(*options):
+    return '"%s" "%s" %s -n -q -i mi' % (sys.executable, FAKE_GDB, ' '.join(options))
+
+class FakeGDBTest(unittest.TestCase):
+    '''
+    Runs a whole session against fake_gdb.py, so no GDB or hardware is needed
+    '''
+    def setUp(self):
+        self.session = core.Session(cmd=fake_gdb('--stack-depth 3', '--locals 2', '--run-time 0.05'))
+        self.snapshots = []
+        self.snapshot = threading.Event()
+        def on_snapshot(evt):
+            self.snapshots.append(evt.data)
+            self.snapshot.set()
+        self.session.bind(core.EVT_SNAPSHOT, on_snapshot)
+        self.session.start()
+
+    def tearDown(self):
+        self.session.quit().wait(TIMEOUT)
+
+    def wait_for_stop(self):
+        self.assertTrue(self.snapshot.wait(TIMEOUT) or self.snapshot.isSet())
+        self.snapshot.clear()
+        return self.snapshots[-1]
+
+    def test_attach_and_step(self):
+        self.assertEqual(self.session.command('target remote localhost:3333').result(TIMEOUT).cls, 'done')
+        snapshot = self.wait_for_stop()
+        self.assertEqual(len(snapshot.frames), 3)
+        self.assertEqual([l['name'] for l in snapshot.locals], ['local0', 'local1'])
+        self.assertEqual(len(self.session.registers), 17)
+        pc = self.session.registers['pc']
+
+        self.assertEqual(self.session.exec_step().result(TIMEOUT).cls, 'running')
+        snapshot = self.wait_for_stop()
+        self.assertNotEqual(self.session.registers['pc'], pc)
+        self.assertTrue('pc' in snapshot.changed_registers)
+        self.assertFalse('sp' in snapshot.changed_registers)
+
+    def test_breakpoint(self):
+        self.session.command('target remote localhost:3333').wait(TIMEOUT)
+        self.wait_for_stop()
+        self.session.break_insert('main.c', 42).wait(TIMEOUT)
+        self.session.break_list().wait(TIMEOUT)
+        self.assertEqual([bp.line for bp in self.session.breakpoints], [42])
+        self.session.exec_continue()
+        snapshot = self.wait_for_stop()
+        self.assertEqual(snapshot.record.reason, 'breakpoint-hit')
+        self.assertEqual(snapshot.top.line, 42)
+
+    def test_memory(self):
+        read = future.Future()
+        self.session.memory.read(0x2000fff0, 16, callback=read.set_result)
+        self.assertEqual(len(read.result(TIMEOUT)), 16)
+        self.session.write_memory_bytes(0x20000000, '\x01\x02\x03\x04').wait(TIMEOUT)
+        self.assertEqual(self.session.data_evaluate_expression('*0x20000000').result(TIMEOUT).value, str(0x04030201))
+        self.assertEqual(self.session.read_memory_bytes(0x10000000, 4).result(TIMEOUT).cls, 'error')
+
+if __name__ == "__main__":
+    unittest.main()
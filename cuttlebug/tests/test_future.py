@@ -0,0 +1,64 @@
+import unittest, threading
+from cuttlebug.gdb import future
+from cuttlebug.gdb.records import GDBMIResultRecord
+
+def record(cls, **fields):
+    result = GDBMIResultRecord()
+    result.cls = cls
+    result.update(fields)
+    return result
+
+class FutureTest(unittest.TestCase):
+
+    def test_callbacks(self):
+        results = []
+        f = future.Future('-break-list')
+        f.add_callback(results.append)
+        self.assertFalse(f.done())
+        f.set_result(record('done'))
+        f.add_callback(results.append)
+        self.assertEqual([r.cls for r in results], ['done', 'done'])
+        self.assertEqual(f.result(0).cls, 'done')
+
+    def test_timeout(self):
+        f = future.Future('-exec-continue')
+        self.assertFalse(f.wait(0.01))
+        self.assertRaises(future.TimeoutError, f.result, 0.01)
+        threading.Timer(0.01, f.set_result, [record('running')]).start()
+        self.assertEqual(f.result(5).cls, 'running')
+
+    def test_then(self):
+        select = future.Future('-stack-select-frame 1')
+        create = future.Future('-var-create')
+        calls = []
+        def step(result):
+            calls.append(result.cls)
+            return create
+        chained = select.then(step)
+        select.set_result(record('done'))
+        self.assertEqual(calls, ['done'])
+        self.assertFalse(chained.done())
+        create.set_result(record('done', name='cvar0'))
+        self.assertEqual(chained.result(0).name, 'cvar0')
+
+    def test_errors_pass_through(self):
+        calls = []
+        f = future.Future()
+        chained = f.then(calls.append).then(calls.append)
+        f.set_result(record('error', msg='No symbol'))
+        self.assertEqual(calls, [])
+        self.assertEqual(chained.result(0).msg, 'No symbol')
+        recovered = future.completed(record('error')).then(calls.append, lambda result : 'recovered')
+        self.assertEqual(recovered.result(0), 'recovered')
+
+    def test_gather(self):
+        a, b = future.Future(), future.Future()
+        both = future.gather([a, b])
+        b.set_result(2)
+        self.assertFalse(both.done())
+        a.set_result(1)
+        self.assertEqual(both.result(0), [1, 2])
+        self.assertEqual(future.gather([]).result(0), [])
+
+if __name__ == "__main__":
+    unittest.main()
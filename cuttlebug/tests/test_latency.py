@@ -0,0 +1,41 @@
+import unittest
+from cuttlebug.gdb import latency
+from fake_session import HeadlessSession
+
+class HistogramTest(unittest.TestCase):
+
+    def test_buckets(self):
+        h = latency.Histogram()
+        for seconds in (0.0005, 0.003, 0.003, 0.004, 7.0):
+            h.add(seconds)
+        self.assertEqual(h.count, 5)
+        self.assertEqual(h.counts[0], 1)
+        self.assertEqual(h.counts[2], 3)
+        self.assertEqual(h.counts[-1], 1)
+        self.assertEqual(h.percentile(50), 0.005)
+        self.assertEqual(h.percentile(100), 7.0)
+        self.assertEqual(len(h.labels()), len(h.counts))
+
+class LatencyStatsTest(unittest.TestCase):
+
+    def test_stages(self):
+        stats = latency.LatencyStats()
+        stats.record('-var-update --all-values *', sent=10.0, received=10.5, dispatched=10.75, done=11.0)
+        stats.record('-var-update 1 var3', sent=20.0, received=20.1, dispatched=20.1, done=20.2, error=True)
+        stats.timed_out('-stack-list-frames')
+        update = stats['-var-update']
+        self.assertEqual((update.count, update.errors), (2, 1))
+        self.assertAlmostEqual(update.stages['gdb'].total, 0.6)
+        self.assertAlmostEqual(update.stages['queue'].total, 0.25)
+        self.assertAlmostEqual(update.stages['handle'].total, 0.35)
+        self.assertEqual(stats['-stack-list-frames'].timeouts, 1)
+        self.assertEqual([s.verb for s in stats.items()], ['-var-update', '-stack-list-frames'])
+
+    def test_session(self):
+        session = HeadlessSession()
+        session.data_evaluate_expression('x')
+        session.on_stdout_batch(['1^done,value="42"\n'])
+        self.assertEqual(session.latency['-data-evaluate-expression'].count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
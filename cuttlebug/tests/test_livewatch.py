@@ -0,0 +1,99 @@
+import unittest
+from cuttlebug.gdb import core, livewatch
+from fake_session import HeadlessSession
+
+class LiveWatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = HeadlessSession()
+        self.live = self.session.live
+        self.live.enabled = True
+        self.live.interval = 0.0
+        self.session.non_stop = True
+        self.events = []
+        self.session.bind(core.EVT_LIVE_WATCH, lambda evt : self.events.append(evt.data))
+
+    def test_only_changes_are_posted(self):
+        session, live = self.session, self.live
+        item = live.add(0x20000000, 8)
+        session.on_stdout_batch(['*running,thread-id="all"\n'])
+        session.transport.tick()
+        self.assertEqual(session.sent, ['1-data-read-memory-bytes 0x20000000 8\n'])
+        session.answer_memory(1, 0x20000000, '\x01\x00\x00\x00\x02\x00\x00\x00')
+        self.assertEqual(self.events, [[(item, [(0, 1), (1, 2)])]])
+        session.transport.tick()
+        session.answer_memory(2, 0x20000000, '\x01\x00\x00\x00\x03\x00\x00\x00')
+        self.assertEqual(self.events[-1], [(item, [(1, 3)])])
+        session.transport.tick()
+        session.answer_memory(3, 0x20000000, '\x01\x00\x00\x00\x03\x00\x00\x00')
+        self.assertEqual(len(self.events), 2)
+        # Polling stops with the target
+        session.on_stdout_batch(['*stopped,reason="signal-received",thread-id="1"\n'])
+        session.transport.tick()
+        self.assertEqual(session.transport.repeating, [])
+
+    def test_backs_off_when_saturated(self):
+        session, live = self.session, self.live
+        live.interval = 0.001
+        live.add(0x20000000, 4)
+        session.on_stdout_batch(['*running,thread-id="all"\n'])
+        session.transport.tick()
+        live._LiveWatch__due = 0 # Due again, but the first poll hasn't come back
+        session.transport.tick()
+        self.assertEqual(live.skipped, 1)
+        self.assertEqual(live.current_interval, 0.002)
+        self.assertEqual(len(session.sent), 1)
+
+    def test_expression(self):
+        session, live = self.session, self.live
+        items = []
+        live.add_expression('counter').add_callback(items.append)
+        session.on_stdout_batch(['1^done,value="(int *) 0x20000010 <counter>"\n', '2^done,value="4"\n'])
+        self.assertEqual((items[0].address, items[0].size, items[0].cells), (0x20000010, 4, [(0, 4)]))
+        # Looked up once only
+        live.add_expression('counter')
+        self.assertEqual(len(session.sent), 2)
+        self.assertEqual(len(live.items), 2)
+
+    def test_failed_polls(self):
+        session, live = self.session, self.live
+        errors = []
+        session.bind(core.EVT_ERROR, lambda evt : errors.append(evt.data))
+        item = live.add(0x20000000, 4)
+        session.on_stdout_batch(['*running,thread-id="all"\n'])
+        for token in range(1, livewatch.MAX_FAILURES+1):
+            live._LiveWatch__due = 0
+            session.transport.tick()
+            session.on_stdout_batch(['%d^error,msg="Cannot execute this command while the target is running."\n' % token])
+            self.assertEqual(live.current_interval, livewatch.MAX_INTERVAL)
+            self.assertEqual(item.error, "Cannot execute this command while the target is running.")
+        # The failures don't go the session's error path, and polling stops with one message
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('Live watch stopped'))
+        self.assertFalse(live.running)
+        self.assertEqual(session.epoch, 1)
+        session.transport.tick()
+        self.assertEqual(session.transport.repeating, [])
+
+class NonStopTest(unittest.TestCase):
+
+    def test_refused(self):
+        session = HeadlessSession()
+        session.live.enabled = True
+        errors = []
+        session.bind(core.EVT_ERROR, lambda evt : errors.append(evt.data))
+        session.start()
+        self.assertEqual(session.sent[:2], ['1-gdb-set target-async on\n', '2-gdb-set non-stop on\n'])
+        session.command('target remote localhost:3333')
+        session.on_stdout_batch(['1^done\n', '2^done\n', '3^done,register-names=[]\n',
+                                 '4^error,msg="Non-stop mode requested, but remote does not support non-stop"\n'])
+        # Back to all-stop, with one message saying why live watch is off
+        self.assertFalse(session.non_stop or session.live.enabled)
+        self.assertEqual(session.sent[-1], '5-gdb-set non-stop off\n')
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('Live watch is off'))
+        session.on_stdout_batch(['*running,thread-id="all"\n'])
+        self.assertFalse(session.live.running)
+
+if __name__ == "__main__":
+    unittest.main()
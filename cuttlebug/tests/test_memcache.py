@@ -0,0 +1,128 @@
+import unittest, contextlib
+from cuttlebug.gdb.memcache import MemoryCache
+from cuttlebug.gdb.models import MemoryBlock
+from cuttlebug.gdb.records import GDBMIResultRecord
+from cuttlebug.gdb.future import Future
+from fake_session import HeadlessSession
+
+class FakeSession(object):
+    '''
+    Stands in for the GDB session, serving reads out of a flat memory image.  Reads are held until complete() is called.
+    '''
+    def __init__(self, base, size):
+        self.base = base
+        self.memory = bytearray(i & 0xff for i in range(size))
+        self.running = False
+        self.reads = []
+        self.lanes = []
+        self.lane = 'user'
+
+    @contextlib.contextmanager
+    def background(self):
+        self.lane = 'background'
+        try:
+            yield
+        finally:
+            self.lane = 'user'
+
+    def read_memory_bytes(self, start_addr, count, callback=None):
+        future = Future().add_callback(callback)
+        self.reads.append((start_addr, count, future))
+        self.lanes.append(self.lane)
+        return future
+
+    def complete(self):
+        reads, self.reads = self.reads, []
+        for start, count, future in reads:
+            result = GDBMIResultRecord()
+            offset = start - self.base
+            if 0 <= offset and offset + count <= len(self.memory):
+                result.cls = 'done'
+                result.blocks = [MemoryBlock(start, self.memory[offset:offset+count])]
+            else:
+                result.cls = 'error'
+            future.set_result(result)
+
+class MemoryCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession(0x1000, 0x1000)
+        self.cache = MemoryCache(self.session, page_size=16, max_pages=8)
+        self.blocks = []
+
+    def test_miss_then_hit(self):
+        self.cache.read(0x1004, 4, self.blocks.append)
+        self.assertEqual(self.blocks, [])
+        self.assertEqual([(a, n) for a, n, c in self.session.reads], [(0x1000, 16)])
+        self.session.complete()
+        self.assertEqual(self.blocks[0].read(0x1004, 4), 0x07060504)
+        self.cache.read(0x1008, 4, self.blocks.append)
+        self.assertEqual(len(self.blocks), 2)
+        self.assertEqual(self.session.reads, [])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_coalescing(self):
+        self.cache.read(0x1000, 16, self.blocks.append)
+        self.cache.read(0x1008, 40, self.blocks.append)
+        self.assertEqual([(a, n) for a, n, c in self.session.reads], [(0x1000, 16), (0x1010, 32)])
+        self.session.complete()
+        self.assertEqual(len(self.blocks), 2)
+        self.assertEqual(str(self.blocks[1].data), str(self.session.memory[8:48]))
+
+    def test_invalidate_reissues(self):
+        self.cache.read(0x1000, 4, self.blocks.append)
+        self.cache.invalidate()
+        self.session.complete()
+        self.assertEqual(self.blocks, [])
+        self.assertEqual(len(self.session.reads), 1)
+        self.session.complete()
+        self.assertEqual(self.blocks[0].read(0x1000, 4), 0x03020100)
+
+    def test_retries_in_background(self):
+        self.cache.read(0x1000, 4, self.blocks.append)
+        self.cache.invalidate()
+        self.session.complete()
+        self.assertEqual(self.session.lanes, ['user', 'background'])
+
+    def test_evicted_before_complete(self):
+        # More pages than the cache holds: the first are evicted before the request is answered, but it still gets them
+        self.cache.read(0x1000, 16*10, self.blocks.append)
+        self.session.complete()
+        self.assertEqual(self.cache.peek(0x1000, 4), None)
+        self.assertEqual(str(self.blocks[0].data), str(self.session.memory[0:160]))
+
+    def test_peek_word(self):
+        self.cache.read(0x1000, 32)
+        self.session.complete()
+        self.assertEqual([self.cache.peek_word(0x1004, size) for size in (1, 2, 4)], [0x04, 0x0504, 0x07060504])
+        # A word across the end of a page comes from both
+        self.assertEqual(self.cache.peek_word(0x100e, 4), 0x11100f0e)
+        self.assertEqual(self.cache.peek_word(0x101e, 4), None)
+        self.assertEqual(self.cache.peek_word(0x1020, 1), None)
+
+    def test_console_command_invalidates(self):
+        session = HeadlessSession()
+        session.memory.fill(MemoryBlock(0x1000, bytearray(256)))
+        session.command('set var counter = 1')
+        self.assertEqual(session.memory.peek_word(0x1000, 4), None)
+        # Anything read back while the command was on its way is thrown away when it's done
+        session.memory.fill(MemoryBlock(0x1000, bytearray(256)))
+        session.on_stdout_batch(['1^done\n'])
+        self.assertEqual(session.memory.peek_word(0x1000, 4), None)
+
+    def test_failed_read(self):
+        self.cache.read(0x3000, 4, self.blocks.append)
+        self.session.complete()
+        self.assertEqual(self.blocks, [None])
+        self.assertEqual(self.cache.peek(0x3000, 4), None)
+
+    def test_eviction(self):
+        for address in range(0x1000, 0x1100, 16):
+            self.cache.read(address, 16)
+        self.session.complete()
+        self.assertEqual(len(self.cache.pages), 8)
+        self.assertEqual(self.cache.peek(0x1000, 4), None)
+        self.assertNotEqual(self.cache.peek(0x10f0, 4), None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from cuttlebug.gdb.models import MemoryBlock
+
+class MemoryBlockTest(unittest.TestCase):
+
+    def setUp(self):
+        self.block = MemoryBlock.from_hex(0x20000000, '0102030405060708ff')
+
+    def test_bounds(self):
+        self.assertEqual(len(self.block), 9)
+        self.assertEqual(self.block.end, 0x20000009)
+        self.assertTrue(self.block.contains(0x20000004, 4))
+        self.assertFalse(self.block.contains(0x20000008, 4))
+
+    def test_words(self):
+        self.assertEqual(list(self.block.words(1))[:2], [0x01, 0x02])
+        self.assertEqual(list(self.block.words(2)), [0x0201, 0x0403, 0x0605, 0x0807])
+        self.assertEqual(list(self.block.words(4)), [0x04030201, 0x08070605])
+        self.assertEqual(list(self.block.words(4, byteorder='big')), [0x01020304, 0x05060708])
+
+    def test_read(self):
+        self.assertEqual(self.block.read(0x20000004, 4), 0x08070605)
+        self.assertEqual(self.block.read(0x20000008, 1), 0xff)
+        self.assertEqual(self.block.view(0x20000001, 2).tobytes(), '\x02\x03')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from cuttlebug.gdb import miparser
+from cuttlebug.gdb.records import GDBMITuple
+
+class MIParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = miparser.MIParser()
+
+    def parse(self, line):
+        response = self.parser.parse(line)
+        self.assertEqual(self.parser.error, None)
+        return response
+
+    def test_result_record(self):
+        response = self.parse('12^done,value="42"\r\n')
+        self.assertEqual(response.result.token, 12)
+        self.assertEqual(response.result.cls, 'done')
+        self.assertEqual(response.result.value, '42')
+
+    def test_error_record(self):
+        response = self.parse('19^error,msg="No symbol \\"foo\\" in current context."\n')
+        self.assertEqual(response.result.cls, 'error')
+        self.assertEqual(response.result.msg, 'No symbol \\"foo\\" in current context.')
+
+    def test_stream_records(self):
+        response = self.parse('~"80\\t  for(; nCount != 0; nCount--) {\\n"\n')
+        self.assertEqual(response.console, ['80\t  for(; nCount != 0; nCount--) {\n'])
+        self.assertEqual(self.parse('@"target"\n').target, ['target'])
+        self.assertEqual(self.parse('&"log"\n').log, ['log'])
+
+    def test_async_records(self):
+        response = self.parse('*stopped,frame={addr="0x08000268",func="Delay",args=[{name="nCount",value="539340"}],line="80"},thread-id="1"\n')
+        self.assertEqual(response.exc.cls, 'stopped')
+        self.assertEqual(response.exc.token, None)
+        self.assertTrue(isinstance(response.exc.frame, GDBMITuple))
+        self.assertEqual(response.exc.frame.func, 'Delay')
+        self.assertEqual(response.exc.frame.args, [{'name':'nCount', 'value':'539340'}])
+        self.assertEqual(self.parse('=thread-created,id="1",group-id="42000"\n').notify['group-id'], '42000')
+        self.assertEqual(self.parse('+download,section=".text"\n').status.section, '.text')
+
+    def test_lists(self):
+        response = self.parse('5^done,stack=[frame={level="0"},frame={level="1"}],names=["r0","","pc"],empty=[],tuple={}\n')
+        self.assertEqual(response.result.stack, [{'frame' : {'level' : '0'}}, {'frame' : {'level' : '1'}}])
+        self.assertEqual(response.result.names, ['r0', '', 'pc'])
+        self.assertEqual(response.result.empty, [])
+        self.assertEqual(response.result.tuple, {})
+
+    def test_multiple_lines(self):
+        response = self.parse('~"Remote debugging\\n"\r\n=thread-group-created,id="42000"\r\n2^done\r\n(gdb) \r\n')
+        self.assertEqual(response.console, ['Remote debugging\n'])
+        self.assertEqual(response.notify.cls, 'thread-group-created')
+        self.assertEqual(response.result.token, 2)
+
+    def test_malformed(self):
+        self.parser.parse('3^done,value="unterminated\n')
+        self.assertNotEqual(self.parser.error, None)
+        self.parser.parse('3^done,value=\n')
+        self.assertNotEqual(self.parser.error, None)
+
+if __name__ == "__main__":
+    unittest.main()
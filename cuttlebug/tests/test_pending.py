@@ -0,0 +1,30 @@
+import unittest
+from cuttlebug.gdb.pending import CommandTable
+
+class CommandTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = CommandTable(timeout=10)
+
+    def test_completion(self):
+        self.table.add(1, '-break-list', callback=self.setUp)
+        self.assertTrue(1 in self.table)
+        entry = self.table.pop(1)
+        self.assertEqual(entry.command, '-break-list')
+        self.assertEqual(len(self.table), 0)
+        self.assertEqual(self.table.pop(1), None)
+        self.assertEqual(self.table.stats(), {'in_flight' : 0, 'completed' : 1, 'timed_out' : 0, 'late' : 1, 'coalesced' : 0, 'stale' : 0})
+
+    def test_expiry(self):
+        a = self.table.add(1, '-exec-continue')
+        b = self.table.add(2, '-target-download', timeout=None)
+        c = self.table.add(3, '-stack-list-frames', timeout=60)
+        expired = self.table.expire(now=a.sent + 11)
+        self.assertEqual(expired, [a])
+        self.assertEqual(self.table.in_flight, 2)
+        self.assertEqual(self.table.expire(now=a.sent + 3600), [c])
+        self.assertTrue(2 in self.table)
+        self.assertEqual(self.table.timed_out, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from cuttlebug.gdb.models import GDBRegisterModel
+
+class RegisterModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registers = GDBRegisterModel(None)
+        self.registers.set_names(['r0', 'r1', '', 'pc'])
+
+    def test_complete(self):
+        self.assertFalse(self.registers.complete)
+        for n, value in ((0, '0x0'), (1, '0x1'), (3, '0x8000000')):
+            self.registers.set_value_from_number(n, value)
+        self.assertTrue(self.registers.complete)
+        self.assertEqual(self.registers['pc'], '0x8000000')
+
+    def test_changed_bitmap(self):
+        self.assertTrue(self.registers.set_value_from_number(0, '0x0'))
+        self.assertTrue(self.registers.set_value_from_number(3, '0x10'))
+        self.assertEqual(self.registers.changed, 0x9)
+        self.registers.clear_changed()
+        self.assertFalse(self.registers.set_value_from_number(0, '0x0'))
+        self.assertTrue(self.registers.set_value_from_number(3, '0x14'))
+        self.assertFalse(self.registers.is_changed(0))
+        self.assertTrue(self.registers.is_changed(3))
+        self.assertEqual(self.registers.changed_names(), ['pc'])
+
+if __name__ == "__main__":
+    unittest.main()
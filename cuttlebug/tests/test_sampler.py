@@ -0,0 +1,65 @@
+import unittest, os, tempfile, random
+from cuttlebug import sampler
+
+class SamplerTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_to_number(self):
+        self.assertEqual([sampler.to_number(s) for s in ('42', '-3.5', '0x1f', "65 'A'", '1e3', '{...}', '<optimized out>')],
+                         [42.0, -3.5, 31.0, 65.0, 1000.0, None, None])
+
+    def test_ring_wraps(self):
+        s = sampler.Sampler(capacity=4)
+        for i in range(6):
+            s.record('x', str(i), t=float(i))
+        self.assertFalse(s.record('x', '<optimized out>'))
+        series = s['x']
+        self.assertEqual((len(series), series.dropped), (4, 2))
+        times, values = series.samples()
+        self.assertEqual(list(values), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual((series.first, series.last), ((2.0, 2.0), (5.0, 5.0)))
+
+    def test_decimate(self):
+        s = sampler.Sampler()
+        for i in range(1000):
+            s.record('x', i % 10, t=float(i))
+        buckets = s['x'].decimate(10)
+        self.assertEqual(len(buckets), 10)
+        self.assertEqual(buckets[1], (100.0, 0.0, 9.0))
+        # A window with fewer samples than buckets comes back as it is
+        self.assertEqual(s['x'].decimate(10, 500, 502), [(500.0, 0.0, 0.0), (501.0, 1.0, 1.0), (502.0, 2.0, 2.0)])
+
+    def test_decimate_wrapped(self):
+        # The block summaries give the same answer as going through every sample, after the ring has wrapped too
+        s = sampler.Sampler(capacity=1000)
+        rng = random.Random(1)
+        for i in range(2500):
+            s.record('x', rng.uniform(-100, 100), t=float(i))
+        times, values = s['x'].samples()
+        for start, end, buckets in ((None, None, 7), (1600.0, 2400.0, 100), (1503.0, 2497.0, 3)):
+            lo = 0 if start is None else list(times).index(start)
+            hi = len(times) if end is None else list(times).index(end) + 1
+            step = float(hi - lo)/buckets
+            expected = [(times[lo+int(b*step)], min(values[lo+int(b*step):lo+int((b+1)*step)]), max(values[lo+int(b*step):lo+int((b+1)*step)])) for b in range(buckets)]
+            self.assertEqual(s['x'].decimate(buckets, start, end), expected)
+
+    def test_export(self):
+        s = sampler.Sampler()
+        for i in range(3):
+            s.record('count', i, t=10.0+i)
+            s.record('a[1]', i*0.5, t=10.0+i)
+        s.export_binary(self.filename)
+        series = sampler.read_binary(self.filename)
+        self.assertEqual(list(series), ['count', 'a[1]'])
+        self.assertEqual([list(a) for a in series['a[1]']], [[10.0, 11.0, 12.0], [0.0, 0.5, 1.0]])
+        s.export_csv(self.filename, ['count'])
+        self.assertEqual(open(self.filename).read().splitlines(), ['series,time,value', '"count",10.000000,0.0', '"count",11.000000,1.0', '"count",12.000000,2.0'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from cuttlebug.gdb import core
+from cuttlebug.gdb.sessions import SessionManager, EVT_SESSION_ADDED, EVT_SESSION_REMOVED, EVT_SESSION_SELECTED
+from fake_session import HeadlessSession
+
+class SessionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = SessionManager()
+        self.events = []
+        for event in (EVT_SESSION_ADDED, EVT_SESSION_REMOVED, EVT_SESSION_SELECTED):
+            self.sessions.bind(event, lambda evt : self.events.append((evt.type, evt.data)))
+
+    def test_select(self):
+        cm4 = self.sessions.add('cm4', core.Session())
+        cm0 = self.sessions.add('cm0', core.Session())
+        self.assertTrue(self.sessions.active is cm4)
+        self.sessions.select('cm0')
+        self.assertTrue(self.sessions.active is cm0)
+        self.assertEqual(self.sessions.name_of(cm0), 'cm0')
+        self.assertEqual(self.events, [(EVT_SESSION_ADDED, 'cm4'), (EVT_SESSION_SELECTED, 'cm4'), (EVT_SESSION_ADDED, 'cm0'), (EVT_SESSION_SELECTED, 'cm0')])
+        self.assertRaises(ValueError, self.sessions.add, 'cm0', core.Session())
+        self.assertRaises(KeyError, self.sessions.select, 'dsp')
+
+    def test_remove_active(self):
+        self.sessions.add('cm4', core.Session())
+        cm0 = self.sessions.add('cm0', core.Session())
+        self.sessions.remove('cm4')
+        self.assertTrue(self.sessions.active is cm0)
+        self.sessions.remove('cm0')
+        self.assertEqual(self.sessions.active, None)
+        self.assertEqual(len(self.sessions), 0)
+
+    def test_sessions_are_independent(self):
+        cm4 = self.sessions.add('cm4', HeadlessSession())
+        cm0 = self.sessions.add('cm0', HeadlessSession())
+        cm4.data_evaluate_expression('a')
+        cm0.data_evaluate_expression('b')
+        self.assertEqual(cm4.sent, ['1-data-evaluate-expression "a"\n'])
+        self.assertEqual(cm0.sent, ['1-data-evaluate-expression "b"\n'])
+        self.assertTrue(cm4.memory is not cm0.memory and cm4.pending is not cm0.pending)
+
+if __name__ == "__main__":
+    unittest.main()
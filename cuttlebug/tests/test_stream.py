@@ -0,0 +1,26 @@
+import unittest
+from cuttlebug.gdb.stream import MIFramer
+
+class MIFramerTest(unittest.TestCase):
+
+    def test_batches_split_on_prompt(self):
+        framer = MIFramer()
+        batches = framer.feed('*stopped,reason="end-stepping-range"\r\n(gdb) \r\n4^done,value="1"\r\n5^done\r\n(gdb) \r\n')
+        self.assertEqual(batches, [['*stopped,reason="end-stepping-range"\r\n'], ['4^done,value="1"\r\n', '5^done\r\n']])
+
+    def test_trailing_records_without_prompt(self):
+        framer = MIFramer()
+        self.assertEqual(framer.feed('=thread-created,id="1"\n~"text"\n'), [['=thread-created,id="1"\n', '~"text"\n']])
+
+    def test_split_records(self):
+        framer = MIFramer()
+        self.assertEqual(framer.feed('12^done,val'), [])
+        self.assertEqual(framer.feed('ue="4'), [])
+        self.assertEqual(framer.feed('2"\n(gd'), [['12^done,value="42"\n']])
+        self.assertEqual(framer.feed('b) \n'), [])
+        self.assertEqual(framer.feed('13^done'), [])
+        self.assertEqual(framer.flush(), [['13^done']])
+        self.assertEqual(framer.flush(), [])
+
+if __name__ == "__main__":
+    unittest.main()
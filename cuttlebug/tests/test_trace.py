@@ -0,0 +1,60 @@
+import unittest, os, tempfile
+from cuttlebug import trace
+from cuttlebug.gdb import core, transcript
+
+class TracerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = trace.Tracer(capacity=8)
+
+    def test_read(self):
+        reader = self.tracer.reader()
+        self.tracer.emit(trace.MI_SENT, 0, '1-exec-step\n')
+        self.tracer.emit(trace.MI_RECEIVED, 0, ['1^running\n', '*running,thread-id="all"\n'], 2)
+        events = reader.read()
+        self.assertEqual([e.event for e in events], [trace.MI_SENT, trace.MI_RECEIVED])
+        self.assertEqual(events[1].arg, 2)
+        self.assertEqual(events[1].message, '1^running\n*running,thread-id="all"\n')
+        self.assertEqual(reader.read(), [])
+
+    def test_wrap(self):
+        reader = self.tracer.reader()
+        for i in range(20):
+            self.tracer.emit(trace.LOG, 0, None, i)
+        self.assertEqual([e.arg for e in reader.read()], range(12, 20))
+        self.assertEqual(reader.dropped, 12)
+        self.tracer.emit(trace.LOG, 0, None, 20)
+        self.assertEqual([e.arg for e in reader.read()], [20])
+
+    def test_filter_and_sources(self):
+        cm0 = self.tracer.source('cm0')
+        reader = self.tracer.reader(trace.CONSOLE, new_only=True)
+        self.tracer.emit(trace.MI_SENT, cm0, '1-exec-step\n')
+        self.tracer.emit(trace.CONSOLE, cm0, 'hello\n')
+        events = reader.read()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(trace.format_event(events[0], self.tracer, show_time=False), '[cm0] hello')
+
+    def test_file_sink(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            sink = trace.FileSink(filename, tracer=self.tracer, interval=None)
+            self.tracer.emit(trace.MI_SENT, 0, '1-exec-step\n')
+            self.assertEqual(open(filename).read(), '')
+            sink.close()
+            self.assertTrue(open(filename).read().endswith(' 1-exec-step\n'))
+        finally:
+            os.remove(filename)
+
+    def test_session(self):
+        session = core.Session()
+        session.tracer = self.tracer
+        session.subprocess = transcript.NullProcess()
+        reader = self.tracer.reader(trace.MI_SENT, trace.MI_RECEIVED)
+        session.data_evaluate_expression('x')
+        session.on_stdout_batch(['~"console"\n', '1^done,value="42"\n'])
+        self.assertEqual([e.event for e in reader.read()], [trace.MI_SENT, trace.MI_RECEIVED])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest, os, tempfile
+from cuttlebug.gdb import core, transcript
+
+TRAFFIC = ['1^done,value="42"\n', '*stopped,reason="end-stepping-range",thread-id="1"\n']
+
+class TranscriptTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.mi.gz')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def record(self):
+        session = core.Session()
+        session.subprocess = transcript.NullProcess()
+        recorder = session.record(self.filename)
+        session.data_evaluate_expression('x')
+        session.on_stdout_batch(TRAFFIC)
+        recorder.stop()
+        self.assertEqual(session.recorder, None)
+
+    def test_round_trip(self):
+        self.record()
+        records = list(transcript.read_transcript(self.filename))
+        self.assertEqual(records[0][0], transcript.SENT)
+        self.assertEqual(records[0][2], '1-data-evaluate-expression "x"\n')
+        self.assertEqual(records[1][0], transcript.RECEIVED)
+        self.assertEqual(records[1][2], ''.join(TRAFFIC))
+        self.assertTrue(records[0][1] <= records[1][1])
+        # The stop started a refresh, which was recorded too
+        self.assertTrue(all(kind == transcript.SENT for kind, when, data in records[2:]))
+
+    def test_replay(self):
+        self.record()
+        session = core.Session()
+        stops = []
+        session.bind(core.EVT_STOPPED, stops.append)
+        stats = transcript.Replayer(self.filename, session).run()
+        self.assertEqual((stats.batches, stats.records), (1, 2))
+        self.assertEqual(len(stops), 1)
+        self.assertFalse(1 in session.pending)
+
+    def test_not_a_transcript(self):
+        f = transcript.gzip.open(self.filename, 'wb')
+        f.write('(gdb) \n')
+        f.close()
+        self.assertRaises(transcript.TranscriptError, list, transcript.read_transcript(self.filename))
+
+if __name__ == "__main__":
+    unittest.main()
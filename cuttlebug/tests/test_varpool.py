@@ -0,0 +1,87 @@
+import unittest
+from cuttlebug.gdb import varpool
+from fake_session import HeadlessSession
+
+class VarPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = HeadlessSession()
+        self.pool = varpool.VarPool(self.session)
+
+    def create(self, frame, expression, name):
+        self.pool.create(frame, expression, name)
+        self.session.on_stdout_batch(['%d^done,name="%s",numchild="0",value="1",type="int"\n' % (self.session.sent_token(), name)])
+
+    def test_reuse_across_calls(self):
+        session, pool = self.session, self.pool
+        session.stop_in('delay', 'main')
+        self.create(session.stack[1], 'count', 'v1')
+        self.assertEqual(pool.get(session.stack[1], 'count'), 'v1')
+        # A call pushes a frame: main is still main at the same depth, so its variable object is still good
+        session.stop_in('inner', 'delay', 'main')
+        self.assertTrue(pool.holds('v1', session.stack[2]))
+        self.assertEqual(pool.get(session.stack[2], 'count'), 'v1')
+        self.assertEqual(pool.get(session.stack[1], 'count'), None)
+        sent = len(session.sent)
+        self.assertEqual(pool.sync(), [])
+        self.assertEqual(len(session.sent), sent)
+
+    def test_created_future(self):
+        session, pool = self.session, self.pool
+        session.stop_in('main')
+        pool.create(session.stack[0], 'count', 'v1')
+        created = pool.created('v1')
+        self.assertFalse(created.done())
+        session.on_stdout_batch(['%d^done,name="v1",numchild="0",value="1",type="int"\n' % session.sent_token()])
+        # Whoever finds it in the pool can wait on it, or have it right away once it's there
+        self.assertEqual(created.result(0).name, 'v1')
+        self.assertTrue('v1' in session.vars)
+        pool.forget('v1')
+        self.assertEqual(pool.created('v1'), None)
+
+    def test_sync_deletes_gone_frames(self):
+        session, pool = self.session, self.pool
+        session.stop_in('inner', 'delay', 'main')
+        self.create(session.stack[0], 'i', 'v1')
+        self.create(session.stack[2], 'count', 'v2')
+        session.stop_in('delay', 'main')
+        self.assertEqual(pool.sync(), ['v1'])
+        self.assertEqual(session.sent[-1].split('-', 1)[1], 'var-delete v1\n')
+        self.assertTrue('v2' in pool and 'v2.x' in pool and 'v1' not in pool)
+
+    def test_sync_keeps_unlisted_frames(self):
+        session, pool = self.session, self.pool
+        session.stop_in('inner', 'delay', 'main')
+        self.create(session.stack[0], 'i', 'v1')
+        self.create(session.stack[2], 'count', 'v2')
+        # Only the first frame is listed this time, but the stack is known to go two deep: main is still at the bottom
+        session.stop_in('delay')
+        session.stack_info_depth()
+        session.on_stdout_batch(['%d^done,depth="2"\n' % session.sent_token()])
+        self.assertEqual(pool.sync(), ['v1'])
+        self.assertTrue('v2' in pool)
+
+    def test_failed_create_is_forgotten(self):
+        session, pool = self.session, self.pool
+        session.stop_in('main')
+        pool.create(session.stack[0], 'nothing', 'v1')
+        session.on_stdout_batch(['%d^error,msg="No symbol"\n' % session.sent_token()])
+        self.assertEqual(pool.get(session.stack[0], 'nothing'), None)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(pool.created('v1'), None)
+
+    def test_capped_stack_is_not_pooled(self):
+        session, pool = self.session, self.pool
+        session.stack_max_depth = 3
+        session.stop_in('recurse', 'recurse', 'recurse')
+        session.stack_info_depth()
+        session.on_stdout_batch(['%d^done,depth="3"\n' % session.sent_token()])
+        # The stack goes deeper than it's unwound, so depths from the bottom can't be told
+        self.assertEqual(session.stack.exact_depth, None)
+        self.create(session.stack[0], 'n', 'v1')
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(pool.get(session.stack[0], 'n'), None)
+        self.assertFalse(pool.holds('v1', session.stack[0]))
+
+if __name__ == "__main__":
+    unittest.main()
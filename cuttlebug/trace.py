@@ -0,0 +1,186 @@
+'''
+Tracing for the hot paths (every MI record sent to and read from GDB) where logging costs too much.
+
+Emitting an event writes one fixed-size binary record (time, event, source, argument) into a preallocated ring
+buffer, along with a reference to the event's text, if it has any.  Nothing is formatted, copied or displayed at that
+point, and the buffer never grows: once it has CAPACITY events in it, each new event overwrites the oldest.  So
+tracing costs the same small amount whether or not anyone is reading.
+
+Readers (the log view panes, FileSink) each keep their own position in the buffer, and drain whatever is new when it
+suits them - on a timer, or when they're shown - formatting it all in one go.  A reader that falls more than
+CAPACITY events behind misses the ones that were overwritten, and its dropped count says how many.
+
+    source = tracer.source('cm4')
+    tracer.emit(MI_SENT, source, '12-exec-step\\n')
+    reader = tracer.reader(MI_SENT, MI_RECEIVED)
+    for event in reader.read():
+        print format_event(event)
+'''
+import struct, threading, time
+
+CAPACITY = 1 << 16
+RECORD = struct.Struct('<dHHi') # time, event, source, argument
+
+# Events
+MI_SENT = 1         # text is the command line sent to GDB
+MI_RECEIVED = 2     # text is the list of records read in one batch, arg is how many
+CONSOLE = 3         # GDB's console, target and log streams
+TARGET = 4
+LOG = 5
+
+NAMES = {MI_SENT : 'mi-sent', MI_RECEIVED : 'mi-received', CONSOLE : 'console', TARGET : 'target', LOG : 'log'}
+
+class TraceEvent(object):
+    __slots__ = ('time', 'event', 'source', 'arg', 'text')
+
+    def __init__(self, time, event, source, arg, text):
+        self.time = time
+        self.event = event
+        self.source = source
+        self.arg = arg
+        self.text = text
+
+    @property
+    def name(self):
+        return NAMES.get(self.event, str(self.event))
+
+    @property
+    def message(self):
+        if isinstance(self.text, (list, tuple)):
+            return ''.join(self.text)
+        return self.text if self.text is not None else str(self.arg)
+
+    def __repr__(self):
+        return "<TraceEvent %s %r>" % (self.name, self.text)
+
+class Tracer(object):
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.records = bytearray(capacity*RECORD.size)
+        self.texts = [None]*capacity
+        self.head = 0 # How many events have ever been emitted
+        self.sources = ['']
+        self.lock = threading.Lock()
+
+    def source(self, name):
+        '''
+        The number to emit events from the named source (a session, say) with, which readers can turn back into the name
+        '''
+        with self.lock:
+            if name not in self.sources:
+                self.sources.append(name)
+            return self.sources.index(name)
+
+    def source_name(self, source):
+        return self.sources[source] if source < len(self.sources) else str(source)
+
+    def emit(self, event, source=0, text=None, arg=0):
+        with self.lock:
+            i = self.head % self.capacity
+            RECORD.pack_into(self.records, i*RECORD.size, time.time(), event, source, arg)
+            self.texts[i] = text
+            self.head += 1
+
+    def reader(self, *events, **kwargs):
+        return Reader(self, events, **kwargs)
+
+    def copy(self, start):
+        '''
+        Copy out the raw records (and texts) from event number start up to the head, or as many of them as are still in
+        the buffer.  Returns (first, head, records, texts).  The copy is done under the lock, the unpacking is up to the caller.
+        '''
+        with self.lock:
+            head = self.head
+            first = max(start, head - self.capacity)
+            if first >= head:
+                return first, head, '', []
+            i, j = first % self.capacity, head % self.capacity
+            if i < j:
+                return first, head, str(self.records[i*RECORD.size:j*RECORD.size]), self.texts[i:j]
+            return first, head, str(self.records[i*RECORD.size:] + self.records[:j*RECORD.size]), self.texts[i:] + self.texts[:j]
+
+class Reader(object):
+    '''
+    Reads new events from a tracer.  If events are specified, only those events are returned.  A reader starts at the
+    oldest event still in the buffer, or at the newest if new_only is True.
+    '''
+    def __init__(self, tracer, events=(), new_only=False):
+        self.tracer = tracer
+        self.events = frozenset(events)
+        self.position = tracer.head if new_only else max(0, tracer.head - tracer.capacity)
+        self.dropped = 0
+
+    @property
+    def pending(self):
+        return self.tracer.head - self.position
+
+    def read(self):
+        '''
+        Return the events emitted since the last read, oldest first
+        '''
+        first, head, records, texts = self.tracer.copy(self.position)
+        self.dropped += first - self.position
+        self.position = head
+        events = self.events
+        retval = []
+        for n, text in enumerate(texts):
+            t, event, source, arg = RECORD.unpack_from(records, n*RECORD.size)
+            if not events or event in events:
+                retval.append(TraceEvent(t, event, source, arg, text))
+        return retval
+
+def format_event(event, tracer=None, show_source=True, show_time=True):
+    parts = []
+    if show_time:
+        parts.append(time.strftime('%H:%M:%S', time.localtime(event.time)) + ('.%03d' % (int(event.time*1000) % 1000)))
+    if show_source and event.source:
+        parts.append('[%s]' % (tracer or get_tracer()).source_name(event.source))
+    parts.append(event.message.rstrip('\n'))
+    return ' '.join(parts)
+
+class FileSink(object):
+    '''
+    Write trace events to a file.  The tracer is drained every interval seconds on a thread of its own, or, if interval
+    is None, only when drain() is called.
+    '''
+    def __init__(self, filename, events=(), tracer=None, interval=1.0):
+        self.tracer = tracer or get_tracer()
+        self.reader = self.tracer.reader(*events, new_only=True)
+        self.file = open(filename, 'w')
+        self.lock = threading.Lock()
+        self.interval = interval
+        if interval:
+            thread = threading.Thread(target=self.__run)
+            thread.setDaemon(True)
+            thread.start()
+
+    def __run(self):
+        while self.file:
+            time.sleep(self.interval)
+            self.drain()
+
+    def drain(self):
+        with self.lock:
+            if not self.file:
+                return
+            dropped = self.reader.dropped
+            events = self.reader.read()
+            if self.reader.dropped != dropped:
+                self.file.write("... %d events dropped ...\n" % (self.reader.dropped - dropped))
+            if events:
+                self.file.write(''.join(format_event(event, self.tracer) + '\n' for event in events))
+                self.file.flush()
+
+    def close(self):
+        self.drain()
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+# The tracer everything uses, unless told otherwise
+tracer = Tracer()
+
+def get_tracer():
+    return tracer
@@ -91,6 +91,9 @@ class Frame(util.PersistedFrame):
             debug.separator()
             debug.item('&Attach', self.on_attach, icon="connect.png", show=[menu.PROJECT_OPEN, menu.TARGET_DETACHED], hide=[menu.TARGET_ATTACHED], disable=menu.PROJECT_CLOSE, enable=[menu.PROJECT_OPEN, menu.TARGET_DETACHED])
             debug.item('&Detach', self.on_detach, icon="disconnect.png", show=menu.TARGET_ATTACHED, hide=menu.TARGET_DETACHED)
+            debug.item('Attach All Sessions', self.on_attach_all, icon="connect.png", enable=menu.PROJECT_OPEN, disable=menu.PROJECT_CLOSE)
+            debug.item('Select Session...\tCtrl+Alt+S', self.on_select_session, icon="chip.png", enable=menu.PROJECT_OPEN, disable=menu.PROJECT_CLOSE)
+            debug.item('Record/Stop MI Transcript...', self.on_record_transcript, enable=menu.PROJECT_OPEN, disable=menu.PROJECT_CLOSE)
             debug.separator()
             debug.item("Reset", self.on_reset, icon="chip.png", enable=menu.TARGET_ATTACHED, disable=[menu.TARGET_RUNNING, menu.TARGET_DETACHED])
             debug.item("Download", self.on_download, icon="application_put.png", enable=menu.TARGET_ATTACHED, disable=menu.TARGET_DETACHED)
@@ -103,6 +106,8 @@ class Frame(util.PersistedFrame):
             #view.item('&Debug\tAlt+D', self.on_toggle_debug_view, icon="bug.png")
             view.item('&Disassembly\tAlt+A', self.on_toggle_disassembly_view, icon="chip.png")
             view.item('&Memory\tAlt+M', self.on_toggle_memory_view, icon="chip.png")
+            view.item('Dia&gnostics\tAlt+G', self.on_toggle_diagnostics_view, icon="bug.png")
+            view.item('P&lot\tAlt+T', self.on_toggle_plot_view, icon="magnifier.png")
         
             menu.manager.publish(menu.TARGET_DETACHED)
             menu.manager.publish(menu.PROJECT_CLOSE)
@@ -235,6 +240,14 @@ class Frame(util.PersistedFrame):
             self.memory_view = views.MemoryView(self, controller=self.controller)
             self.memory_view.info = aui.AuiPaneInfo().Caption('Memory').Right().Name('MemoryView').MinSize((250,50))
             self.manager.AddPane(self.memory_view, self.memory_view.info)
+
+            self.diagnostics_view = views.DiagnosticsView(self, controller=self.controller)
+            self.diagnostics_view.info = aui.AuiPaneInfo().Caption('Diagnostics').Bottom().Name('DiagnosticsView').Hide()
+            self.manager.AddPane(self.diagnostics_view, self.diagnostics_view.info)
+
+            self.plot_view = views.PlotView(self, controller=self.controller)
+            self.plot_view.info = aui.AuiPaneInfo().Caption('Plot').Bottom().Name('PlotView').MinSize((250,100)).Hide()
+            self.manager.AddPane(self.plot_view, self.plot_view.info)
     
             self.views = [self.log_view, self.editor_view, self.project_view, self.runtime_view, self.disassembly_view]
             
@@ -349,7 +362,7 @@ class Frame(util.PersistedFrame):
                     return
                     
             self.controller.save_session()
-            self.controller.detach()
+            self.controller.detach_all()
             evt.Skip()
 
         def on_attach(self, evt):
@@ -358,12 +371,38 @@ class Frame(util.PersistedFrame):
         def on_detach(self, evt):
             self.controller.detach()
 
+        def on_attach_all(self, evt):
+            self.controller.attach_all()
+
+        def on_select_session(self, evt):
+            controller = self.controller
+            names = controller.sessions.names
+            labels = ["%s (%s)" % (name, {app.IDLE : 'detached', app.ATTACHED : 'halted', app.RUNNING : 'running'}.get(controller.targets[name].state, '?')) for name in names]
+            dialog = wx.SingleChoiceDialog(self, "Debug which target?", "Select Session", labels)
+            dialog.SetSelection(names.index(controller.sessions.active_name))
+            if dialog.ShowModal() == wx.ID_OK:
+                controller.select_session(names[dialog.GetSelection()])
+            dialog.Destroy()
+
+        def on_record_transcript(self, evt):
+            if self.controller.recording:
+                self.controller.stop_recording()
+            else:
+                filename = self.browse_for_file("Record MI transcript to", file="gdb.mi.gz", style=wx.FD_SAVE|wx.FD_OVERWRITE_PROMPT, wildcard="MI Transcripts (*.mi.gz)|*.mi.gz")
+                if filename:
+                    self.controller.record_transcript(filename)
+
         def on_toggle_log_view(self, evt):
             self.toggle_view(self.log_view)
         def on_toggle_breakpoint_view(self, evt):
             self.toggle_view(self.breakpoint_view)
         def on_toggle_memory_view(self, evt):
             self.toggle_view(self.memory_view)
+        def on_toggle_diagnostics_view(self, evt):
+            self.toggle_view(self.diagnostics_view)
+
+        def on_toggle_plot_view(self, evt):
+            self.toggle_view(self.plot_view)
         def on_toggle_project_view(self, evt):
             self.toggle_view(self.project_view)
         def on_toggle_runtime_view(self, evt):
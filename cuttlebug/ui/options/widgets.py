@@ -53,7 +53,7 @@ class SpinWidget(OptionsWidget, wx.SpinCtrl):
     def __init__(self, parent, id=-1, range=(1,10000)):
         OptionsWidget.__init__(self)
         wx.SpinCtrl.__init__(self, parent, -1, "")
-        self.SetRange(1,100)
+        self.SetRange(*range)
         self.SetValue(1)
         self.Bind(wx.EVT_SPINCTRL, self.on_change)
 
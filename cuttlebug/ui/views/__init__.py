@@ -7,4 +7,6 @@ from project_view import ProjectView, ProjectViewEvent, EVT_PROJECT_DCLICK_FILE
 from breakpoint_view import BreakpointView
 from runtime_view import RuntimeView, GDBDebugView
 from asm_view import DisassemblyView
+from diagnostics_view import DiagnosticsView
+from plot_view import PlotView
 
@@ -52,6 +52,11 @@ class DisassemblyView(view.View):
             self.list.SetColumnWidth(i, width)
 
     def set_model(self, model):
+        if self.model is model:
+            return
+        if self.model:
+            self.model.Unbind(gdb.EVT_GDB_FINISHED, handler=self.on_gdb_finished)
+            self.clear()
         self.model = model
         self.model.Bind(gdb.EVT_GDB_FINISHED, self.on_gdb_finished)
     
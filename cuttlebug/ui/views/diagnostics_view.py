@@ -0,0 +1,102 @@
+import wx
+import wx.lib.mixins.listctrl as listmix
+import cuttlebug.gdb.latency as latency
+import view
+
+REFRESH_INTERVAL = 1000 # ms
+
+class LatencyListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
+    COLUMNS = [('Command', 200), ('Count', 60), ('Errors', 50), ('Timeouts', 60), ('Mean', 70), ('90%', 70), ('Max', 70),
+               ('GDB', 70), ('Queue', 70), ('Handle', 70)]
+
+    def __init__(self, parent):
+        wx.ListCtrl.__init__(self, parent, -1, style=wx.LC_VIRTUAL | wx.LC_REPORT | wx.LC_HRULES | wx.LC_SINGLE_SEL)
+        listmix.ListCtrlAutoWidthMixin.__init__(self)
+        for i, (name, width) in enumerate(self.COLUMNS):
+            self.InsertColumn(i, name)
+            self.SetColumnWidth(i, width)
+        self.items = []
+        self.SetItemCount(0)
+
+    def OnGetItemText(self, item, col):
+        stats = self.items[item]
+        t = latency.format_time
+        return [stats.verb, str(stats.count), str(stats.errors), str(stats.timeouts), t(stats.total.mean), t(stats.total.percentile(90)),
+                t(stats.total.max), t(stats.stages['gdb'].mean), t(stats.stages['queue'].mean), t(stats.stages['handle'].mean)][col]
+
+    def update(self, items):
+        self.Freeze()
+        self.items = items
+        self.SetItemCount(len(items))
+        self.Refresh()
+        self.Thaw()
+
+    def selected(self):
+        idx = self.GetFirstSelected()
+        return self.items[idx] if 0 <= idx < len(self.items) else None
+
+class DiagnosticsView(view.View):
+    '''
+    How long GDB commands are taking, by command: where the time goes (GDB and the probe, waiting to be handled, or
+    handling the result), a histogram for the selected command, and the state of the pending command table.
+    '''
+    def __init__(self, *args, **kwargs):
+        super(DiagnosticsView, self).__init__(*args, **kwargs)
+        self.pending = wx.StaticText(self, -1, '')
+        self.reset = wx.Button(self, -1, 'Reset')
+        self.list = LatencyListCtrl(self)
+        self.histogram = wx.TextCtrl(self, -1, '', style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_DONTWRAP)
+        self.histogram.SetFont(wx.Font(8, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+
+        top = wx.BoxSizer(wx.HORIZONTAL)
+        top.Add(self.pending, 1, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 4)
+        top.Add(self.reset, 0, wx.ALL, 2)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(top, 0, wx.EXPAND)
+        sizer.Add(self.list, 2, wx.EXPAND)
+        sizer.Add(self.histogram, 1, wx.EXPAND)
+        self.SetSizer(sizer)
+
+        self.reset.Bind(wx.EVT_BUTTON, self.on_reset)
+        self.list.Bind(wx.EVT_LIST_ITEM_SELECTED, self.on_select)
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
+        self.timer.Start(REFRESH_INTERVAL)
+
+    @property
+    def session(self):
+        return self.controller.gdb if self.controller else None
+
+    def on_timer(self, evt):
+        if self.IsShownOnScreen():
+            self.update()
+
+    def on_reset(self, evt):
+        if self.session:
+            self.session.latency.clear()
+            self.update()
+
+    def on_select(self, evt):
+        self.update_histogram()
+
+    def update(self):
+        session = self.session
+        if not session:
+            return
+        self.pending.SetLabel("In flight: %(in_flight)d   Completed: %(completed)d   Timed out: %(timed_out)d   Late: %(late)d   Coalesced: %(coalesced)d   Stale: %(stale)d" % session.pending.stats())
+        self.list.update(session.latency.items())
+        self.update_histogram()
+
+    def update_histogram(self):
+        stats = self.list.selected()
+        if not stats:
+            self.histogram.SetValue('')
+            return
+        lines = []
+        for stage, histogram in [('total', stats.total)] + [(stage, stats.stages[stage]) for stage in latency.STAGES]:
+            lines.append("%s (mean %s, max %s)" % (stage, latency.format_time(histogram.mean), latency.format_time(histogram.max)))
+            peak = max(histogram.counts) or 1
+            for label, count in zip(histogram.labels(), histogram.counts):
+                if count:
+                    lines.append("  %8s %6d %s" % (label, count, '#'*(40*count/peak or 1)))
+        self.histogram.SetValue('\n'.join(lines))
@@ -132,10 +132,23 @@ class EditorView(view.View):
         self.controller.Bind(app.EVT_APP_TARGET_HALTED, self.on_target_halted)
         self.controller.Bind(app.EVT_APP_TARGET_RUNNING, self.on_target_running)
               
+    def model_events(self):
+        return [(gdb.EVT_GDB_UPDATE_BREAKPOINTS, self.on_breakpoint_update),
+                (gdb.EVT_GDB_SNAPSHOT, self.on_breakpoint_update),
+                (gdb.EVT_GDB_FINISHED, self.on_gdb_finished)]
+
     def set_model(self, model):
+        if self.model is model:
+            return
+        if self.model:
+            # Switching sessions: forget the markers of the old one
+            for binder, handler in self.model_events():
+                self.model.Unbind(binder, handler=handler)
+            self.remove_markers()
         self.model = model
-        self.model.Bind(gdb.EVT_GDB_UPDATE_BREAKPOINTS, self.on_breakpoint_update)
-        self.model.Bind(gdb.EVT_GDB_FINISHED, self.on_gdb_finished)
+        for binder, handler in self.model_events():
+            self.model.Bind(binder, handler)
+        self.set_breakpoint_markers(self.model.breakpoints)
         
     def on_gdb_finished(self, evt):
         self.remove_markers()
@@ -341,7 +354,9 @@ class EditorControl(stc.StyledTextCtrl):
         # Query gdb for its value, and get a callback when the data arrives
         self.gdb_varname = self.get_word_at(evt.GetPosition())
         if self.gdb_varname:
-            self.controller.gdb.data_evaluate_expression(self.gdb_varname, self.on_got_gdb_data)
+            gdb = self.controller.gdb
+            with gdb.background():
+                gdb.data_evaluate_expression(self.gdb_varname, self.on_got_gdb_data)
             evt.Skip()
     
     def on_got_gdb_data(self, data):
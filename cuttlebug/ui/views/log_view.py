@@ -6,10 +6,13 @@ import cuttlebug.ui.styles as styles
 import cuttlebug.ui.menu as menu
 import cuttlebug.log as log
 import cuttlebug.util as util
+import cuttlebug.trace as trace
 import logging, re
 from editor_view import QuickFindBar
 import os
 
+DRAIN_INTERVAL = 250 # How often trace panes check for new events (ms)
+
 class BuildPane(stc.StyledTextCtrl):
     def __init__(self, *args, **kwargs):
         self.controller = kwargs.pop('controller')
@@ -157,8 +160,8 @@ class LogView(view.View):
 
     def __setup(self):
         self.add_logger(logging.getLogger('stdout'), icon="application_osx_terminal.png", format="%(message)s")
-        self.add_logger(logging.getLogger('gdb.mi'), icon="gnu.png", on_input=self.on_gdb_mi_input)
-        self.add_logger(logging.getLogger('gdb.stream'), icon="gnu.png")
+        self.add_trace('gdb.mi', (trace.MI_SENT, trace.MI_RECEIVED), icon="gnu.png", on_input=self.on_gdb_mi_input)
+        self.add_trace('gdb.stream', (trace.CONSOLE, trace.TARGET, trace.LOG), icon="gnu.png")
         self.add_logger(logging.getLogger('errors'), icon="stop.png")
         self.build_pane = BuildPane(self, controller=self.controller)
         self.add_pane(self.build_pane, icon="brick.png")
@@ -201,6 +204,10 @@ class LogView(view.View):
     def add_logger(self, logger, format=None, icon=None, on_input=None):
         pane = LogPane(self, logger, format=format, on_input=on_input)
         self.add_pane(pane, icon=icon)
+
+    def add_trace(self, name, events, icon=None, on_input=None):
+        pane = TracePane(self, name, events, on_input=on_input)
+        self.add_pane(pane, icon=icon)
         
 class LogPane(wx.Panel):
 
@@ -230,9 +237,10 @@ class LogPane(wx.Panel):
             
         self.SetSizer(sizer)
         self.logger = logger
-        self.handler = log.LogHandler(format=format)
-        self.logger.addHandler(self.handler)
-        self.handler.register(self.listener)
+        if logger:
+            self.handler = log.LogHandler(format=format)
+            self.logger.addHandler(self.handler)
+            self.handler.register(self.listener)
         self.txt.Bind(wx.EVT_RIGHT_DOWN, self.on_context_menu)
 
     def on_context_menu(self, evt):
@@ -337,3 +345,33 @@ class LogPane(wx.Panel):
     @property
     def name(self):
         return self.logger.name
+
+class TracePane(LogPane):
+    '''
+    A log pane showing events from the tracer (see trace.py.)  Rather than appending every line as it happens, the
+    pane drains the tracer on a timer, while it's on screen, and appends whatever is new in one go.
+    '''
+    def __init__(self, parent, name, events, tracer=None, on_input=None):
+        self.__name = name
+        super(TracePane, self).__init__(parent, None, on_input=on_input)
+        self.tracer = tracer or trace.tracer
+        self.reader = self.tracer.reader(*events)
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
+        self.timer.Start(DRAIN_INTERVAL)
+
+    @property
+    def name(self):
+        return self.__name
+
+    def on_timer(self, evt):
+        if self.IsShownOnScreen():
+            self.drain()
+
+    def drain(self):
+        dropped = self.reader.dropped
+        lines = [trace.format_event(event, self.tracer) for event in self.reader.read()]
+        if self.reader.dropped != dropped:
+            lines.insert(0, "... %d events dropped ..." % (self.reader.dropped - dropped))
+        if lines:
+            self.txt.AppendText('\n'.join(lines) + '\n')
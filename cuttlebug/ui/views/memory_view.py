@@ -12,8 +12,7 @@ class MemoryTable(grid.PyGridTableBase):
         self.size = size
         self.stride = stride
         self.set_cols(1)
-        self.cached_range = (-1,-1)
-        self.cached_data = []
+        self.cache = None
         self.update_callable=update_callable
 
     def set_stride(self, stride):
@@ -24,13 +23,19 @@ class MemoryTable(grid.PyGridTableBase):
         self.base = int(base)
         self.ResetView()
         
-    def update(self, base_addr, values):
-        self.cached_range =  (base_addr, base_addr + (len(values)*self.stride))
-        self.cached_data = list(values)
-        
+    def set_cache(self, cache):
+        '''
+        Set the memory cache (a gdb.memcache.MemoryCache) that cell values are read from
+        '''
+        self.cache = cache
+
+    def get_word(self, addr):
+        if self.cache is None:
+            return None
+        return self.cache.peek_word(addr, self.stride)
+
     def is_in_cache(self, addr):
-        min_addr, max_addr = self.cached_range
-        return addr >= min_addr and addr <= max_addr
+        return self.get_word(addr) is not None
 
     def set_cols(self, cols):
         self.cols = cols
@@ -71,30 +76,21 @@ class MemoryTable(grid.PyGridTableBase):
         return False
 
     def GetValue(self, row,col):
-        addr = self.address_from_coordinate(row ,col)
-        if addr >= self.cached_range[0] and addr < self.cached_range[1]:
-            fmt = "%%0%dx" % (self.stride*2)
-            try:
-                return fmt % self.cached_data[(addr-self.cached_range[0])/self.stride]
-            except:
-                return "??"*self.stride
-        else:
+        value = self.get_word(self.address_from_coordinate(row ,col))
+        if value is None:
             return "??"*self.stride
+        fmt = "%%0%dx" % (self.stride*2)
+        return fmt % value
 
     def SetValue(self, row, col, value):
         addr = self.address_from_coordinate(row,col)
         if self.update_callable:
             self.update_callable(addr, value)
          
-    def clear_cache(self):
-        self.cached_range = (-1,-1)
-        self.cached_data = []
-
     def ResetView(self):
             """Trim/extend the control's rows and update all values"""
             if self.GetView() is None:
                 return
-            self.clear_cache()
             self.GetView().BeginBatch()
             for current, new, delmsg, addmsg in [
                     (self.GetView().GetNumberRows(), self.GetNumberRows(), grid.GRIDTABLE_NOTIFY_ROWS_DELETED, grid.GRIDTABLE_NOTIFY_ROWS_APPENDED),
@@ -165,13 +161,10 @@ class MemoryGridControl(grid.Grid):
         self.SetLabelFont(font)
         self.SetDefaultCellAlignment(wx.ALIGN_CENTRE, wx.ALIGN_CENTRE)
 
-    def update(self, base_addr, values):
-        self.GetTable().update(base_addr,values)
+    def set_cache(self, cache):
+        self.GetTable().set_cache(cache)
         self.ForceRefresh()
 
-    def clear_cache(self):
-        self.GetTable().clear_cache()
-
     def set_size(self, size):
         self.size = size
     
@@ -214,6 +207,7 @@ class MemoryView(view.View):
         self.controller.Bind(app.EVT_APP_TARGET_HALTED, self.on_target_halted)
         self.controller.Bind(app.EVT_APP_TARGET_RUNNING, self.on_target_running)
         self.controller.Bind(app.EVT_APP_TARGET_CONNECTED, self.on_target_connected)
+        self.controller.Bind(app.EVT_APP_SESSION_SELECTED, self.on_session_selected)
         
         self.grid.GetGridWindow().Bind(wx.EVT_MOTION, self.on_mouse_motion)
     
@@ -271,33 +265,55 @@ class MemoryView(view.View):
         evt.Skip()
         
     def on_target_halted(self, evt):
+        if self.controller.gdb:
+            self.controller.gdb.live.discard(self)
         self._fetch_data()
         evt.Skip()
 
     def on_target_running(self, evt):
+        gdb = self.controller.gdb
+        if gdb and gdb.live.enabled:
+            # Poll the pages on show while the target runs, and put them in the cache the grid reads from
+            gdb.live.discard(self)
+            start, end = self.grid.visible_address_range()
+            page = gdb.memory.page_size
+            start, end = start - start % page, end + (-end % page)
+            gdb.live.add(start, end-start, cell_size=self.grid.GetTable().stride, owner=self, callback=self._on_live_data)
+        evt.Skip()
+
+    def _on_live_data(self, item, changed):
+        gdb = self.controller.gdb
+        if gdb and item.block:
+            gdb.memory.fill(item.block)
+            wx.CallAfter(self.update)
+
+    def on_session_selected(self, evt):
+        self._fetch_data()
         evt.Skip()
     
     def refresh(self):
         self._fetch_data()
+
     def _fetch_data(self):
-        if not self.fetching and self.controller.gdb:
+        gdb = self.controller.gdb
+        if not self.fetching and gdb:
+            self.grid.set_cache(gdb.memory)
             start, end = self.grid.visible_address_range()
-            
-            #print "Fetching data for 0x%08x -> 0x%08x" % (start, end)
-            self.controller.gdb.read_memory(start, self.grid.GetTable().stride, end-start, callback=self._on_data_fetched)
             self.fetching = True
+            #print "Fetching data for 0x%08x -> 0x%08x" % (start, end)
+            with gdb.background():
+                gdb.memory.read(start, end-start, callback=self._on_data_fetched)
+                # Pull in a screenful either side, so scrolling is served from the cache
+                span = end-start
+                gdb.memory.prefetch(max(start-span, 0), span)
+                gdb.memory.prefetch(end, span)
 
-    def _on_data_fetched(self, result):
+    def _on_data_fetched(self, block):
         self.fetching = False
-        if hasattr(result, 'memory'):
-                memtable = []
-                for entry in result.memory:
-                    memtable.append(int(entry.data[0]))
-                wx.CallAfter(self.update,int(result.addr,16), memtable)
+        wx.CallAfter(self.update)
         
-    def update(self, base_addr, values):
-        print "view update"
-        self.grid.update(base_addr, values)
+    def update(self):
+        self.grid.ForceRefresh()
         
     def on_cell_update(self, addr, value):
         print hex(addr) + "=" + str(value)
@@ -320,6 +336,9 @@ class MemoryView(view.View):
             #print "Changed cell", self.grid.hover_cell, "0x%08x" % self.grid.hover_address
             #self.controller.gdb.command('info symbol 0x%08x' % v, callback=self.on_symbol_lookup)    
             tooltip = "Address = 0x%08x" % self.grid.hover_address
+            value = self.grid.GetTable().get_word(self.grid.hover_address)
+            if value is not None:
+                tooltip += "\nValue = 0x%x (%d)" % (value, value)
             self.grid.GetGridWindow().SetToolTipString(tooltip)
         else:
             pass
@@ -0,0 +1,165 @@
+import wx
+import time
+import view
+
+REFRESH_INTERVAL = 250 # ms
+SPANS = [('All', None), ('Last 10 s', 10), ('Last minute', 60), ('Last 10 minutes', 600)]
+COLOURS = ['#1f77b4', '#d62728', '#2ca02c', '#ff7f0e', '#9467bd', '#8c564b', '#e377c2', '#17becf']
+MARGIN = 50
+
+class PlotPanel(wx.Panel):
+    '''
+    Plots series from the sampler over the same time axis.  Each series is decimated to a min and max per column of
+    pixels, so a plot costs the same to draw whether a series has a hundred samples or a million.
+    '''
+    def __init__(self, parent):
+        wx.Panel.__init__(self, parent, -1, style=wx.FULL_REPAINT_ON_RESIZE)
+        self.SetBackgroundStyle(wx.BG_STYLE_CUSTOM)
+        self.SetBackgroundColour(wx.WHITE)
+        self.series = []
+        self.span = None
+        self.Bind(wx.EVT_PAINT, self.on_paint)
+
+    def on_paint(self, evt):
+        dc = wx.BufferedPaintDC(self)
+        dc.SetBackground(wx.WHITE_BRUSH)
+        dc.Clear()
+        dc.SetFont(wx.Font(8, wx.FONTFAMILY_SWISS, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+        width, height = self.GetClientSize()
+        plot_width, plot_height = width - MARGIN - 10, height - 30
+        if plot_width < 10 or plot_height < 10:
+            return
+        shown = [series for series in self.series if len(series)]
+        if not shown:
+            dc.DrawText("Nothing sampled yet: watches are sampled when the target halts, or as live watch reads them", 10, 10)
+            return
+        end = max(series.last[0] for series in shown)
+        start = end - self.span if self.span else min(series.first[0] for series in shown)
+        columns = [(series, series.decimate(plot_width, start, end)) for series in shown]
+        values = [value for series, buckets in columns for t, lo, hi in buckets for value in (lo, hi)]
+        if not values:
+            return
+        low, high = min(values), max(values)
+        if high == low:
+            low, high = low - 1, high + 1
+        duration = (end - start) or 1.0
+        x = lambda t : MARGIN + int((t - start)*plot_width/duration)
+        y = lambda v : 10 + int((high - v)*plot_height/(high - low))
+
+        dc.SetPen(wx.LIGHT_GREY_PEN)
+        dc.DrawRectangle(MARGIN, 10, plot_width, plot_height)
+        dc.DrawText("%g" % high, 2, 10)
+        dc.DrawText("%g" % low, 2, 10 + plot_height - 10)
+        dc.DrawText("%s" % time.strftime('%H:%M:%S', time.localtime(start)), MARGIN, 12 + plot_height)
+        label = time.strftime('%H:%M:%S', time.localtime(end))
+        dc.DrawText(label, MARGIN + plot_width - dc.GetTextExtent(label)[0], 12 + plot_height)
+
+        for i, (series, buckets) in enumerate(columns):
+            colour = COLOURS[i % len(COLOURS)]
+            dc.SetPen(wx.Pen(colour))
+            dc.SetTextForeground(colour)
+            dc.DrawText(series.name, MARGIN + 4, 12 + 12*i)
+            points = []
+            for t, lo, hi in buckets:
+                column = x(t)
+                if lo != hi:
+                    dc.DrawLine(column, y(lo), column, y(hi))
+                points.append((column, y(hi)))
+            if len(points) > 1:
+                dc.DrawLines(points)
+            elif points:
+                dc.DrawCircle(points[0][0], points[0][1], 2)
+
+class PlotView(view.View):
+    '''
+    Watched values over time: the series the sampler (see sampler.py) has recorded for the watches in the runtime view,
+    plotted, and exported as CSV or in the sampler's binary format.
+    '''
+    def __init__(self, *args, **kwargs):
+        super(PlotView, self).__init__(*args, **kwargs)
+        self.names = wx.CheckListBox(self, -1, size=(160, -1))
+        self.span = wx.Choice(self, -1, choices=[name for name, seconds in SPANS])
+        self.span.SetSelection(0)
+        self.status = wx.StaticText(self, -1, '')
+        self.export_csv = wx.Button(self, -1, 'Export CSV...')
+        self.export_binary = wx.Button(self, -1, 'Export Binary...')
+        self.clear = wx.Button(self, -1, 'Clear')
+        self.plot = PlotPanel(self)
+
+        top = wx.BoxSizer(wx.HORIZONTAL)
+        top.Add(self.span, 0, wx.ALL, 2)
+        top.Add(self.status, 1, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 4)
+        top.Add(self.export_csv, 0, wx.ALL, 2)
+        top.Add(self.export_binary, 0, wx.ALL, 2)
+        top.Add(self.clear, 0, wx.ALL, 2)
+        body = wx.BoxSizer(wx.HORIZONTAL)
+        body.Add(self.names, 0, wx.EXPAND)
+        body.Add(self.plot, 1, wx.EXPAND)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(top, 0, wx.EXPAND)
+        sizer.Add(body, 1, wx.EXPAND)
+        self.SetSizer(sizer)
+
+        self.export_csv.Bind(wx.EVT_BUTTON, self.on_export_csv)
+        self.export_binary.Bind(wx.EVT_BUTTON, self.on_export_binary)
+        self.clear.Bind(wx.EVT_BUTTON, self.on_clear)
+        self.names.Bind(wx.EVT_CHECKLISTBOX, self.on_check)
+        self.span.Bind(wx.EVT_CHOICE, self.on_check)
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
+        self.timer.Start(REFRESH_INTERVAL)
+        self.unchecked = set() # Series are plotted unless they've been unchecked
+
+    @property
+    def sampler(self):
+        return self.controller.sampler if self.controller else None
+
+    def on_timer(self, evt):
+        if self.IsShownOnScreen():
+            self.update()
+
+    def on_check(self, evt):
+        for i, name in enumerate(self.names.GetStrings()):
+            if self.names.IsChecked(i):
+                self.unchecked.discard(name)
+            else:
+                self.unchecked.add(name)
+        self.update()
+
+    def on_clear(self, evt):
+        if self.sampler:
+            self.sampler.clear()
+            self.update()
+
+    def selected(self):
+        return [name for name in self.sampler.names() if name not in self.unchecked]
+
+    def on_export_csv(self, evt):
+        self.export("CSV files (*.csv)|*.csv", self.sampler.export_csv)
+
+    def on_export_binary(self, evt):
+        self.export("Sample files (*.cbts)|*.cbts", self.sampler.export_binary)
+
+    def export(self, wildcard, write):
+        dialog = wx.FileDialog(self, "Export samples", wildcard=wildcard, style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+        if dialog.ShowModal() == wx.ID_OK:
+            try:
+                write(dialog.GetPath(), self.selected())
+            except IOError, e:
+                wx.MessageBox("Couldn't export the samples: %s" % e, "Export", wx.OK | wx.ICON_ERROR)
+        dialog.Destroy()
+
+    def update(self):
+        sampler = self.sampler
+        if not sampler:
+            return
+        names = sampler.names()
+        if names != list(self.names.GetStrings()):
+            self.names.Set(names)
+            for i, name in enumerate(names):
+                self.names.Check(i, name not in self.unchecked)
+        series = [sampler[name] for name in self.selected() if name in sampler]
+        self.status.SetLabel("%d series, %d samples" % (len(names), sum(len(sampler[name]) for name in names if name in sampler)))
+        self.plot.series = series
+        self.plot.span = SPANS[self.span.GetSelection()][1]
+        self.plot.Refresh()
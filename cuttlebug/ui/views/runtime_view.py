@@ -5,7 +5,8 @@ from cuttlebug.ui.controls import DictListCtrl
 from cuttlebug.util import ArtListMixin, has_icon, bidict, KeyTree, str2int
 from functools import partial
 import cuttlebug.gdb as gdb
-import os, threading
+import cuttlebug.gdb.models as models
+import os, threading, time, struct
 import cuttlebug.ui.menu as menu
 import cuttlebug.settings as settings
 import cuttlebug.project as project
@@ -89,15 +90,32 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
         m.item("Remove Watch", func=self.on_remove_watch, icon='ex.png')
         self.menu_watch_item = m
                 
+    def model_events(self):
+        return [(gdb.EVT_GDB_UPDATE_VARS, self.on_var_update),
+                (gdb.EVT_GDB_UPDATE_STACK, self.on_stack_update),
+                (gdb.EVT_GDB_UPDATE_BREAKPOINTS, self.on_breakpoint_update),
+                (gdb.EVT_GDB_UPDATE_REGISTERS, self.on_register_update),
+                (gdb.EVT_GDB_FINISHED, self.on_gdb_finished),
+                (gdb.EVT_GDB_STOPPED, self.on_gdb_stopped),
+                (gdb.EVT_GDB_RUNNING, self.on_gdb_running),
+                (gdb.EVT_GDB_LIVE_WATCH, self.on_live_watch),
+                (gdb.EVT_GDB_SNAPSHOT, self.on_snapshot)]
+
     def set_model(self, model):
+        if self.model is model:
+            return
+        if self.model:
+            # Switching sessions.  The tree (watches included) belongs to the old one, so start over.
+            for binder, handler in self.model_events():
+                self.model.Unbind(binder, handler=handler)
+            self.clear()
         self.model = model
-        self.model.Bind(gdb.EVT_GDB_UPDATE_VARS, self.on_var_update)
-        self.model.Bind(gdb.EVT_GDB_UPDATE_STACK, self.on_stack_update)
-        self.model.Bind(gdb.EVT_GDB_UPDATE_BREAKPOINTS, self.on_breakpoint_update)
-        self.model.Bind(gdb.EVT_GDB_UPDATE_REGISTERS, self.on_register_update)
-        self.model.Bind(gdb.EVT_GDB_FINISHED, self.on_gdb_finished)
-        self.model.Bind(gdb.EVT_GDB_STOPPED, self.on_gdb_stopped)
+        self.var_pool = gdb.VarPool(model)
+        for binder, handler in self.model_events():
+            self.model.Bind(binder, handler)
         wx.CallAfter(self.build_sfr_tree)
+        if model.snapshot:
+            wx.CallAfter(self.apply_snapshot, model.snapshot)
 
     def get_var_name(self):
         name = "rtv_%d" % self.__var_idx
@@ -111,8 +129,49 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
         wx.CallAfter(self.update_registers, evt.data)
         self.save_positions()
 
+    def on_snapshot(self, evt):
+        if self.model:
+            snapshot = evt.data
+            wx.CallAfter(self.apply_snapshot, snapshot)
+            self.update_vars(snapshot.changed_vars)
+            self.save_positions()
+        evt.Skip()
+
+    def apply_snapshot(self, snapshot):
+        '''
+        Bring the stack, breakpoints and registers up to date with a stop snapshot, in one repaint
+        '''
+        if not self.model:
+            return
+        self.Freeze()
+        try:
+            self.update_stack()
+            self.update_breakpoints()
+            self.update_registers(snapshot.changed_registers)
+        finally:
+            self.Thaw()
+        self.sample_watches()
+
+    @property
+    def sampler(self):
+        return self.parent.controller.sampler
+
+    def sample_watches(self):
+        '''
+        Record the values of the watches (the numeric ones) as they are at this stop, for plotting (see sampler.py)
+        '''
+        t = time.time()
+        for watch in self.watch_item.child_keys:
+            name = self.get_item_data(watch)
+            if name in self.model.vars:
+                var = self.model.vars[name]
+                if not var.children:
+                    self.sampler.record(var.expression.strip('"'), var.data, t)
+
     def on_var_update(self, evt):
-        names = evt.data
+        self.update_vars(evt.data)
+
+    def update_vars(self, names):
         for name in names:
             if name in self.pending_var_additions:
                 self.lock.acquire()
@@ -138,13 +197,15 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
     def on_stack_update(self, evt):
         #print self.model.stack.pretty()
         if self.model:
-            if self.__check_stack():
-                wx.CallAfter(self.update_stack)
+            if self.__check_stack_extended():
+                wx.CallAfter(self.extend_stack)
             else:
-                wx.CallAfter(self.rebuild_stack)                
+                wx.CallAfter(self.update_stack)                
         evt.Skip()
         
     def on_gdb_finished(self, evt):
+        for binder, handler in self.model_events():
+            self.model.Unbind(binder, handler=handler)
         self.clear()
         self.model = None    
         
@@ -179,7 +240,9 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
         
     def on_dclick(self, evt):
         id = self.__get_evt_item(evt)
-        if self.model and self.is_descendent(id, self.breakpoints_item):
+        if self.model and id == self.more_frames_item:
+            self.list_more_frames()
+        elif self.model and self.is_descendent(id, self.breakpoints_item):
             bkpt = self.get_item_data(id)
             if bkpt.enabled:
                 self.model.break_disable(bkpt)
@@ -259,6 +322,11 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
     def on_expanding(self, evt):
         item=self.get_event_item(evt)
         item_data=self.get_item_data(item)
+
+        if item == self.more_frames_item: # Not a real node, it just lists the next page of frames
+            self.list_more_frames()
+            evt.Veto()
+            return
                 
         if self.is_descendent(item, self.sfr_item):
             self.update_sfr_tree(item, force_root=True, colorize=False)
@@ -266,7 +334,7 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
         
         if hasattr(item_data, 'level') and self.get_children_count(item, False) == 0: #item_data is a stack frame, and we wish to list its locals
             if not self.model.running:
-                self.model.stack_list_arguments(frame=item_data.level, callback=partial(self.__on_listed_arguments, item))
+                self.model.stack_list_variables(frame=item_data.level, callback=partial(self.__on_listed_variables, item))
             else:
                 evt.Veto()
         elif item_data in self.var_registry and self.get_children_count(item, False) == 0:
@@ -291,27 +359,32 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
         evt.data = names
         wx.CallAfter(self.on_var_update, evt)
         
-    def __on_listed_locals(self, frame_item, args, result):
+    def __on_listed_variables(self, frame_item, result):
         if result.cls != 'error':
-            if hasattr(result, 'locals') and frame_item.is_ok():
+            if hasattr(result, 'variables') and frame_item.is_ok():
                 frame = self.get_item_data(frame_item)
                 if self.get_children_count(frame_item, recursive=False) == 0:
-                    for item in args + result.locals:
+                    created = False
+                    for item in result.variables:
+                        # Reuse the variable object from the last time this frame was listed, if it's still about (once
+                        # it's been created, if that's still on its way)
+                        varname = self.var_pool.get(frame, item['name'])
+                        pooled = self.var_pool.created(varname) if varname else None
+                        if pooled:
+                            pooled.add_callback(partial(self.__on_pooled_var, frame_item, varname))
+                            continue
                         varname = self.get_var_name()
                         self.lock.acquire()
                         self.pending_var_additions[varname] = frame_item
                         self.lock.release()
-                        self.model.var_create(item['name'], frame=frame.level, callback=self.__on_created_var, name=varname)
+                        self.var_pool.create(frame, item['name'], varname)
+                        created = True
+                    if created:
+                        self.model.var_update()
 
-    def __on_listed_arguments(self, frame_item, result):
-        if result.cls != 'error':
-            if 'stack-args' in result and frame_item.is_ok():
-                frame = self.get_item_data(frame_item)
-                f = result['stack-args'][frame.level]['frame']
-                if int(f['level']) != frame.level:
-                    raise ValueError("Failed Sanity Check!")
-                args =  f['args']
-                self.model.stack_list_locals(frame=frame.level, callback=partial(self.__on_listed_locals, frame_item, args))
+    def __on_pooled_var(self, frame_item, name, result):
+        if getattr(result, 'cls', None) != 'error' and name in self.model.vars:
+            wx.CallAfter(self.add_var_item, frame_item, name, self.model.vars[name])
                 
     def __on_created_var(self, result):
         if hasattr(result, 'name'):
@@ -331,6 +404,7 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
             else:
                 self.set_item_has_children(var_item, False)
                 self.set_item_text(var_item, var.data, 1)
+                self.set_item_text_colour(var_item, wx.BLACK) # It may have been live (see update_live_values)
                 
             icon_name = var.type.icon_name
             if has_icon(icon_name):    
@@ -358,33 +432,55 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
     def on_watch_deleted(self, watch_item, evt):
         self.delete(watch_item)
 
-    def scrub_vars(self, all_vars=False):
-        #TODO use a list
-        to_update = {}        
+    def scrub_vars(self):
+        '''
+        Bring the variable objects of the locals shown into line with the stack.  The pooled ones whose frame is still
+        the same function at the same depth are left alone (the -var-update that went out with the stop has refreshed
+        them), the rest are created again in their frame, and the pool lets go of the variable objects of frames that
+        have gone.
+        '''
+        to_update = {}
+        replaced = []
         if self.get_frame_count() > 0:
-            frame_items = self.get_frame_items()
-            for name, var_item in self.var_registry.iteritems():
-                if (not self.is_descendent(var_item, frame_items[-1]) or all_vars) and name in self.model.vars:
-                    var = self.model.vars[name]
-                    frame = self.get_var_frame(name)
-                    if frame:
-                        varname = self.get_var_name()
-                        to_update[(name, varname)] = (frame, var)
-                        self.pending_var_updates[varname] = var_item
-                            
-            for (old_name, new_name), (frame, var)in to_update.iteritems(): 
-                self.model.var_delete(old_name)
-                self.model.var_create(var.expression, frame=frame.level, callback=self.__on_created_var, name=new_name)
+            for name, var_item in self.var_registry.items():
+                if '.' in name or name not in self.model.vars:
+                    continue
+                frame = self.get_var_frame(name)
+                if frame and not self.var_pool.holds(name, frame):
+                    varname = self.get_var_name()
+                    to_update[varname] = (frame, self.model.vars[name])
+                    self.pending_var_updates[varname] = var_item
+                    self.__drop_var_children(var_item)
+                    replaced.append(name)
+
+            # The items are getting new variable objects, so the old ones (children and all) are finished with
+            for name in replaced:
+                self.var_pool.forget(name)
+                self.model.var_delete(name)
+            for new_name, (frame, var) in to_update.iteritems(): 
+                self.var_pool.create(frame, var.expression, new_name)
+            if to_update:
+                self.model.var_update()
+        self.var_pool.sync()
+
+    def __drop_var_children(self, var_item):
+        for child in list(self.children(var_item)):
+            for item in self.walk(child):
+                name = self.get_item_data(item)
+                if name in self.var_registry:
+                    self.var_registry.pop(name)
+            self.delete(child)
 
     def get_frame_items(self):
-        return list(self.children(self.stack_item)) if self.stack_item.is_ok() else []
+        # Everything under the Call Stack is a frame, bar the node for listing more of them
+        return [item for item in self.stack_item.child_keys if item is not self.more_frames_item] if self.stack_item.is_ok() else []
     
     def get_frames(self):
         return [self.get_item_data(frame_item) for frame_item in self.get_frame_items()]
     
     def get_frame_count(self):
         if self.stack_item.is_ok():
-            return self.get_children_count(self.stack_item, recursive=False)
+            return len(self.stack_item.child_keys) - (1 if self.more_frames_item else 0)
         else:
             return 0     
             
@@ -407,24 +503,54 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
             self.GetParent().controller.goto(self.frame.file, self.frame.line)
             self.frame = None
             
-    def __check_stack(self):
+    def __check_stack_extended(self):
+        '''
+        True if the model's stack is the one in the view with more frames listed below it (see list_more_frames)
+        '''
         if self.model:
-            # Our list of frames is reversed from the models, because that's how we view it.
-            for model_frame, view_frame in zip(reversed(self.model.stack), self.get_frames()):
-                if model_frame.key != view_frame.key: return False
-        return True
+            frames = list(reversed(self.get_frames()))
+            if frames and len(self.model.stack) > len(frames):
+                return [frame.key for frame in frames] == self.model.stack.keys[:len(frames)]
+        return False
+
+    def list_more_frames(self):
+        if self.model and not self.model.running:
+            self.model.stack_list_more()
+
+    def extend_stack(self):
+        '''
+        Add the frames listed since the view was last updated, outermost first, above the ones already shown
+        '''
+        stack = self.model.stack
+        index = 1 if self.more_frames_item and self.more_frames_item.is_ok() else 0
+        for frame in stack.frames[self.get_frame_count():]:
+            item = self.insert_item(self.stack_item, index, frame.func + "( )")
+            self.update_frame_item(item, frame)
+        self.update_more_frames_item()
+
+    def update_more_frames_item(self):
+        '''
+        Show how many frames are left to list, in a node above the outermost frame, or remove the node if there are none
+        '''
+        stack = self.model.stack
+        remaining = stack.remaining
+        if stack.complete or not len(stack):
+            if self.more_frames_item and self.more_frames_item.is_ok():
+                self.delete(self.more_frames_item)
+            self.more_frames_item = None
+            return
+        if not (self.more_frames_item and self.more_frames_item.is_ok()):
+            self.more_frames_item = self.insert_item(self.stack_item, 0, '')
+            self.set_item_art(self.more_frames_item, 'stack.png')
+            self.set_item_has_children(self.more_frames_item, True)
+        self.set_item_text(self.more_frames_item, "%d more frames..." % remaining if remaining is not None else "More frames...")
     
     def get_var_frame(self, name):
-        frame = None
-        item = self.var_registry[name]
-        frames = self.get_frames()
-        while frame not in frames:
-            item = self.get_parent(item)
-            if item.is_ok():
-                frame = self.get_item_data(item)
-            else:
-                return None
-        return frame
+        # The frame item is the ancestor of the variable's item just below the Call Stack
+        frame_item = self.get_ancestor(self.var_registry[name], self.stack_item.depth + 1)
+        if frame_item.is_ok() and frame_item.parent_key is self.stack_item and frame_item is not self.more_frames_item:
+            return self.get_item_data(frame_item)
+        return None
     
     def on_step_out(self, evt):
         self.parent.controller.step_out()
@@ -440,25 +566,26 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
     
     def update_stack(self):
         stack = self.model.stack
-        stack_changed=False
-        # If the frame count in the view is > the frame count in the model, pop off until they match (tossing frames that no longer exist)
-        n = self.get_frame_count()-len(stack)
-        if n > 0:
-            for i in range(n):
-                self.pop_stack_frame()
-                stack_changed = True
-        
-        for frame_item, frame in zip(self.get_frame_items(), reversed(self.model.stack)):
+        # Keep the frames (outermost first, as we view them) that are still on the stack, matched up by how deep they
+        # are (see GDBStackModel.match), and pop off the rest, from the innermost frame up
+        kept = stack.match(self.get_frames(), self.stack_depth)
+        for i in range(self.get_frame_count() - len(kept)):
+            self.pop_stack_frame()
+        for frame_item, frame in zip(self.get_frame_items(), kept):
             self.update_frame_item(frame_item, frame)
-            
-        # Otherwise add frames until we're all in sync
-        idx = self.get_frame_count()+1
-        while self.get_frame_count() < len(self.model.stack):
-            frame = stack[len(stack)-idx]
+
+        # Frames listed further down than those kept go above them, and new ones further up go below
+        if kept:
+            index = 1 if self.more_frames_item and self.more_frames_item.is_ok() else 0
+            for frame in stack.frames[kept[0].level+1:]:
+                item = self.insert_item(self.stack_item, index, frame.func + "( )")
+                self.update_frame_item(item, frame)
+        for frame in reversed(stack.frames[:kept[-1].level if kept else len(stack)]):
             self.add_frame_item(frame)
-            idx += 1
-                        
-        self.scrub_vars(all_vars=stack_changed)
+        self.stack_depth = stack.exact_depth
+
+        self.update_more_frames_item()
+        self.scrub_vars()
 
     def pop_stack_frame(self):
         frame_item = self.get_frame_items()[-1]
@@ -467,7 +594,8 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
                 name = self.get_item_data(child)
                 if name in self.var_registry:
                     self.var_registry.pop(name)
-                    self.model.var_delete(name)
+                    if name not in self.var_pool: # Pooled ones are kept in case the frame comes back (see scrub_vars)
+                        self.model.var_delete(name)
             self.delete(frame_item)
         else:
             print "Can't remove frame.  Frame item is NOT ok."
@@ -556,30 +684,136 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
             elif isinstance(item, project.SpecialFunctionRegister):
                 sfr_item = self.append_item(tree_item, item.fullname)
                 self.set_item_data(sfr_item, item)
+                if not item.readable:
+                    self.set_item_text(sfr_item, "(not read)", 1)
         tree_item = self.sfr_item
         for item in target_model.items:
             walk(self, tree_item, item)     
         
     def on_gdb_stopped(self, evt):
+        self.model.live.discard(self)
         self.update_sfr_tree(self.sfr_item)
         evt.Skip()
+
+    def on_gdb_running(self, evt):
+        if self.model.live.enabled:
+            wx.CallAfter(self.start_live_watch)
+        evt.Skip()
+
+    def start_live_watch(self):
+        '''
+        Have the SFRs and watches on show polled while the target runs (see gdb/livewatch.py)
+        '''
+        live = self.model.live
+        live.discard(self)
+        blocks, expressions = self.__sfr_blocks([self.sfr_item])
+        for address, size, registers in blocks:
+            live.add(address, size, cells=[(reg.address - address, reg.size) for item, reg in registers], owner=self, key=[item for item, reg in registers])
+        for watch in self.watch_item.child_keys:
+            name = self.get_item_data(watch)
+            if name in self.var_registry and name in self.model.vars:
+                live.add_expression(self.model.vars[name].expression.strip('"'), owner=self, key=watch)
+
+    def on_live_watch(self, evt):
+        changes = [(item, changed) for item, changed in evt.data if item.owner is self]
+        if changes:
+            wx.CallAfter(self.update_live_values, changes)
+        evt.Skip()
+
+    def update_live_values(self, changes):
+        sfrs = []
+        for item, changed in changes:
+            if isinstance(item.key, list):
+                sfrs.extend((item.key[i], value) for i, value in changed)
+            elif item.key.is_ok():
+                name = self.get_item_data(item.key)
+                var = self.model.vars[name] if name in self.model.vars else None
+                for i, value in changed:
+                    if var and item.cells == [(0, item.size)]:
+                        value = self.__decode_live(var, value, item.size)
+                        self.sampler.record(var.expression.strip('"'), value)
+                    self.set_item_text(item.key, str(value), 1)
+                    self.set_item_text_colour(item.key, wx.RED)
+        if sfrs:
+            self.update_sfr_values(sfrs)
+
+    def __decode_live(self, var, value, size):
+        '''
+        The value of a scalar, as live watch read it (unsigned, little endian), as its type says it should be read
+        '''
+        type = var.type
+        if type.pointer:
+            return value
+        if type.type == models.FLOAT and size == 4:
+            return struct.unpack('<f', struct.pack('<I', value))[0]
+        if type.type == models.DOUBLE and size == 8:
+            return struct.unpack('<d', struct.pack('<Q', value))[0]
+        if type.type in (models.FLOAT, models.DOUBLE) or type.signed == models.UNSIGNED:
+            return value
+        bits = size*8
+        return value - (1 << bits) if value >> (bits-1) else value
+
+    def __sfr_blocks(self, items):
+        '''
+        The SFRs on show under items, grouped into blocks that can be read in one go: returns a list of (address, size,
+        [(tree item, SFR)...]), and a list of (tree item, register) for the registers that have to be evaluated one at a time.
+        '''
+        peripherals = {} # Peripheral tree item -> [SFRs on show]
+        tree_items = {}  # SFR -> its tree item
+        expressions = []
+        for i in items:
+            for tree_item in self.walk_expanded(i, False):
+                item = self.get_item_data(tree_item)
+                if isinstance(item, project.SpecialFunctionRegister):
+                    peripherals.setdefault(tree_item.parent_key, []).append(item)
+                    tree_items[item] = tree_item
+                elif hasattr(item, 'expression'):
+                    expressions.append((tree_item, item))
+        blocks = []
+        for peripheral_item, registers in peripherals.iteritems():
+            peripheral = [self.get_item_data(key) for key in peripheral_item.child_keys]
+            for address, size, block in project.sfr_blocks(registers, peripheral):
+                blocks.append((address, size, [(tree_items[reg], reg) for reg in block]))
+        return blocks, expressions
         
     def update_sfr_tree(self, sfr_item, force_root=False, colorize=True):
+        '''
+        Refresh the values of the SFRs on show under sfr_item.  Each peripheral's registers are fetched in as few memory
+        reads as possible (see project.sfr_blocks), and their values, fields and all, are decoded here.
+        '''
         if force_root: 
             items = self.children(sfr_item)
         else:
             items = [sfr_item]
         
-        for i in items:
-            for tree_item in self.walk_expanded(i, False):
-                item = self.get_item_data(tree_item)
-                if hasattr(item, 'expression'):
-                    self.model.data_evaluate_expression(item.expression, callback=partial(self.on_sfr_data, tree_item, colorize))
+        blocks, expressions = self.__sfr_blocks(items)
+        with self.model.background(), self.model.batch():
+            for address, size, registers in blocks:
+                self.model.read_memory_bytes(address, size, callback=partial(self.on_sfr_block, registers, colorize))
+            for tree_item, item in expressions:
+                self.model.data_evaluate_expression(item.expression, callback=partial(self.on_sfr_data, tree_item, colorize))
+
+    def on_sfr_block(self, registers, colorize, data):
+        values = []
+        for block in getattr(data, 'blocks', []):
+            for item, reg in registers:
+                if block.contains(reg.address, reg.size):
+                    values.append((item, block.read(reg.address, reg.size)))
+        if values:
+            wx.CallAfter(self.update_sfr_values, values, colorize)
 
     def on_sfr_data(self, item, colorize, data):
         if data.cls == "done" and hasattr(data, 'value'):
             wx.CallAfter(self.update_sfr_value, item, data.value, colorize)
     
+    def update_sfr_values(self, values, colorize=True):
+        self.Freeze()
+        try:
+            for item, value in values:
+                self.update_sfr_value(item, value, colorize)
+        finally:
+            self.Thaw()
+
     def update_sfr_value(self, item, value, colorize=True):
         current_value = self.get_item_text(item, 1)
         try:
@@ -600,9 +834,11 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
     
     def clear(self):
         self.last_watch = ""
-        self.DeleteAllItems()
+        self.delete_all_items()
         self.root_item = self.add_root('root')
         self.stack_item = self.append_item(self.root_item,'Call Stack')
+        self.more_frames_item = None # Node above the frames that lists the next page of them, when the stack isn't all listed
+        self.stack_depth = None # Exact depth of the stack the frames shown were listed from, if known
         self.breakpoints_item = self.append_item(self.root_item, 'Breakpoints')
         self.registers_item = self.append_item(self.root_item, 'CPU Registers')
         self.watch_item = self.append_item(self.root_item, 'Watch')
@@ -622,6 +858,7 @@ class RuntimeTree(gizmos.TreeListCtrl, ArtListMixin, KeyTree):
         self.register_registry = bidict()
         self.lock.release()
         self.breakpoint = None
+        self.var_pool = gdb.VarPool(self.model) if self.model else None # Variable objects for the locals shown, kept across stops
         
     def __get_evt_item(self, evt):
         item = evt.GetItem()
@@ -679,11 +916,19 @@ class GDBDebugView(view.View):
         self.model = model
         print "Binding the var update"
         self.model.Bind(gdb.EVT_GDB_UPDATE_VARS, self.on_var_update)
+        self.model.Bind(gdb.EVT_GDB_SNAPSHOT, self.on_snapshot)
 
     def on_var_update(self, evt):
-        for name in evt.data:
+        self.update_vars(evt.data)
+        evt.Skip()
+
+    def on_snapshot(self, evt):
+        self.update_vars(evt.data.changed_vars)
+        evt.Skip()
+
+    def update_vars(self, names):
+        for name in names:
             if name in self.model.vars:
                 self.list[name] = self.model.vars[name].data
             else:
-                del self.list[name]
-        evt.Skip()
\ No newline at end of file
+                del self.list[name]
\ No newline at end of file
@@ -1,6 +1,7 @@
 import wx
 import os, threading, subprocess, pickle
 import odict
+from bidict import bidict
 from jinja2 import Environment, PackageLoader, FileSystemLoader
 from os.path import abspath, dirname, normcase, normpath, splitdrive
 from os.path import join as path_join, commonprefix
@@ -33,55 +34,6 @@ def coroutine(func):
         return cr
     return start
     
-class bidict(object):
-    
-    def __init__(self, d=None):
-        d=d or {}
-        self.d1 = {}
-        self.d2 = {}
-        for key, value in d.iteritems():
-            self[key] = value
-    def __getitem__(self, key):
-        try: return self.d1[key]
-        except KeyError: return self.d2[key]
-                
-    def __setitem__(self, key, value):
-        self.d1[key] = value
-        self.d2[value] = key
-    
-    def __contains__(self, key):
-        return (key in self.d1) or (key in self.d2)
-    
-    def keys(self, direction=False):
-        return self.d1.keys() if not direction else self.d2.keys()
-    
-    def values(self, direction=False):
-        return self.keys(not direction)
-    
-    def reverse(self):
-        self.d1, self.d2 = self.d2, self.d1
-        
-    def get(self, key, default):
-        try:
-            return self[key]
-        except KeyError:
-            return default    
-    def iteritems(self, direction=False):
-        return self.d1.iteritems() if not direction else self.d2.iteritems()
-    
-    def pop(self, key):
-        try:
-            val = self.d1.pop(key)
-            self.d2.pop(val)
-            return val
-        except KeyError:
-            val = self.d2.pop(key)
-            self.d1.pop(val)
-            return val
-        
-    def __str__(self):
-        return 'b' + str(self.d1)
-    
 class PersistedFrame(wx.Frame):
     
     def __init__(self, *args, **kwargs):
@@ -566,23 +518,58 @@ class ArtListMixin(object):
         self.SetImageList(self.__image_list, *self.__args, **self.__kwargs)
 
 class TreeItemKey(object):
-    def __init__(self, parent):
+    '''
+    Key for an item in a KeyTree.  Keys also hold the shape of the tree (their parent, children and ancestors), so the
+    tree can be navigated without going back to wx for every step.
+    '''
+    def __init__(self, parent, parent_key=None):
         self.parent = parent
+        self.parent_key = parent_key
+        self.child_keys = []
+        self.ancestors = (parent_key.ancestors + (parent_key,)) if parent_key else () # Root first
+        self.ancestor_set = frozenset(self.ancestors)
         
     def is_ok(self):
         return self in self.parent._items
 
+    @property
+    def depth(self):
+        return len(self.ancestors)
+
 class KeyTree(object):
     def __init__(self):
         self._items = {}
+
+    def __add_key(self, parent_key, item, index=None):
+        key = TreeItemKey(self, parent_key)
+        if parent_key:
+            if index is None:
+                parent_key.child_keys.append(key)
+            else:
+                parent_key.child_keys.insert(index, key)
+        self._items[key] = item
+        self.SetItemPyData(item, (key, None))
+        return key
+
+    def __remove_keys(self, key):
+        '''
+        Take key and everything under it out of the index
+        '''
+        for k in self.walk(key):
+            self._items.pop(k, None)
+        parent_key = key.parent_key
+        if parent_key:
+            siblings = parent_key.child_keys
+            if siblings and siblings[-1] is key:
+                siblings.pop()
+            elif key in siblings:
+                siblings.remove(key)
             
     def append_item(self, parent_key, name):
         try:
             parent = self._items[parent_key]
             item = self.AppendItem(parent, name)
-            key = TreeItemKey(self)
-            self._items[key] = item
-            self.SetItemPyData(item, (key, None))
+            key = self.__add_key(parent_key, item)
         except Exception, e:
             print "There was a problem appending item:"
             print e
@@ -591,13 +578,18 @@ class KeyTree(object):
             
             
         return key
+
+    def insert_item(self, parent_key, index, name):
+        parent = self._items[parent_key]
+        item = self.InsertItemBefore(parent, index, name)
+        return self.__add_key(parent_key, item, index)
     
     def hit_test(self, pos):
         item, flags = self.HitTest(pos)
         if item.IsOk():
             return self.get_key(item), flags
         else:
-            return TreeItemKey(), flags
+            return TreeItemKey(self), flags
     '''
     def walk(self, key):
         first, cookie = self.get_first_child(key)
@@ -611,15 +603,19 @@ class KeyTree(object):
     '''
     
     def walk(self, top_item, include_root=True):
-        retval = [top_item] if include_root else []
-        child, cookie = self.get_first_child(top_item)
-        while child.is_ok():
-            retval.extend(self.walk(child))
-            child, cookie = self.get_next_child(top_item, cookie)
+        '''
+        List top_item and everything under it, depth first (parents before their children)
+        '''
+        retval = []
+        stack = [top_item] if include_root else list(reversed(top_item.child_keys))
+        while stack:
+            key = stack.pop()
+            retval.append(key)
+            stack.extend(reversed(key.child_keys))
         return retval
         
     def walk_expanded(self, top_item, include_root=True):
-        if self.get_children_count(top_item) == 0:
+        if not top_item.child_keys:
             yield top_item
         else:
             if self.is_expanded(top_item):
@@ -630,20 +626,16 @@ class KeyTree(object):
             yield top_item
         
     def get_parent(self, key):
-        item = self._items[key]
-        item = self.GetItemParent(item)
-        if item.IsOk():
-            return self.get_key(item)
-        else:
-            return TreeItemKey(self)
+        return key.parent_key or TreeItemKey(self)
+
+    def get_ancestor(self, key, depth):
+        '''
+        The ancestor of key at depth (0 is the root), or a key that's NOT ok if key isn't that deep
+        '''
+        return key.ancestors[depth] if depth < key.depth else TreeItemKey(self)
     
     def is_descendent(self, child_key, parent_key):
-        parent = self.get_parent(child_key)
-        while parent.is_ok():
-            if parent == parent_key:
-                return True
-            parent = self.get_parent(parent)
-        return False
+        return parent_key in child_key.ancestor_set
     
     def is_expanded(self, key):
         item = self._items[key]
@@ -666,14 +658,12 @@ class KeyTree(object):
             return TreeItemKey(self), cookie
         
     def children(self, key):
-        child, cookie = self.get_first_child(key)
-        while child.is_ok():
-            yield child
-            child, cookie = self.get_next_child(key, cookie)
+        return list(key.child_keys)
             
     def get_children_count(self, key, recursive=True):
-        item = self._items[key]
-        return self.GetChildrenCount(item, recursive)
+        if recursive:
+            return len(self.walk(key, include_root=False))
+        return len(key.child_keys)
         
     def get_key(self, item):
         if item.IsOk():
@@ -726,27 +716,23 @@ class KeyTree(object):
         
     def add_root(self, name):
         item = self.AddRoot(name)
-        key = TreeItemKey(self)
-        self._items[key] = item
-        self.SetItemPyData(item, (key, None))
-        return key
+        return self.__add_key(None, item)
     
     def delete(self, key):
         item = self._items[key]
-        if self.get_children_count(key) > 0:            
-            for child in list(self.children(key)):
-                self.delete(child)
-        
-        item = self._items.pop(key)
+        self.__remove_keys(key)
         self.Delete(item)
                     
     
     def delete_children(self, key):
         item = self._items[key]
-        to_be_removed = list(self.children(key))
+        for child in self.children(key):
+            self.__remove_keys(child)
         self.DeleteChildren(item)
-        for key in to_be_removed:
-            self._items.pop(key)
+
+    def delete_all_items(self):
+        self._items.clear()
+        self.DeleteAllItems()
     
     def collapse(self, key):
         item = self._items[key]